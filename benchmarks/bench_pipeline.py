@@ -0,0 +1,139 @@
+"""
+Runtime and peak memory of every deterministic stage on synthetic workloads.
+
+    python benchmarks/bench_pipeline.py [scale ...]
+
+A scale of 1 is the size of the shipped data set (50 locations and orders),
+fleets grow with the scale. Peak memory is measured with tracemalloc, so it
+covers Python allocations including numpy arrays.
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.data.reference_data import load_reference
+from delivery_management.data.synthetic import WorkloadPaths, WorkloadSpec, write_workload
+from delivery_management.optimizer import MultiObjectiveOptimizer
+from delivery_management.tools.cluster_index import get_cluster_index
+from delivery_management.tools.cluster_orders import ClusterOrdersByGeoTool
+from delivery_management.tools.enrich_clustered_orders import EnrichClusteredOrders
+from delivery_management.tools.enrich_final_output import FinalOutputEnricher
+from delivery_management.tools.fleet import FleetData
+from delivery_management.tools.fleet_assignment import FleetAssigner
+from delivery_management.tools.local_search import RouteImprover, fleet_capacities
+from delivery_management.tools.regulatory import load_regulatory_index
+from delivery_management.tools.route_builder import build_greedy_routes
+from delivery_management.tools.schedule_simulator import load_schedule_simulator
+
+DEFAULT_SCALES = [1, 10, 100]
+LOCAL_SEARCH_BUDGET_SECONDS = 1.0
+# Below this share of routes with a fleet the later stages time a mostly empty workload
+MIN_ASSIGNED_SHARE = 0.95
+
+
+class PipelineStages:
+    """
+    The deterministic stages over one workload, each callable on its own.
+
+    Every stage reads the outputs of the stages before it, so prepare() runs
+    them once up front and each stage can then be timed repeatedly.
+    """
+
+    def __init__(self, paths: WorkloadPaths):
+        self.paths = paths
+        fleets = load_reference(paths.fleets)
+        regulatory = load_regulatory_index()
+        self.improver = RouteImprover(
+            load_schedule_simulator(paths.geolocations, paths.time_constraints),
+            fleet_capacities(fleets),
+            LOCAL_SEARCH_BUDGET_SECONDS,
+            regulatory
+        )
+        self.assigner = FleetAssigner(load_reference(paths.fleets, FleetData), self.improver.simulator.matrix, regulatory=regulatory)
+
+    def cluster_tool(self) -> ClusterOrdersByGeoTool:
+        return ClusterOrdersByGeoTool()\
+            .with_orders_file(self.paths.orders)\
+            .with_geolocations_file(self.paths.geolocations)\
+            .with_static_ref_file(self.paths.static_ref)\
+            .with_inventory_file(self.paths.inventory)
+
+    def prepare(self):
+        self.cluster()
+        self.greedy_routes = self.route_builder()
+        self.assignment = self.fleet_assignment()
+
+        assigned = len(self.assignment.routes)
+        total = assigned + len(self.assignment.unassigned)
+        if total and assigned / total < MIN_ASSIGNED_SHARE:
+            reasons = sorted({route.reason for route in self.assignment.unassigned})
+            raise ValueError(f"Only {assigned} of {total} routes get a fleet ({'; '.join(reasons)}), the workload is not representative")
+
+    def cluster(self):
+        self.h3_clustered_orders = self.cluster_tool().run()
+        self.index = get_cluster_index()
+        return self.h3_clustered_orders
+
+    def route_builder(self):
+        return build_greedy_routes(self.h3_clustered_orders, regulatory=self.improver.regulatory)
+
+    def enrich(self):
+        return EnrichClusteredOrders().enrich_routes(self.greedy_routes)
+
+    def local_search(self):
+        return self.improver.improve(self.greedy_routes, self.index)
+
+    def fleet_assignment(self):
+        return self.assigner.assign(self.greedy_routes, self.index)
+
+    def final_output(self):
+        return FinalOutputEnricher().run(routes=self.assignment.model_dump())
+
+    def optimizer(self):
+        return MultiObjectiveOptimizer(self.improver, self.assigner).optimize(self.h3_clustered_orders, self.index)
+
+    def stages(self) -> Dict[str, Callable]:
+        return {
+            "cluster": self.cluster,
+            "route_builder": self.route_builder,
+            "enrich": self.enrich,
+            "local_search": self.local_search,
+            "fleet_assignment": self.fleet_assignment,
+            "final_output": self.final_output,
+            "optimizer": self.optimizer
+        }
+
+
+def measure(stage: Callable):
+    """(seconds, peak MB) of one call."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        stage()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main(scales):
+    print(f"{'scale':>6} {'orders':>8} {'stage':<18} {'seconds':>9} {'peak MB':>9}")
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as out_dir:
+            spec = WorkloadSpec.scaled(scale)
+            stages = PipelineStages(write_workload(spec, Path(out_dir)))
+            stages.prepare()
+            for name, stage in stages.stages().items():
+                elapsed, peak = measure(stage)
+                print(f"{scale:>6} {spec.orders:>8} {name:<18} {elapsed:>9.3f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main([float(arg) for arg in sys.argv[1:]] or DEFAULT_SCALES)
@@ -0,0 +1,60 @@
+"""
+Runtime of the deterministic route builder across order volumes.
+
+    python benchmarks/bench_route_builder.py [orders ...]
+
+Every synthetic order lives at its own location and cells hold ~400 locations,
+roughly the density of a busy resolution 6 H3 cell.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.cluster_orders import (
+    ClusteredOrder,
+    H3ClusteredOrdersInput,
+    H3LocationCluster,
+    LocationCluster
+)
+from delivery_management.tools.route_builder import build_greedy_routes
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+LOCATIONS_PER_CELL = 400
+
+
+def synthetic_clusters(order_count: int, seed: int = 7) -> H3ClusteredOrdersInput:
+    rng = random.Random(seed)
+    clusters = []
+    for start in range(0, order_count, LOCATIONS_PER_CELL):
+        locations = []
+        for i in range(start, min(start + LOCATIONS_PER_CELL, order_count)):
+            weight = rng.uniform(5, 400)
+            # model_construct skips validation, the benchmark only times the route builder
+            order = ClusteredOrder.model_construct(
+                h3_index=None, order_id=f"ORD{i}", weight=weight, volume=0.0,
+                product="SKU", quantity=1, metadata=None
+            )
+            locations.append(LocationCluster.model_construct(
+                location_id=f"LOC{i}", location=None, total_weight=weight, total_volume=0.0,
+                est_delivery_time_hours=round(((weight / 50) * 15) / 60, 2), orders=[order]
+            ))
+        clusters.append(H3LocationCluster.model_construct(h3_index=f"cell{start}", locations=locations))
+    return H3ClusteredOrdersInput.model_construct(priority_orders=[], h3_clusters=clusters)
+
+
+def main(scales):
+    print(f"{'orders':>10} {'routes':>8} {'seconds':>9} {'orders/s':>12}")
+    for order_count in scales:
+        clustered = synthetic_clusters(order_count)
+        started = time.perf_counter()
+        routes = build_greedy_routes(clustered)
+        elapsed = time.perf_counter() - started
+        print(f"{order_count:>10} {len(routes.routes):>8} {elapsed:>9.3f} {order_count / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SCALES)
@@ -0,0 +1,39 @@
+"""
+pytest-benchmark suite over the deterministic stages.
+
+    pytest benchmarks/test_pipeline_benchmark.py --benchmark-only
+
+Scales are read from DELIVERY_MANAGEMENT_BENCH_SCALES (comma separated,
+default "1,10"). Peak memory of a single call is attached to every result as
+extra_info["peak_mb"]. Skipped when pytest-benchmark is not installed.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from bench_pipeline import PipelineStages, measure
+from delivery_management.data.synthetic import WorkloadSpec, write_workload
+
+SCALES = [float(scale) for scale in os.environ.get("DELIVERY_MANAGEMENT_BENCH_SCALES", "1,10").split(",")]
+STAGES = ["cluster", "route_builder", "enrich", "local_search", "fleet_assignment", "final_output", "optimizer"]
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda scale: f"scale{scale:g}")
+def pipeline(request, tmp_path_factory):
+    stages = PipelineStages(write_workload(WorkloadSpec.scaled(request.param), tmp_path_factory.mktemp("workload")))
+    stages.prepare()
+    return stages
+
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_stage(benchmark, pipeline, stage):
+    run = pipeline.stages()[stage]
+    _, benchmark.extra_info["peak_mb"] = measure(run)
+    benchmark.extra_info["orders"] = len(pipeline.index.orders)
+    benchmark(run)
@@ -1,13 +1,13 @@
-import json
+from functools import cached_property, lru_cache, partial
 from pathlib import Path
 import yaml
 import litellm
-from crewai import Agent, Crew, Process, Task, LLM
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from delivery_management.tools import (
     cluster_orders,
-    fleet,
-    enrich_clustered_orders
+    factories,
+    route_builder
 )
 
 from delivery_management.tasks import (
@@ -17,107 +17,273 @@ from delivery_management.tasks import (
     volume_optimize_routes,
     summarize_optimizations
 )
+from delivery_management import llm_provider, optimizer, sharding
+from delivery_management.tools.shared_data import scoped_run, set_shared
+from delivery_management.tools.cluster_index import get_cluster_index, publish_h3_clusters
+from delivery_management.tools.instrumentation import MetricsListener
+
+# Shared state keys of the stages that run per H3 shard, in crew order
+SHARDED_STAGE_KEYS = ["time_optimized_routes", "weight_optimized_routes", "volume_optimized_routes"]
+
+
+@lru_cache(maxsize=None)
+def load_agents_config() -> dict:
+    with open(DeliveryManagement.BASE_DIR / 'config/agents.yaml', "r") as f:
+        return yaml.safe_load(f)
+
+
+@lru_cache(maxsize=None)
+def shared_llm():
+    # Gemini by default, DELIVERY_MANAGEMENT_LLM=mock runs the crew offline
+    return llm_provider.create_llm()
+
+
+@lru_cache(maxsize=None)
+def metrics_listener() -> MetricsListener:
+    # LLM calls, task durations and agent tool usage go to instrumentation.metrics,
+    # export them with instrumentation.write_metrics()
+    return MetricsListener()
+
 
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
 
 class DeliveryManagement():
-    """DeliveryManagement crew"""
+    """DeliveryManagement crew
 
-    BASE_DIR = Path(__file__).resolve().parent
-    # Load the YAML configuration
-    file_path = BASE_DIR / 'config/agents.yaml'
-    with open(file_path, "r") as f:
-        agents_config = yaml.safe_load(f)
+    Agents, tasks, tools and the LLM are built on first use, so importing the
+    module and creating the crew object stay cheap. Tools, the LLM and the
+    solvers are shared by all crews of the process, see tools.factories.
+    """
 
-    # Load Gemini vertex ai service account.json
-    file_path = Path('/mnt/c/users/sriramkumar.jothiman/secrets/vertex_ai_service_account.json')
-    with open(file_path, "r") as f:
-        vertex_credentials = yaml.safe_load(f)    
+    BASE_DIR = Path(__file__).resolve().parent
 
-    vertex_credentials_json = json.dumps(vertex_credentials)
     # If you would like to add tools to your agents, you can learn more about it here:
     # https://docs.crewai.com/concepts/agents#agent-tools
 
-    llm = LLM(
-        model="gemini/gemini-2.0-flash-001",
-        temperature=0.2,
-        max_tokens=8192,
-        vertex_credentials=vertex_credentials_json
-    )
-
     # litellm._turn_on_debug()
 
-    cluster_orders_tool = cluster_orders.ClusterOrdersByGeoTool()\
-        .with_orders_file(Path(BASE_DIR / "data/orders.json"))\
-        .with_geolocations_file(Path(BASE_DIR / "data/geolocations.json"))\
-        .with_static_ref_file(Path(BASE_DIR / "data/static_reference_data.json"))\
-        .with_inventory_file(Path(BASE_DIR / "data/inventory.json"))
-        
-    fleet_tool = fleet.Fleet()
+    @property
+    def agents_config(self) -> dict:
+        return load_agents_config()
+
+    @property
+    def llm(self):
+        return shared_llm()
+
+    @property
+    def cluster_orders_tool(self) -> cluster_orders.ClusterOrdersByGeoTool:
+        return factories.cluster_orders_tool()
+
+    @property
+    def fleet_tool(self):
+        return factories.fleet_tool()
 
-    enrich_clusters_tool = enrich_clustered_orders.EnrichClusteredOrders()
+    @property
+    def enrich_clusters_tool(self):
+        return factories.enrich_clusters_tool()
+
+    @property
+    def route_improver(self):
+        return factories.route_improver()
+
+    @property
+    def fleet_assigner(self):
+        return factories.fleet_assigner()
 
     # Define Agents
- 
-    greedyFleetManagerAgent = Agent(
-        config= agents_config['GreedyFleetManagerAgent'],
-        memory= True,
-        verbose=True,
-        # tools=[fleet_tool],
-        # llm='openai/gpt-4-turbo'
-        llm = llm
-    )
-
-    timeOptimizerAgent = Agent(
-        config = agents_config['TimeOptimizerAgent'],
-        memory= True,
-        verbose= True,
-        # tools=[fleet_tool],
-        llm = llm
-    )
-
-    weightOptimizerAgent = Agent(
-        config = agents_config['WeightOptimizerAgent'],
-        memory= True,
-        verbose= True,
-        # tools=[fleet_tool],
-        llm = llm
-    )
-
-    volumeOptimizerAgent = Agent(
-        config = agents_config['VolumeOptimizerAgent'],
-        memory= True,
-        verbose= True,
-        # tools=[fleet_tool],
-        llm = llm
-    )
-
-    summarizeOptimizationAgent = Agent(
-        config = agents_config['OptimizationSummarizerAgent'],
-        memory= True,
-        verbose= True,
-        llm= llm
-    )
+
+    def _agent(self, name: str) -> Agent:
+        return Agent(
+            config= self.agents_config[name],
+            verbose= True,
+            # tools=[self.fleet_tool],
+            llm= self.llm
+        )
+
+    @cached_property
+    def greedyFleetManagerAgent(self) -> Agent:
+        return self._agent('GreedyFleetManagerAgent')
+
+    @cached_property
+    def timeOptimizerAgent(self) -> Agent:
+        return self._agent('TimeOptimizerAgent')
+
+    @cached_property
+    def weightOptimizerAgent(self) -> Agent:
+        return self._agent('WeightOptimizerAgent')
+
+    @cached_property
+    def volumeOptimizerAgent(self) -> Agent:
+        return self._agent('VolumeOptimizerAgent')
+
+    @cached_property
+    def summarizeOptimizationAgent(self) -> Agent:
+        return self._agent('OptimizationSummarizerAgent')
 
     # Define Tasks
 
-    create_routes = create_routes.create_cluster_orders_into_routes_task(greedyFleetManagerAgent)
-    time_optimize_routes = time_optimize_routes.time_optimize_routes_task(timeOptimizerAgent)
-    weight_optimize_routes = weight_optimize_routes.fine_tune_routes_task(weightOptimizerAgent)
-    volume_optimize_routes = volume_optimize_routes.fine_tune_routes_task(volumeOptimizerAgent)
-    summarize_optized_routes = summarize_optimizations.create_summary_task(summarizeOptimizationAgent)
+    @cached_property
+    def create_routes(self) -> Task:
+        return create_routes.create_cluster_orders_into_routes_task(self.greedyFleetManagerAgent)
+
+    @cached_property
+    def time_optimize_routes(self) -> Task:
+        return time_optimize_routes.time_optimize_routes_task(self.timeOptimizerAgent)
+
+    @cached_property
+    def weight_optimize_routes(self) -> Task:
+        return weight_optimize_routes.fine_tune_routes_task(self.weightOptimizerAgent)
+
+    @cached_property
+    def volume_optimize_routes(self) -> Task:
+        return volume_optimize_routes.fine_tune_routes_task(self.volumeOptimizerAgent)
+
+    @cached_property
+    def summarize_optized_routes(self) -> Task:
+        return summarize_optimizations.create_summary_task(self.summarizeOptimizationAgent)
+
+    def build_native_routes(self, inputs: dict) -> dict:
+        """Pre-step that replaces the greedy LLM stage with the deterministic route builder"""
+        if inputs and "greedy_routes" in inputs:
+            # Already built by the caller, e.g. for a single shard in kickoff_sharded
+            return inputs
 
-    def crew(self) -> Crew:
-        """Creates the DeliveryManagement crew"""
+        h3_clustered_orders = self.cluster_orders_tool.run()
+        greedy_routes = route_builder.build_greedy_routes(h3_clustered_orders, regulatory=self.route_improver.regulatory)
+        greedy_routes = self.route_improver.improve(greedy_routes, get_cluster_index())
+        set_shared("h3_clustered_orders", greedy_routes.model_dump())
+
+        inputs = dict(inputs or {})
+        inputs["greedy_routes"] = greedy_routes.model_dump_json()
+        return inputs
+
+    def crew(self, native_routes: bool = False, summarize: bool = True) -> Crew:
+        """Creates the DeliveryManagement crew
+
+        With native_routes the initial routes are built deterministically before kickoff
+        and the greedy route planning agent is left out of the crew. summarize=False
+        leaves out the summary task, which is only meaningful over all H3 clusters.
+        """
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
+        metrics_listener()
+
+        # cache=True reuses a tool result when an agent repeats a call with the same
+        # arguments within this crew. The tools are deterministic over the run's shared
+        # state, tools whose result changes during a run opt out with cache_function.
+
+        if native_routes:
+            agents = [self.timeOptimizerAgent, self.weightOptimizerAgent, self.volumeOptimizerAgent]
+            tasks = [
+                time_optimize_routes.time_optimize_routes_task(self.timeOptimizerAgent, initial_routes="{greedy_routes}"),
+                self.weight_optimize_routes,
+                self.volume_optimize_routes
+            ]
+            if summarize:
+                agents.append(self.summarizeOptimizationAgent)
+                tasks.append(self.summarize_optized_routes)
+
+            return Crew(
+                agents= agents,
+                tasks= tasks,
+                process=Process.sequential,
+                verbose=True,
+                cache=True,
+                before_kickoff_callbacks=[self.build_native_routes]
+            )
 
         return Crew(
             agents= [self.greedyFleetManagerAgent, self.timeOptimizerAgent, self.weightOptimizerAgent, self.volumeOptimizerAgent, self.summarizeOptimizationAgent],
             tasks= [self.create_routes, self.time_optimize_routes, self.weight_optimize_routes, self.volume_optimize_routes, self.summarize_optized_routes],
             process=Process.sequential,
             verbose=True,
-            cache=False
-        )
\ No newline at end of file
+            cache=True
+        )
+
+    def kickoff(self, inputs: dict = None, native_routes: bool = False, summarize: bool = True, run_id: str = None):
+        """Kicks off crew() with its shared state scoped to one run, dropped when it ends
+
+        Concurrent kickoffs in one process each get their own run id, so their stages
+        never see each other's clusterings or routes.
+        """
+        with scoped_run(run_id):
+            return self.crew(native_routes=native_routes, summarize=summarize).kickoff(inputs=inputs)
+
+    def kickoff_sharded(self, inputs: dict = None, max_workers: int = None, summarize: bool = True, run_id: str = None) -> dict:
+        """Runs the time, weight and volume stages per H3 shard in a process pool
+
+        H3 clusters are independent, so every shard gets its own crew with natively built
+        initial routes. The per-shard routes are merged in H3 cluster order and published
+        to the shared state of the run under the usual stage keys before the optional
+        summary task runs.
+        """
+        with scoped_run(run_id):
+            h3_clustered_orders = self.cluster_orders_tool.run()
+            shard_results = sharding.run_sharded(
+                partial(optimize_shard, inputs=inputs),
+                h3_clustered_orders,
+                max_workers
+            )
+
+            cluster_order = [cluster.h3_index for cluster in h3_clustered_orders.h3_clusters]
+            merged = {}
+            for key in ["h3_clustered_orders"] + SHARDED_STAGE_KEYS:
+                merged[key] = sharding.merge_routes([result[key] for result in shard_results], cluster_order)
+                set_shared(key, merged[key])
+
+            if summarize:
+                self.summarize(inputs)
+
+            return merged
+
+    def kickoff_single_pass(self, inputs: dict = None, summarize: bool = True, run_id: str = None) -> dict:
+        """Replaces the time, weight and volume agents with one native optimizer pass
+
+        The optimizer emits the same per-stage artifacts the three tasks would store,
+        so only the optional summary task talks to the LLM. Shared state is scoped to the run.
+        """
+        with scoped_run(run_id):
+            h3_clustered_orders = self.cluster_orders_tool.run()
+            stages = optimizer.MultiObjectiveOptimizer(self.route_improver, self.fleet_assigner)\
+                .optimize(h3_clustered_orders, get_cluster_index())
+
+            for key, value in stages.items():
+                set_shared(key, value)
+
+            if summarize:
+                self.summarize(inputs)
+
+            return stages
+
+    def summarize(self, inputs: dict = None):
+        """Runs only the summary task over the stage outputs already in shared state"""
+        metrics_listener()
+        return Crew(
+            agents= [self.summarizeOptimizationAgent],
+            tasks= [self.summarize_optized_routes],
+            process=Process.sequential,
+            verbose=True,
+            cache=True
+        ).kickoff(inputs=inputs)
+
+
+def optimize_shard(shard: cluster_orders.H3ClusteredOrdersInput, inputs: dict = None) -> dict:
+    """Process pool worker: optimizes the routes of one shard of H3 clusters
+
+    Pool processes are reused across shards, so every shard runs in its own shared state run.
+    """
+    with scoped_run():
+        publish_h3_clusters(shard)
+        improver = factories.route_improver()
+        greedy_routes = route_builder.build_greedy_routes(shard, regulatory=improver.regulatory)
+        greedy_routes = improver.improve(greedy_routes, get_cluster_index())
+
+        inputs = dict(inputs or {}, greedy_routes=greedy_routes.model_dump_json())
+        result = DeliveryManagement().crew(native_routes=True, summarize=False).kickoff(inputs=inputs)
+
+    stage_outputs = {"h3_clustered_orders": greedy_routes.model_dump()}
+    for key, task_output in zip(SHARDED_STAGE_KEYS, result.tasks_output):
+        stage_outputs[key] = task_output.json_dict
+    return stage_outputs
@@ -0,0 +1,158 @@
+"""
+Process-wide registry of the static reference data files.
+
+    from delivery_management.data.reference_data import load_reference
+    fleet_data = load_reference("fleets.json", FleetData)
+
+Every file is read and parsed once per process and, when a model is given,
+validated once into it. Later calls only stat the file: when its size or
+mtime changed the content is hashed, and parsed again only if the hash
+differs as well. The returned objects are shared by all callers, so models
+are frozen and documents (no model) are returned as read-only views, with
+mappingproxy objects for JSON objects and tuples for arrays.
+
+With a cache directory, DELIVERY_MANAGEMENT_REFERENCE_CACHE_DIR for the
+module registry, every loaded version is also pickled to the directory.
+Other processes, e.g. the workers of a process pool, memory-map the pickle
+instead of parsing and validating the JSON again.
+"""
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from delivery_management.data.load_data import DataLoader
+
+# Bump when the pickled layout changes so stale cache files are ignored
+CACHE_FORMAT_VERSION = 1
+CACHE_DIR_ENV = "DELIVERY_MANAGEMENT_REFERENCE_CACHE_DIR"
+
+
+class FileVersion(NamedTuple):
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+def resolve(path: Union[str, Path]) -> Path:
+    """Bare file names refer to the files shipped in the data package."""
+    path = Path(path)
+    if not path.is_absolute() and path.parent == Path("."):
+        path = DataLoader.BASE_DIR / path
+    return path.resolve()
+
+
+class ReferenceDataRegistry:
+    """Reference data files loaded once per version, see the module docstring."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # Number of files parsed from JSON, cache hits do not count
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._versions: Dict[Path, FileVersion] = {}
+        self._values: Dict[Tuple[Path, Optional[type]], Tuple[str, Any]] = {}
+
+    def get(self, path: Union[str, Path], model: Optional[Type[BaseModel]] = None) -> Any:
+        """The file validated into `model`, or the parsed JSON document without one."""
+        path = resolve(path)
+        with self._lock:
+            stat = path.stat()
+            version = self._versions.get(path)
+            content = None
+            if version is None or (version.size, version.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                content = path.read_bytes()
+                version = self._versions[path] = FileVersion(stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).hexdigest())
+
+            cached = self._values.get((path, model))
+            if cached is not None and cached[0] == version.digest:
+                return cached[1]
+
+            if content is None:
+                content = path.read_bytes()
+                digest = hashlib.sha256(content).hexdigest()
+                if digest != version.digest:
+                    # Rewritten within the same mtime tick
+                    version = self._versions[path] = version._replace(digest=digest)
+
+            value = self._load(version.digest, content, model)
+            self._values[(path, model)] = (version.digest, value)
+            return value
+
+    def version(self, path: Union[str, Path]) -> Optional[FileVersion]:
+        """Version of the file as last loaded, None if it was never loaded."""
+        return self._versions.get(resolve(path))
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._values.clear()
+
+    def cache_path(self, digest: str, model: Optional[Type[BaseModel]]) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        kind = f"{model.__module__}.{model.__qualname__}" if model is not None else "json"
+        key = hashlib.sha256(f"v{CACHE_FORMAT_VERSION}:{digest}:{kind}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.pickle"
+
+    def _load(self, digest: str, content: bytes, model: Optional[Type[BaseModel]]) -> Any:
+        cache_path = self.cache_path(digest, model)
+        if cache_path is not None:
+            value = _read_pickle(cache_path)
+            if value is not None:
+                return value if model is not None else freeze(value)
+
+        self.loads += 1
+        value = json.loads(content)
+        if model is not None:
+            value = model.model_validate(value)
+        if cache_path is not None:
+            _write_pickle(cache_path, value)
+        return value if model is not None else freeze(value)
+
+
+def freeze(value: Any) -> Any:
+    """Read-only view of a parsed JSON document."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _read_pickle(path: Path) -> Any:
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return pickle.loads(buffer)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        # Missing, empty or written by an incompatible version of the models
+        return None
+
+
+def _write_pickle(path: Path, value: Any):
+    """Written to a temporary file and renamed into place, so readers never see a partial file."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(staging, path)
+    except OSError:
+        # Not writable, the registry works without the binary cache
+        pass
+
+
+registry = ReferenceDataRegistry(os.environ.get(CACHE_DIR_ENV) or None)
+
+
+def load_reference(path: Union[str, Path], model: Optional[Type[BaseModel]] = None) -> Any:
+    """Shorthand for registry.get(), bare file names are the shipped data files."""
+    return registry.get(path, model)
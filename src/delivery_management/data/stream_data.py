@@ -0,0 +1,67 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import ijson
+except ImportError:  # ijson is optional, the stdlib scanner below is used instead
+    ijson = None
+
+CHUNK_SIZE = 1 << 16
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def _iter_json_array_stdlib(f, key: str, chunk_size: int) -> Iterator[Any]:
+    """Yield the items of the top-level `key` array, decoding one item at a time."""
+    decoder = json.JSONDecoder()
+    array_start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+
+    buffer = ""
+    while True:
+        match = array_start.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        # Keep a tail so a key split across two chunks is still found
+        buffer = buffer[-256:] + chunk
+
+    pos = 0
+    while True:
+        pos = _SEPARATORS.match(buffer, pos).end()
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            item, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+
+
+def iter_orders(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Stream orders one at a time instead of loading the whole file.
+
+    `.ndjson` / `.jsonl` files hold one order per line, anything else is read as
+    `{"orders": [...]}` with ijson when installed, or the stdlib scanner otherwise.
+    """
+    path = Path(path)
+    if path.suffix in (".ndjson", ".jsonl"):
+        with open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif ijson is not None:
+        with open(path, "rb") as f:
+            yield from ijson.items(f, "orders.item", use_float=True)
+    else:
+        with open(path, "r") as f:
+            yield from _iter_json_array_stdlib(f, "orders", chunk_size)
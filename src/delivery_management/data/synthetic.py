@@ -0,0 +1,152 @@
+"""
+Seeded synthetic workloads in the format of the shipped data files.
+
+    python -m delivery_management.data.synthetic OUT_DIR [scale]
+
+Writes orders.json, geolocations.json, inventory.json and fleets.json.
+SKUs come from the shipped static_reference_data.json so that metadata and
+regulatory categories resolve; static_reference_data.json,
+regulatory_constraints.json and time_constraints.json are used as shipped.
+"""
+import json
+import math
+import random
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple, Tuple
+
+from delivery_management.data.load_data import DataLoader
+
+WAREHOUSE = {"id": "GEO001", "name": "Urban Center", "coordinates": {"latitude": -23.5505, "longitude": -46.6333, "altitude": 760}}
+EARTH_RADIUS_KM = 6371.0088
+# Locations and orders of the shipped data set, the unit of `scale`
+BASE_LOCATIONS = 50
+# Routes never cross H3 cells and synthetic locations spread over more cells
+# than the shipped ones, so small workloads need more vehicles than their scale
+MIN_FLEET_SCALE = 4.0
+
+
+@dataclass
+class WorkloadSpec:
+    locations: int = BASE_LOCATIONS
+    orders: int = BASE_LOCATIONS
+    packages_per_order: Tuple[int, int] = (1, 5)
+    quantity: Tuple[int, int] = (1, 10)
+    spread_km: float = 25.0
+    high_priority_share: float = 0.2
+    # Available stock per SKU relative to the ordered quantity, below 1 creates shortages
+    stock_factor: float = 1.2
+    # Vehicles per fleet type relative to the shipped fleets.json
+    fleet_scale: float = 1.0
+    seed: int = 7
+
+    @classmethod
+    def scaled(cls, scale: float, seed: int = 7) -> "WorkloadSpec":
+        """Shipped data set size times `scale`, with the fleet grown alongside but never below MIN_FLEET_SCALE."""
+        locations = max(1, round(BASE_LOCATIONS * scale))
+        return cls(locations=locations, orders=locations, fleet_scale=max(scale, MIN_FLEET_SCALE), seed=seed)
+
+
+class WorkloadPaths(NamedTuple):
+    orders: Path
+    geolocations: Path
+    inventory: Path
+    fleets: Path
+    static_ref: Path
+    time_constraints: Path
+
+
+def _distance_km(lat1, lon1, lat2, lon2) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def generate_workload(spec: WorkloadSpec) -> dict:
+    """The four data files as dicts, keyed by file name. Equal specs give equal workloads."""
+    rng = random.Random(spec.seed)
+    warehouse = WAREHOUSE["coordinates"]
+
+    locations = []
+    for i in range(spec.locations):
+        # Uniform over a disk of spread_km around the warehouse
+        radius = spec.spread_km * math.sqrt(rng.random())
+        bearing = rng.uniform(0, 2 * math.pi)
+        latitude = warehouse["latitude"] + math.degrees(radius * math.cos(bearing) / EARTH_RADIUS_KM)
+        longitude = warehouse["longitude"] + math.degrees(
+            radius * math.sin(bearing) / (EARTH_RADIUS_KM * math.cos(math.radians(warehouse["latitude"])))
+        )
+        locations.append({
+            "id": f"LOC{201 + i}",
+            "latitude": round(latitude, 6),
+            "longitude": round(longitude, 6),
+            "altitude": round(warehouse["altitude"] + rng.uniform(-40, 40)),
+            "distance_from_warehouse": round(_distance_km(warehouse["latitude"], warehouse["longitude"], latitude, longitude), 2)
+        })
+
+    skus = {}
+    for category_map in DataLoader.load_data("static_reference_data.json")["sku_map"].values():
+        for sku in category_map:
+            skus[sku] = {
+                "weight_kg": round(rng.uniform(0.5, 30), 2),
+                "dimensions_m": {"l": round(rng.uniform(0.1, 1), 2), "w": round(rng.uniform(0.1, 1), 2), "h": round(rng.uniform(0.1, 1), 2)}
+            }
+    sku_ids = list(skus)
+
+    orders, demand = [], dict.fromkeys(sku_ids, 0)
+    for i in range(spec.orders):
+        # Every location gets an order before any location gets a second one
+        location = locations[i] if i < len(locations) else rng.choice(locations)
+        packages = []
+        for sku in rng.sample(sku_ids, min(len(sku_ids), rng.randint(*spec.packages_per_order))):
+            quantity = rng.randint(*spec.quantity)
+            demand[sku] += quantity
+            packages.append({"id": f"PKG{len(packages) + 1:04d}", "sku": sku, "name": f"{sku} package", "quantity": quantity, **skus[sku]})
+        orders.append({
+            "order_id": f"ORD{2001 + i}",
+            "location_id": location["id"],
+            "delivery_date": "2025-04-12",
+            "priority": "high" if rng.random() < spec.high_priority_share else "normal",
+            "geo": {"lat": location["latitude"], "lon": location["longitude"]},
+            "distance_from_warehouse_km": location["distance_from_warehouse"],
+            "packages": packages
+        })
+
+    inventory = [
+        {"id": f"PKG{i + 1:04d}", "sku": sku, "name": f"{sku} package", "available_quantity": math.ceil(demand[sku] * spec.stock_factor), **skus[sku]}
+        for i, sku in enumerate(sku_ids)
+    ]
+
+    fleets = DataLoader.load_data("fleets.json")
+    for fleet in fleets["available_fleets"]:
+        fleet["count"] = math.ceil(fleet["count"] * spec.fleet_scale)
+        fleet["fleets"] = [f"{fleet['type'][0]}{fleet['type_id']}{n:06d}" for n in range(fleet["count"])]
+    fleets["total_fleet_count"] = sum(fleet["count"] for fleet in fleets["available_fleets"])
+
+    return {
+        "orders.json": {"orders": orders},
+        "geolocations.json": {"warehouse_location": WAREHOUSE, "delivery_locations": locations},
+        "inventory.json": {"inventory": inventory},
+        "fleets.json": fleets
+    }
+
+
+def write_workload(spec: WorkloadSpec, out_dir: Path) -> WorkloadPaths:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for filename, data in generate_workload(spec).items():
+        with open(out_dir / filename, "w") as f:
+            json.dump(data, f)
+    return WorkloadPaths(
+        orders=out_dir / "orders.json",
+        geolocations=out_dir / "geolocations.json",
+        inventory=out_dir / "inventory.json",
+        fleets=out_dir / "fleets.json",
+        static_ref=DataLoader.BASE_DIR / "static_reference_data.json",
+        time_constraints=DataLoader.BASE_DIR / "time_constraints.json"
+    )
+
+
+if __name__ == "__main__":
+    write_workload(WorkloadSpec.scaled(float(sys.argv[2]) if len(sys.argv) > 2 else 1.0), Path(sys.argv[1]))
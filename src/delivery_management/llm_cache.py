@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+from crewai.llms.base_llm import BaseLLM
+
+DEFAULT_CACHE_PATH = Path(os.environ.get(
+    "DELIVERY_MANAGEMENT_LLM_CACHE",
+    Path.home() / ".cache" / "delivery_management" / "llm_responses.sqlite"
+))
+DEFAULT_MAX_ENTRIES = 5000
+# A day's plan is replayed while tuning, older responses are of no use
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+def cache_key(task: str, model: str, temperature: Optional[float], messages) -> str:
+    """Hash of everything that decides the response: task, model, temperature and the prompt."""
+    payload = json.dumps(
+        {"task": task, "model": model, "temperature": temperature, "messages": messages},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    LLM responses in a SQLite file, with LRU eviction past `max_entries` and
+    expiry after `ttl_seconds` (None keeps responses forever).
+
+    The connection is opened per process on first use, so process pool
+    shards can share one cache file.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._db = None
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # A connection inherited through fork must not be used by the child
+        if self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, task TEXT, model TEXT, response TEXT, created REAL, accessed REAL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._pid = os.getpid()
+        return self._db
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._connection as connection:
+            row = connection.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, task: str = "", model: str = ""):
+        now = time.time()
+        with self._lock, self._connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, task, model, response, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, task, model, response, now, now)
+            )
+            if self.ttl_seconds is not None:
+                connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+            connection.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._connection as connection:
+            connection.execute("DELETE FROM responses")
+
+    def close(self):
+        if self._db is not None and self._pid == os.getpid():
+            self._db.close()
+        self._pid = self._db = None
+
+
+class CachedLLM(BaseLLM):
+    """
+    Wraps an LLM and answers repeated prompts from a ResponseCache.
+
+    Responses are keyed by task name, model, temperature and the full message
+    list, so a replay of the same plan gets the same answers without calling
+    the model. Agents run their tools from the response text, so tools still
+    execute and publish shared state on a replay. Native function calls, where
+    the LLM runs the tools itself, are never cached.
+    """
+
+    def __init__(self, llm, cache: ResponseCache):
+        super().__init__(model=llm.model, temperature=getattr(llm, "temperature", None), stop=getattr(llm, "stop", None))
+        self.llm = llm
+        self.cache = cache
+
+    def call(
+        self,
+        messages,
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[dict] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None
+    ):
+        # Stop words are set on the wrapper by the agent executor
+        self.llm.stop = self.stop
+        if tools or available_functions:
+            return self.llm.call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        task = getattr(from_task, "name", None) or ""
+        key = cache_key(task, self.model, self.temperature, messages)
+        response = self.cache.get(key)
+        if response is None:
+            response = self.llm.call(messages, tools, callbacks, available_functions, from_task, from_agent)
+            if isinstance(response, str) and response:
+                self.cache.put(key, response, task, self.model)
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling() if hasattr(self.llm, "supports_function_calling") else False
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
@@ -0,0 +1,243 @@
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from crewai import LLM
+from crewai.events import LLMCallCompletedEvent, LLMCallStartedEvent, crewai_event_bus
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM
+
+from delivery_management import llm_cache
+from delivery_management.data.reference_data import load_reference
+from delivery_management.tools.shared_data import get_shared
+
+PROVIDER_ENV = "DELIVERY_MANAGEMENT_LLM"
+VERTEX_CREDENTIALS_ENV = "DELIVERY_MANAGEMENT_VERTEX_CREDENTIALS"
+DEFAULT_VERTEX_CREDENTIALS = Path("/mnt/c/users/sriramkumar.jothiman/secrets/vertex_ai_service_account.json")
+GEMINI = "gemini"
+MOCK = "mock"
+
+# Shared state key each task stores its output under
+TASK_STAGE_KEYS = {
+    "ClusterOrdersIntoRoutes": "h3_clustered_orders",
+    "OptimizeRoutesWithTimeConstraints": "time_optimized_routes",
+    "OptimiseRoutesWithWeight": "weight_optimized_routes",
+    "OptimiseRoutesWithVolume": "volume_optimized_routes"
+}
+SUMMARY_TASK = "SummarizeOptimizationSteps"
+FLEET_TYPES = ["Small", "Medium", "Large"]
+
+
+def gemini_llm(credentials_path: Optional[Path] = None) -> LLM:
+    """The production LLM, Vertex credentials are read here and not at import."""
+    credentials_path = Path(credentials_path or os.environ.get(VERTEX_CREDENTIALS_ENV, DEFAULT_VERTEX_CREDENTIALS))
+    with open(credentials_path, "r") as f:
+        vertex_credentials = json.load(f)
+
+    return LLM(
+        model="gemini/gemini-2.0-flash-001",
+        temperature=0.2,
+        max_tokens=8192,
+        vertex_credentials=json.dumps(vertex_credentials)
+    )
+
+
+def solve_stages() -> Dict[str, dict]:
+    """
+    Stage outputs from the native optimizer over the shipped data files.
+
+    Uses the clustering in shared state when one was published (native routes,
+    shards), otherwise runs the clustering tool, which publishes it.
+    """
+    # Imported here as the solvers load their data files when constructed
+    from delivery_management.optimizer import MultiObjectiveOptimizer
+    from delivery_management.tools.cluster_cache import DEFAULT_CACHE_DIR
+    from delivery_management.tools.cluster_index import get_cluster_index
+    from delivery_management.tools.cluster_orders import ClusterOrdersByGeoTool
+    from delivery_management.tools.fleet_assignment import FleetAssigner
+    from delivery_management.tools.local_search import RouteImprover
+
+    data_dir = Path(__file__).resolve().parent / "data"
+    h3_clustered_orders = get_shared("h3_clusters")
+    if h3_clustered_orders is None:
+        h3_clustered_orders = ClusterOrdersByGeoTool()\
+            .with_orders_file(data_dir / "orders.json")\
+            .with_geolocations_file(data_dir / "geolocations.json")\
+            .with_static_ref_file(data_dir / "static_reference_data.json")\
+            .with_inventory_file(data_dir / "inventory.json")\
+            .with_cache_dir(DEFAULT_CACHE_DIR)\
+            .run()
+
+    geolocations, time_constraints = data_dir / "geolocations.json", data_dir / "time_constraints.json"
+    optimizer = MultiObjectiveOptimizer(
+        RouteImprover.from_data_files(geolocations, time_constraints),
+        FleetAssigner.from_data_files(geolocations, time_constraints)
+    )
+    return optimizer.optimize(h3_clustered_orders, get_cluster_index())
+
+
+def summarize_stages(stages: Dict[str, dict], fleets: Optional[dict] = None) -> dict:
+    """An OptimizationSummary of the stage outputs, in place of the summary agent."""
+    fleets = fleets or load_reference("fleets.json")
+    per_km = {fleet["type"]: fleet["operational_cost"]["per_km"] for fleet in fleets["available_fleets"]}
+    maintenance = {fleet["type"]: fleet["operational_cost"]["maintenance_monthly"] for fleet in fleets["available_fleets"]}
+
+    def distribution(routes: List[dict]) -> Dict[str, int]:
+        counts = dict.fromkeys(FLEET_TYPES, 0)
+        for route in routes:
+            if route.get("fleet_type") in counts:
+                counts[route["fleet_type"]] += 1
+        return counts
+
+    steps = []
+    for task_name, key in TASK_STAGE_KEYS.items():
+        stage = stages.get(key) or {}
+        routes = stage.get("routes", [])
+        unassigned = stage.get("unassigned_routes", [])
+        steps.append({
+            "stage": task_name,
+            "fleet_distribution": distribution(routes),
+            "cost_analysis": {"total_cost": sum(route.get("cost", 0.0) for route in routes)},
+            "time_efficiency": 0.0,
+            "drawbacks": sorted({route["reason"] for route in unassigned}),
+            "improvements": [f"{len(routes)} routes"]
+        })
+
+    final = (stages.get("volume_optimized_routes") or {}).get("routes", [])
+    counts = distribution(final)
+    used = [fleet_type for fleet_type in FLEET_TYPES if counts[fleet_type]]
+    return {
+        "steps": steps,
+        "final_fleet_assignments": dict(
+            counts,
+            total_cost=(stages.get("volume_optimized_routes") or {}).get("total_cost", 0.0),
+            avg_maintenance=sum(maintenance[fleet_type] * counts[fleet_type] for fleet_type in used) / max(len(final), 1)
+        ),
+        "efficiency_gains": {
+            "total_routes": len(final),
+            "cost_per_km": per_km,
+            "maintenance_factors": maintenance,
+            "time_savings": 0.0
+        }
+    }
+
+
+class MockLLM(BaseLLM):
+    """
+    Offline, deterministic stand-in for the crew LLM.
+
+    Every task is answered at once with a final answer, taken from
+    `recordings` (task name to response, e.g. written by record_responses())
+    or else computed by `solver`, which defaults to the native optimizer.
+    `latency_seconds` plus up to `jitter_seconds` of seeded random delay is
+    slept per call, so orchestration, tool and serialization overhead of a
+    kickoff can be measured against a known LLM time. Emits the same call
+    events as crewai.LLM so instrumentation sees the calls.
+    """
+
+    def __init__(
+        self,
+        recordings: Optional[Dict[str, str]] = None,
+        solver: Optional[Callable[[], Dict[str, dict]]] = solve_stages,
+        latency_seconds: float = 0.0,
+        jitter_seconds: float = 0.0,
+        seed: int = 0
+    ):
+        super().__init__(model="mock/deterministic", temperature=0.0)
+        self.recordings = dict(recordings or {})
+        self.solver = solver
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._stages: Optional[Dict[str, dict]] = None
+        self._solved_for = None
+        self._last_response = ""
+
+    @classmethod
+    def from_recordings(cls, path: Path, **kwargs) -> "MockLLM":
+        with open(path, "r") as f:
+            return cls(recordings=json.load(f), **kwargs)
+
+    def reset(self):
+        """Forget solved stages, the next task solves again."""
+        self._stages = self._solved_for = None
+
+    def answer(self, task_name: Optional[str]) -> str:
+        if task_name in self.recordings:
+            return self.recordings[task_name]
+        if task_name is None:
+            # Output conversion calls carry no task, they re-format the last answer
+            return self._last_response
+        if self.solver is None or (task_name not in TASK_STAGE_KEYS and task_name != SUMMARY_TASK):
+            raise ValueError(f"No recorded response or solver output for task: {task_name}")
+
+        # Solve again for a new run or a different clustering, e.g. another shard
+        if self._stages is None or task_name == next(iter(TASK_STAGE_KEYS)) or get_shared("h3_clusters") is not self._solved_for:
+            self._stages = self.solver()
+            self._solved_for = get_shared("h3_clusters")
+        if task_name == SUMMARY_TASK:
+            return json.dumps(summarize_stages(self._stages))
+        return json.dumps(self._stages[TASK_STAGE_KEYS[task_name]])
+
+    def call(
+        self,
+        messages,
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[dict] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None
+    ):
+        crewai_event_bus.emit(self, LLMCallStartedEvent(messages=messages, from_task=from_task, from_agent=from_agent, model=self.model))
+        self.calls += 1
+        delay = self.latency_seconds + (self._rng.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        answer = self.answer(getattr(from_task, "name", None))
+        self._last_response = answer
+        response = answer if from_task is None else f"Thought: I now know the final answer\nFinal Answer: {answer}"
+        crewai_event_bus.emit(self, LLMCallCompletedEvent(
+            messages=messages, response=response, call_type=LLMCallType.LLM_CALL, from_task=from_task, from_agent=from_agent, model=self.model
+        ))
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 1_000_000
+
+
+def record_responses(crew_output, path: Path):
+    """Store the final answer of every task of a kickoff, for MockLLM.from_recordings()."""
+    recordings = {task_output.name: task_output.raw for task_output in crew_output.tasks_output if task_output.name}
+    with open(path, "w") as f:
+        json.dump(recordings, f, indent=2)
+
+
+def create_llm(provider: Optional[str] = None) -> BaseLLM:
+    """
+    LLM of the crew, chosen by `provider` or the DELIVERY_MANAGEMENT_LLM
+    environment variable: "gemini" (default, with the response cache) or
+    "mock". DELIVERY_MANAGEMENT_MOCK_LATENCY sets the mock latency in seconds
+    and DELIVERY_MANAGEMENT_MOCK_RECORDINGS a recordings file to replay.
+    """
+    provider = provider or os.environ.get(PROVIDER_ENV, GEMINI)
+    if provider == MOCK:
+        latency = float(os.environ.get("DELIVERY_MANAGEMENT_MOCK_LATENCY", 0.0))
+        recordings = os.environ.get("DELIVERY_MANAGEMENT_MOCK_RECORDINGS")
+        if recordings:
+            return MockLLM.from_recordings(Path(recordings), latency_seconds=latency)
+        return MockLLM(latency_seconds=latency)
+    if provider == GEMINI:
+        # Replays of the same plan are answered from the local response cache
+        return llm_cache.CachedLLM(gemini_llm(), llm_cache.ResponseCache(llm_cache.DEFAULT_CACHE_PATH))
+    raise ValueError(f"Unknown LLM provider: {provider}")
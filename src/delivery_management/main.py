@@ -6,6 +6,7 @@ from datetime import datetime
 
 from delivery_management.crew import DeliveryManagement
 from delivery_management.tools.enrich_final_output import FinalOutputEnricher
+from delivery_management.tools.shared_data import scoped_run
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -25,7 +26,7 @@ def run():
     
     try:
         # Get initial optimization results
-        results = DeliveryManagement().crew().kickoff(inputs=inputs)
+        results = DeliveryManagement().kickoff(inputs=inputs)
         
         # Enrich with detailed order information
         # enricher = FinalOutputEnricher()._run(results)
@@ -43,7 +44,8 @@ def train():
         "topic": "AI LLMs"
     }
     try:
-        DeliveryManagement().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        with scoped_run():
+            DeliveryManagement().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
@@ -53,7 +55,8 @@ def replay():
     Replay the crew execution from a specific task.
     """
     try:
-        DeliveryManagement().crew().replay(task_id=sys.argv[1])
+        with scoped_run():
+            DeliveryManagement().crew().replay(task_id=sys.argv[1])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
@@ -67,7 +70,8 @@ def test():
         "current_year": str(datetime.now().year)
     }
     try:
-        DeliveryManagement().crew().test(n_iterations=int(sys.argv[1]), model=sys.argv[2], inputs=inputs)
+        with scoped_run():
+            DeliveryManagement().crew().test(n_iterations=int(sys.argv[1]), model=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
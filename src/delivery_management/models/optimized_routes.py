@@ -4,6 +4,7 @@ from typing import List, Literal, Optional
 class Location(BaseModel):
     location_id: str = Field(..., description="Location ID to which the orders to be delivered")
     order_id: str = Field(..., description="Order id to be delivered")
+    load: int = Field(0, description="Load of the location delivered at this stop, locations with packages that may not travel together are split into several loads")
 
 class Route(BaseModel):
     h3_index: Optional[str] = Field(..., description="H3 index representing the clustered area")
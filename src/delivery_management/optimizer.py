@@ -0,0 +1,107 @@
+from typing import Dict, Optional
+
+from delivery_management.models.greedy_routes import GreedyRoutes
+from delivery_management.tools.cluster_index import ClusterIndex
+from delivery_management.tools.cluster_orders import H3ClusteredOrdersInput
+from delivery_management.tools.fleet_assignment import FleetAssigner
+from delivery_management.tools.local_search import RouteImprover
+from delivery_management.tools.regulatory import RegulatoryIndex
+from delivery_management.tools.route_builder import build_greedy_routes
+
+
+def split_to_capacity(
+    routes: GreedyRoutes,
+    index: ClusterIndex,
+    max_weight: float,
+    max_volume: float,
+    regulatory: Optional[RegulatoryIndex] = None
+) -> GreedyRoutes:
+    """
+    Split routes no fleet can carry, keeping the visiting order.
+
+    A new route is started whenever the next stop would push the current one
+    over `max_weight` or `max_volume`, or add a forbidden package combination.
+    A stop is one load of a location, a stop over capacity travels alone.
+    """
+    split = []
+    for route in routes.routes:
+        current, weight, volume, mask = [], 0.0, 0.0, 0
+        seen = set()
+        for location in route.locations:
+            stop = (location.location_id, location.load)
+            totals = index.load_totals(*stop)
+            if stop not in seen and totals:
+                seen.add(stop)
+                conflict = regulatory is not None and not regulatory.is_compatible(mask | totals.category_mask)
+                if current and (conflict or weight + totals.total_weight > max_weight or volume + totals.total_volume > max_volume):
+                    split.append(route.model_copy(update={"locations": current}))
+                    current, weight, volume, mask = [], 0.0, 0.0, 0
+                weight += totals.total_weight
+                volume += totals.total_volume
+                mask |= totals.category_mask
+            current.append(location)
+        if current:
+            split.append(route.model_copy(update={"locations": current}))
+    return GreedyRoutes(routes=split)
+
+
+class MultiObjectiveOptimizer:
+    """
+    Replaces the time, weight and volume LLM stages with one native pass.
+
+    Every route is loaded from the cluster index once. Routes are split to the
+    largest fleet capacity, shortened by local search under the time limits and
+    then given fleets by weight, volume and cost together. The result is
+    reported under the keys the three stages write, so the summary and the
+    optimization collector work unchanged.
+    """
+
+    def __init__(self, improver: RouteImprover, assigner: FleetAssigner):
+        self.improver = improver
+        self.assigner = assigner
+
+    def optimize(self, h3_clustered_orders: H3ClusteredOrdersInput, index: Optional[ClusterIndex] = None) -> Dict[str, dict]:
+        """
+        :param h3_clustered_orders: Output of ClusterOrdersByGeoTool.
+        :param index: Cluster index of `h3_clustered_orders`, built when omitted.
+        :return: `h3_clustered_orders` (the greedy routes) and one artifact per stage key.
+        """
+        index = index or ClusterIndex(h3_clustered_orders)
+        greedy = build_greedy_routes(h3_clustered_orders, regulatory=self.improver.regulatory)
+
+        max_weight, max_volume = self.improver.capacity(None)
+        routes = split_to_capacity(greedy, index, max_weight, max_volume, self.improver.regulatory)
+        routes = self.improver.improve(routes, index)
+        assignment = self.assigner.assign(routes, index)
+
+        service_hours = {location_id: location.est_delivery_time_hours for location_id, location in index.locations.items()}
+        simulator = self.improver.simulator
+
+        time_routes, weight_routes, volume_routes = [], [], []
+        for route in assignment.routes:
+            base = {
+                "h3_index": route.h3_index,
+                "fleet_id": route.fleet_id,
+                "fleet_type": route.fleet_type,
+                "locations": [location.model_dump() for location in route.locations]
+            }
+            schedule = simulator.simulate(route, service_hours)
+            time_routes.append(dict(
+                base,
+                distance_km=route.distance_km,
+                end=schedule.end,
+                driving_hours=schedule.driving_hours,
+                delivery_hours=schedule.delivery_hours,
+                breaks=schedule.breaks,
+                feasible=schedule.feasible
+            ))
+            weight_routes.append(dict(base, total_weight_kg=route.total_weight_kg, weight_utilization=route.weight_utilization, cost=route.cost))
+            volume_routes.append(dict(base, total_volume_m3=route.total_volume_m3, volume_utilization=route.volume_utilization, cost=route.cost))
+
+        unassigned = [route.model_dump() for route in assignment.unassigned]
+        return {
+            "h3_clustered_orders": greedy.model_dump(),
+            "time_optimized_routes": {"routes": time_routes, "unassigned_routes": unassigned},
+            "weight_optimized_routes": {"routes": weight_routes, "unassigned_routes": unassigned},
+            "volume_optimized_routes": {"routes": volume_routes, "unassigned_routes": unassigned, "total_cost": assignment.total_cost}
+        }
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from delivery_management.tools.cluster_orders import H3ClusteredOrdersInput
+
+
+def shard_h3_clusters(h3_clustered_orders: H3ClusteredOrdersInput, shard_count: int) -> List[H3ClusteredOrdersInput]:
+    """
+    Partition the H3 clusters into at most `shard_count` shards of similar size.
+
+    Clusters are never split. Largest clusters (by location count) are placed
+    first on the lightest shard, ties broken by position, so the result is
+    deterministic. Each shard keeps the clusters in their input order and carries
+    the priority orders of its own locations.
+    """
+    clusters = h3_clustered_orders.h3_clusters or []
+    shard_count = max(1, min(shard_count, len(clusters)))
+
+    loads = [0] * shard_count
+    assignment = [[] for _ in range(shard_count)]
+    for index in sorted(range(len(clusters)), key=lambda i: (-len(clusters[i].locations), i)):
+        shard = min(range(shard_count), key=lambda s: (loads[s], s))
+        assignment[shard].append(index)
+        loads[shard] += len(clusters[index].locations)
+
+    shards = []
+    for indexes in assignment:
+        if not indexes:
+            continue
+        shard_clusters = [clusters[i] for i in sorted(indexes)]
+        location_ids = {location.location_id for cluster in shard_clusters for location in cluster.locations}
+        shards.append(H3ClusteredOrdersInput(
+            priority_orders=[order for order in h3_clustered_orders.priority_orders if order.location_id in location_ids],
+            h3_clusters=shard_clusters
+        ))
+    return shards
+
+
+def merge_routes(shard_routes: List[Dict], cluster_order: List[str]) -> Dict:
+    """
+    Merge per-shard {"routes": [...]} outputs into one, ordered by `cluster_order`.
+
+    Routes keep their relative order within an H3 index. Routes whose h3_index is
+    not in `cluster_order` are appended last, in shard order.
+    """
+    rank = {h3_index: position for position, h3_index in enumerate(cluster_order)}
+    routes = [
+        route
+        for result in shard_routes
+        for route in (result or {}).get("routes", [])
+    ]
+    # sorted() is stable, so shard order and in-cluster route order are preserved
+    routes = sorted(routes, key=lambda route: rank.get(route.get("h3_index"), len(rank)))
+    return {"routes": routes}
+
+
+def default_concurrency() -> int:
+    return int(os.environ.get("DELIVERY_MANAGEMENT_WORKERS", os.cpu_count() or 1))
+
+
+def run_sharded(
+    stage: Callable[[H3ClusteredOrdersInput], Any],
+    h3_clustered_orders: H3ClusteredOrdersInput,
+    max_workers: Optional[int] = None
+) -> List[Any]:
+    """
+    Run `stage` once per shard in a process pool and return the results in shard order.
+
+    `stage` must be a picklable module-level callable. With a single worker the
+    shards run inline, which keeps debugging and tests simple.
+    """
+    max_workers = max_workers or default_concurrency()
+    shards = shard_h3_clusters(h3_clustered_orders, max_workers)
+
+    if max_workers == 1 or len(shards) <= 1:
+        return [stage(shard) for shard in shards]
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(shards))) as executor:
+        # map() yields in submission order, which makes the merge deterministic
+        return list(executor.map(stage, shards))
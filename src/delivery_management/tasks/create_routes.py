@@ -1,11 +1,7 @@
 from crewai import Task
 from typing import List
-from pathlib import Path
 from pydantic import BaseModel
-from delivery_management.tools import (
-    cluster_orders,
-    fleet
-)
+from delivery_management.tools import factories
 # ------------------------
 # Pydantic Output Schema
 # ------------------------
@@ -15,21 +11,19 @@ from delivery_management.models.greedy_routes import GreedyRoutes
 # Task Factory
 # --------------------
 def create_cluster_orders_into_routes_task(agent):
-    BASE_DIR = Path(__file__).resolve().parent.parent
-
-    cluster_orders_tool = cluster_orders.ClusterOrdersByGeoTool()\
-        .with_orders_file(Path(BASE_DIR / "data/orders.json"))\
-        .with_geolocations_file(Path(BASE_DIR / "data/geolocations.json"))\
-        .with_static_ref_file(Path(BASE_DIR / "data/static_reference_data.json"))\
-        .with_inventory_file(Path(BASE_DIR / "data/inventory.json"))
-        
-    fleet_tool = fleet.Fleet()
+    cluster_orders_tool = factories.cluster_orders_tool(summary_output=True)
+    fleet_tool = factories.fleet_tool()
+    route_builder_tool = factories.route_builder_tool()
+    cluster_page_tool = factories.cluster_page_tool()
+    cluster_detail_tool = factories.cluster_detail_tool()
 
     from delivery_management.tools.shared_data import set_shared
+    from delivery_management.tools.instrumentation import metrics
     
     def store_output_callback(output: GreedyRoutes):
         # Store both the raw output and parsed model
         set_shared("h3_clustered_orders", output.model_dump())
+        metrics.record_task("ClusterOrdersIntoRoutes", output.raw)
         return output.model_dump()
         
     return Task(
@@ -37,7 +31,9 @@ def create_cluster_orders_into_routes_task(agent):
         callback=store_output_callback,
         description=(
             "You are given a set of validated delivery orders grouped by H3 index using the 'ClusterOrdersByGeoTool'. "
-            "Each H3 cluster contains one or more delivery locations, and each location has one or more orders.\n\n"
+            "Each H3 cluster contains one or more delivery locations, and each location has one or more orders.\n"
+            "The clustering tool returns the first page of per-location totals with short keys explained in 'keys'; "
+            "use 'Get Clustered Orders Page' for the remaining pages and 'Get H3 Cluster Detail' only when package detail is needed.\n\n"
 
             "Your objective is to create initial delivery routes within each H3 cluster by organizing locations such that "
             "the **total estimated delivery time per route does not exceed 8 operational hours**.\n\n"
@@ -47,7 +43,8 @@ def create_cluster_orders_into_routes_task(agent):
             "- Ensure that each route's total delivery time stays within the 8-hour limit.\n"
             "- Minimize unnecessary splitting of locations across multiple routes, but allow it when delivery time constraints require.\n"
             "- Do NOT mix locations from different H3 clusters in the same route.\n"
-            "- Do NOT perform fleet selection or weight/volume optimization in this step.\n\n"
+            "- Do NOT perform fleet selection or weight/volume optimization in this step.\n"
+            "- The 'Build Greedy Routes' tool packs the clustered locations into compliant routes for you; prefer its output.\n\n"
 
             "**Output**:\n"
             "Return a JSON object containing:\n"
@@ -73,7 +70,7 @@ def create_cluster_orders_into_routes_task(agent):
             "}"
         ),
         agent=agent,
-        tools=[cluster_orders_tool, fleet_tool],
+        tools=[cluster_orders_tool, fleet_tool, route_builder_tool, cluster_page_tool, cluster_detail_tool],
         output_json=GreedyRoutes
     )
 
@@ -1,9 +1,7 @@
-from pathlib import Path
 from crewai import Task
 from pydantic import BaseModel, Field
 from typing import Dict, List, Literal, Optional
-from delivery_management.tools import fleet, time_constraints
-from delivery_management.tools.optimization_collector import OptimizationCollectorTool
+from delivery_management.tools import factories
 
 class OptimizationStep(BaseModel):
     stage: str = Field(..., description="Optimization stage name")
@@ -42,12 +40,9 @@ class OptimizationSummary(BaseModel):
     efficiency_gains: EfficiencyMetrics = Field(..., description="Efficiency improvements")
 
 def create_summary_task(agent):
-    collector = OptimizationCollectorTool()
-    fleet_tool = fleet.Fleet()
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    
-    time_constraints_tool = time_constraints.TimeConstraints()\
-        .with_data_file(Path(BASE_DIR / "data/time_constraints.json"))
+    collector = factories.optimization_collector_tool()
+    fleet_tool = factories.fleet_tool()
+    time_constraints_tool = factories.time_constraints_tool()
 
     return Task(
         name="SummarizeOptimizationSteps",
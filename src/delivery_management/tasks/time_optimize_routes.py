@@ -1,37 +1,43 @@
-from pathlib import Path
 from crewai import Task
 
 # ------------------------
 # Pydantic Output Schema
 # ------------------------
 from delivery_management.models.optimized_routes import OptimizedRoutes
-from delivery_management.tools import time_constraints, enrich_clustered_orders, fleet
+from delivery_management.tools import factories
 
 # --------------------
 # Task Factory
 # --------------------
-def time_optimize_routes_task(agent):
+def time_optimize_routes_task(agent, initial_routes: str = None):
 
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    enrich_clusters_tool = enrich_clustered_orders.EnrichClusteredOrders()
-
-    time_constraints_tool = time_constraints.TimeConstraints()\
-        .with_data_file(Path(BASE_DIR / "data/time_constraints.json"))
-    
-    fleet_tool = fleet.Fleet()
+    enrich_clusters_tool = factories.enrich_clusters_tool()
+    time_constraints_tool = factories.time_constraints_tool()
+    fleet_tool = factories.fleet_tool()
+    travel_matrix_tool = factories.travel_matrix_tool()
+    schedule_simulator_tool = factories.schedule_simulator_tool()
     
     from delivery_management.tools.shared_data import set_shared
+    from delivery_management.tools.instrumentation import metrics
     
     def store_output_callback(output: OptimizedRoutes) -> OptimizedRoutes:
         set_shared("time_optimized_routes", output)
+        metrics.record_task("OptimizeRoutesWithTimeConstraints", output.raw)
         return output.model_dump()
         
+    # When the greedy stage is skipped, the initial routes are interpolated from the kickoff inputs
+    initial_routes_section = (
+        f"Initial delivery routes:\n{initial_routes}\n\n" if initial_routes else ""
+    )
+
     return Task(
         name="OptimizeRoutesWithTimeConstraints",
         callback=store_output_callback,
-        description=(
+        description=initial_routes_section + (
             "You are given initial delivery routes clustered by H3 index but not yet optimized for time or weight constraints.\n\n"
             "Use the 'EnrichClusteredOrders' tool to enrich these routes with accurate total weight and volume across all locations. "
+            "Use the 'Travel Matrix' tool for real distances and peak-adjusted travel times of a route instead of average distances. "
+            "Use the 'Route Schedule Simulator' tool to check a candidate route against operational hours, driving rests and peak traffic before returning it. "
 
             "Your task: First optimize these routes for time constraints:\n"
             "- Delivery window: 08:00 AM–05:00 PM (9 hours).\n"
@@ -86,7 +92,7 @@ def time_optimize_routes_task(agent):
             "}"
         ),
         agent=agent,
-        tools=[enrich_clusters_tool, time_constraints_tool, fleet_tool],
+        tools=[enrich_clusters_tool, time_constraints_tool, fleet_tool, travel_matrix_tool, schedule_simulator_tool],
         output_json=OptimizedRoutes
     )
 
@@ -1,20 +1,19 @@
 from crewai import Task
-from pathlib import Path
 from delivery_management.models.optimized_routes import OptimizedRoutes
-from delivery_management.tools import fleet, time_constraints, enrich_clustered_orders
+from delivery_management.tools import factories
 
 def fine_tune_routes_task(agent):
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    
-    enrich_clusters_tool = enrich_clustered_orders.EnrichClusteredOrders()
-    time_constraints_tool = time_constraints.TimeConstraints()\
-        .with_data_file(Path(BASE_DIR / "data/time_constraints.json"))
-    fleet_tool = fleet.Fleet()
+    enrich_clusters_tool = factories.enrich_clusters_tool()
+    time_constraints_tool = factories.time_constraints_tool()
+    fleet_tool = factories.fleet_tool()
+    fleet_assignment_tool = factories.fleet_assignment_tool()
     
     from delivery_management.tools.shared_data import set_shared
+    from delivery_management.tools.instrumentation import metrics
     
     def store_output_callback(output) -> OptimizedRoutes:
         set_shared("volume_optimized_routes", output)
+        metrics.record_task("OptimiseRoutesWithVolume", output.raw)
         return output.model_dump()
         
     return Task(
@@ -27,6 +26,7 @@ def fine_tune_routes_task(agent):
             "2. Only adjust packing configurations\n"
             "3. Never violate previous optimizations\n"
             "- Use available fleet volume capacity limits from the 'FleetTool'.\n"
+            "- Use the 'Assign Fleets' tool for a capacity-feasible, lowest-cost fleet assignment that respects fleet counts, and start from its result.\n"
             "- Do NOT exceed a fleet's maximum volume capacity under any circumstances\n"
             "- Preserve weight and time constraints from previous optimizations\n\n"
             "Fleet Volume Capacity Evaluation:\n"
@@ -71,6 +71,6 @@ def fine_tune_routes_task(agent):
             "}"
         ),
         agent=agent,
-        tools=[enrich_clusters_tool, fleet_tool, time_constraints_tool],
+        tools=[enrich_clusters_tool, fleet_tool, time_constraints_tool, fleet_assignment_tool],
         output_json=OptimizedRoutes
     )
\ No newline at end of file
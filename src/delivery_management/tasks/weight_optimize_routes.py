@@ -1,14 +1,17 @@
 from crewai import Task
 from delivery_management.models.optimized_routes import OptimizedRoutes
-from delivery_management.tools import fleet, enrich_clustered_orders
+from delivery_management.tools import factories
 
 def fine_tune_routes_task(agent):
-    enrich_clusters_tool = enrich_clustered_orders.EnrichClusteredOrders()
-    fleet_tool = fleet.Fleet()
+    enrich_clusters_tool = factories.enrich_clusters_tool()
+    fleet_tool = factories.fleet_tool()
+    fleet_assignment_tool = factories.fleet_assignment_tool()
     from delivery_management.tools.shared_data import set_shared
+    from delivery_management.tools.instrumentation import metrics
     
     def store_output_callback(output) -> OptimizedRoutes:
         set_shared("weight_optimized_routes", output)
+        metrics.record_task("OptimiseRoutesWithWeight", output.raw)
         return output.json_dict
         
     return Task(
@@ -22,6 +25,7 @@ def fine_tune_routes_task(agent):
             "3. Only adjust fleet assignments when necessary\n"
             "Follow these rules absolutely:\n"
             "- Use available fleet weight capacity limits from the 'FleetTool'.\n"
+            "- Use the 'Assign Fleets' tool for a capacity-feasible, lowest-cost fleet assignment that respects fleet counts, and start from its result.\n"
             "- Do NOT exceed a fleet's maximum weight capacity under any circumstances\n"
             "- Preserve time constraints - no route may exceed 8 delivery hours\n\n"
             "Fleet Weight Capacity Evaluation:\n"
@@ -49,7 +53,7 @@ def fine_tune_routes_task(agent):
             "- You MAY redistribute locations between routes **within the same H3 index only**.\n"
             "- Do NOT drop or ignore any location with valid orders.\n"
             "- Priority orders (priority: true) must always be preserved in a valid route.\n"
-            "- Orders with inventory_issue: true must remain excluded.\n\n"
+            "- Orders in inventory_issues are already handled: blocked orders are not in the clusters, partial orders only carry their reserved quantities.\n\n"
 
             "If no improvement is possible for a route, retain it as is.\n\n"
             "**Your response must be a valid JSON object. Do not wrap it in quotes. Include a meaningful explanations with appropriate metrics. **" 
@@ -73,6 +77,6 @@ def fine_tune_routes_task(agent):
             "}"
         ),
         agent=agent,
-        tools=[enrich_clusters_tool, fleet_tool],
+        tools=[enrich_clusters_tool, fleet_tool, fleet_assignment_tool],
         output_json=OptimizedRoutes
     )
@@ -0,0 +1,274 @@
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+import h3
+import numpy as np
+
+from delivery_management.data.reference_data import load_reference
+from delivery_management.tools.cluster_orders import ColumnarClusteredOrders, H3ClusteredOrdersInput, H3LocationCluster
+from delivery_management.tools.fleet import FleetData
+from delivery_management.tools.route_builder import MAX_DELIVERY_HOURS
+
+BASE_RESOLUTION = 6
+# About 0.1 km² per cell, finer cells no longer separate delivery areas
+MAX_RESOLUTION = 9
+DEFAULT_VEHICLES_PER_CELL = 2
+DEFAULT_MIN_FILL = 0.25
+MERGE_RINGS = 1
+
+
+@dataclass(frozen=True)
+class LoadBand:
+    """
+    Target load of one H3 cell. A cell fits when its weight, volume and
+    delivery hours are all within the maximum, and is sparse when none of
+    them reaches min_fill of the maximum.
+    """
+    max_weight: float
+    max_volume: float
+    max_hours: float
+    min_fill: float = DEFAULT_MIN_FILL
+
+    @classmethod
+    def from_fleets(
+        cls,
+        fleet_data: Optional[FleetData] = None,
+        vehicles_per_cell: float = DEFAULT_VEHICLES_PER_CELL,
+        min_fill: float = DEFAULT_MIN_FILL
+    ) -> "LoadBand":
+        """A cell holds what `vehicles_per_cell` of the largest vehicles deliver in one working day."""
+        fleet_data = fleet_data or load_reference("fleets.json", FleetData)
+        return cls(
+            max_weight=max(fleet.capacity.weight for fleet in fleet_data.available_fleets) * vehicles_per_cell,
+            max_volume=max(fleet.capacity.volume for fleet in fleet_data.available_fleets) * vehicles_per_cell,
+            max_hours=MAX_DELIVERY_HOURS * vehicles_per_cell,
+            min_fill=min_fill
+        )
+
+    def fill(self, load: np.ndarray) -> float:
+        """Largest share of the maximum used by a (weight, volume, hours) load."""
+        return max(load[0] / self.max_weight, load[1] / self.max_volume, load[2] / self.max_hours)
+
+
+def assign_adaptive_cells(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    weight: np.ndarray,
+    volume: np.ndarray,
+    hours: np.ndarray,
+    band: LoadBand,
+    resolution: int = BASE_RESOLUTION,
+    max_resolution: int = MAX_RESOLUTION
+) -> List[str]:
+    """
+    H3 cell of every location, at mixed resolutions, see AdaptiveCells for the
+    cells themselves.
+
+    Starting from `resolution`, a cell over the band is replaced by its
+    children one resolution finer, until it fits, holds a single location or
+    reaches max_resolution. Then every sparse cell is merged into the lightest
+    neighbor within MERGE_RINGS that still fits together with it, lightest
+    sparse cells first. Neighbors are the cells of h3.grid_disk mapped to the
+    assigned cells covering them, a coarser parent or finer children, so cells
+    next to a split area merge across resolutions. A merged cell keeps the
+    index of the cell it was merged into.
+    """
+    cell_rows, cells = _assign_cells(latitude, longitude, weight, volume, hours, band, resolution, max_resolution)
+    row_cells = [None] * len(latitude)
+    for cell, rows in cell_rows.items():
+        for row in rows:
+            row_cells[row] = cells.owner[cell]
+    return row_cells
+
+
+def _assign_cells(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    weight: np.ndarray,
+    volume: np.ndarray,
+    hours: np.ndarray,
+    band: LoadBand,
+    resolution: int,
+    max_resolution: int
+) -> Tuple[Dict[str, List[int]], "AdaptiveCells"]:
+    """The rows of every assigned cell and the AdaptiveCells, see assign_adaptive_cells()."""
+    loads = np.column_stack((weight, volume, hours)).astype(np.float64)
+    lat, lng = latitude.tolist(), longitude.tolist()
+
+    cell_rows: Dict[str, List[int]] = {}
+    split = set()
+    pending = [(resolution, list(range(len(lat))))]
+    while pending:
+        res, rows = pending.pop()
+        children = defaultdict(list)
+        for row in rows:
+            children[h3.latlng_to_cell(lat[row], lng[row], res)].append(row)
+        for cell, members in children.items():
+            if res < max_resolution and len(members) > 1 and band.fill(loads[members].sum(axis=0)) > 1:
+                split.add(cell)
+                pending.append((res + 1, members))
+            else:
+                cell_rows[cell] = members
+
+    # Assigned cells under each coarser ancestor, the neighbors finer than a grid_disk cell
+    descendants = defaultdict(list)
+    for cell in cell_rows:
+        for res in range(resolution, h3.get_resolution(cell)):
+            descendants[h3.cell_to_parent(cell, res)].append(cell)
+
+    def covering(cell: str) -> List[str]:
+        """Assigned cells overlapping `cell`: itself, its parent at a coarser resolution or its children."""
+        ancestors = [h3.cell_to_parent(cell, res) for res in range(resolution, h3.get_resolution(cell))]
+        return [c for c in (cell, *ancestors) if c in cell_rows] + descendants.get(cell, [])
+
+    owner = {cell: cell for cell in cell_rows}
+    cluster_cells = {cell: [cell] for cell in cell_rows}
+    cluster_load = {cell: loads[rows].sum(axis=0) for cell, rows in cell_rows.items()}
+
+    merged = True
+    while merged:
+        merged = False
+        sparse = sorted(
+            (cluster for cluster, load in cluster_load.items() if band.fill(load) < band.min_fill),
+            key=lambda cluster: (band.fill(cluster_load[cluster]), cluster)
+        )
+        for cluster in sparse:
+            if cluster not in cluster_load:
+                # Absorbed by another sparse cell earlier in this pass
+                continue
+            neighbors = {
+                owner[covered]
+                for cell in cluster_cells[cluster]
+                for neighbor in h3.grid_disk(cell, MERGE_RINGS)
+                for covered in covering(neighbor)
+            } - {cluster}
+            fitting = [neighbor for neighbor in neighbors if band.fill(cluster_load[neighbor] + cluster_load[cluster]) <= 1]
+            if not fitting:
+                continue
+
+            target = min(fitting, key=lambda neighbor: (band.fill(cluster_load[neighbor]), neighbor))
+            for cell in cluster_cells[cluster]:
+                owner[cell] = target
+            cluster_cells[target].extend(cluster_cells.pop(cluster))
+            cluster_load[target] = cluster_load[target] + cluster_load.pop(cluster)
+            merged = True
+
+    return cell_rows, AdaptiveCells(owner, split, resolution, max_resolution)
+
+
+class AdaptiveCells:
+    """
+    The mixed-resolution cells of an adaptive clustering, each mapped to the H3
+    index of the cell it was merged into, and the coarser cells that were split.
+    Places points that were not part of the assignment without overlapping them.
+    """
+
+    def __init__(self, owner: Dict[str, str], split: Set[str], resolution: int = BASE_RESOLUTION, max_resolution: int = MAX_RESOLUTION):
+        self.owner = owner
+        self.split = split
+        self.resolution = resolution
+        self.max_resolution = max_resolution
+
+    @classmethod
+    def from_h3_clusters(
+        cls,
+        h3_clustered_orders: H3ClusteredOrdersInput,
+        band: Optional[LoadBand] = None,
+        resolution: int = BASE_RESOLUTION,
+        max_resolution: int = MAX_RESOLUTION
+    ) -> "AdaptiveCells":
+        """
+        Cells of a clustering rebalanced with the same band, assigned again from
+        its locations. Raises ValueError when a location is not in the cell of its cluster.
+        """
+        band = band or LoadBand.from_fleets()
+        locations = [location for cluster in h3_clustered_orders.h3_clusters or [] for location in cluster.locations]
+        _, cells = _assign_cells(*_location_columns(locations), band, resolution, max_resolution)
+
+        for cluster in h3_clustered_orders.h3_clusters or []:
+            for location in cluster.locations:
+                if cells.cell_of(location.location.latitude, location.location.longitude) != cluster.h3_index:
+                    raise ValueError(f"Location {location.location_id} is not in the adaptive cell of its cluster, the clustering was rebalanced with another band")
+        return cells
+
+    def cell_of(self, latitude: float, longitude: float) -> str:
+        """
+        H3 index of the cluster whose cells hold the point. A point outside all
+        of them gets the coarsest cell that overlaps none.
+        """
+        for res in range(self.resolution, self.max_resolution):
+            cell = h3.latlng_to_cell(latitude, longitude, res)
+            if cell not in self.split:
+                return self.owner.get(cell, cell)
+        cell = h3.latlng_to_cell(latitude, longitude, self.max_resolution)
+        return self.owner.get(cell, cell)
+
+
+def rebalance_columnar(
+    columnar: ColumnarClusteredOrders,
+    band: Optional[LoadBand] = None,
+    resolution: int = BASE_RESOLUTION,
+    max_resolution: int = MAX_RESOLUTION
+) -> ColumnarClusteredOrders:
+    """The clustering with cells from assign_adaptive_cells(), package and location rows are unchanged."""
+    band = band or LoadBand.from_fleets()
+    row_cells = assign_adaptive_cells(
+        columnar.latitude,
+        columnar.longitude,
+        columnar.location_weight,
+        columnar.location_volume,
+        columnar.est_delivery_time_hours,
+        band,
+        resolution,
+        max_resolution
+    )
+
+    cell_index = {}
+    cell_codes = np.fromiter(
+        (cell_index.setdefault(cell, len(cell_index)) for cell in row_cells),
+        dtype=np.int32,
+        count=len(row_cells)
+    )
+    return replace(
+        columnar,
+        cell_codes=cell_codes,
+        h3_indexes=list(cell_index),
+        cell_weight=np.bincount(cell_codes, weights=columnar.location_weight, minlength=len(cell_index)),
+        cell_volume=np.bincount(cell_codes, weights=columnar.location_volume, minlength=len(cell_index)),
+        cell_delivery_hours=np.bincount(cell_codes, weights=columnar.est_delivery_time_hours, minlength=len(cell_index))
+    )
+
+
+def rebalance_h3_clusters(
+    h3_clustered_orders: H3ClusteredOrdersInput,
+    band: Optional[LoadBand] = None,
+    resolution: int = BASE_RESOLUTION,
+    max_resolution: int = MAX_RESOLUTION
+) -> H3ClusteredOrdersInput:
+    """rebalance_columnar() for the pydantic clustering, with copies of the locations and orders under their new h3_index."""
+    band = band or LoadBand.from_fleets()
+    locations = [location for cluster in h3_clustered_orders.h3_clusters or [] for location in cluster.locations]
+    row_cells = assign_adaptive_cells(*_location_columns(locations), band, resolution, max_resolution)
+
+    clusters = defaultdict(list)
+    for location, cell in zip(locations, row_cells):
+        orders = [order.model_copy(update={"h3_index": cell}) for order in location.orders]
+        clusters[cell].append(location.model_copy(update={"orders": orders}))
+
+    return H3ClusteredOrdersInput(
+        priority_orders=h3_clustered_orders.priority_orders,
+        h3_clusters=[H3LocationCluster(h3_index=cell, locations=cell_locations) for cell, cell_locations in clusters.items()],
+        inventory_issues=h3_clustered_orders.inventory_issues
+    )
+
+
+def _location_columns(locations) -> Tuple[np.ndarray, ...]:
+    """Latitude, longitude, weight, volume and delivery hours of LocationCluster objects."""
+    return (
+        np.array([location.location.latitude for location in locations], dtype=np.float64),
+        np.array([location.location.longitude for location in locations], dtype=np.float64),
+        np.array([location.total_weight for location in locations], dtype=np.float64),
+        np.array([location.total_volume for location in locations], dtype=np.float64),
+        np.array([location.est_delivery_time_hours for location in locations], dtype=np.float64)
+    )
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import fields
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from delivery_management.tools.cluster_orders import ColumnarClusteredOrders, PriorityOrder
+from delivery_management.tools.inventory import InventoryIssue
+
+# Bump when the layout of ColumnarClusteredOrders changes so stale bundles are ignored
+CACHE_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "DELIVERY_MANAGEMENT_CACHE_DIR",
+    Path.home() / ".cache" / "delivery_management" / "clustered_orders"
+))
+
+_VOCABULARIES = ["order_ids", "skus", "location_ids", "h3_indexes"]
+
+
+def cache_key(paths: Iterable[Path], resolution: int, reserve_inventory: bool = True) -> str:
+    """Content hash of the input files together with the H3 resolution and inventory reservation."""
+    digest = hashlib.sha256(f"v{CACHE_FORMAT_VERSION}:res{resolution}:inv{int(reserve_inventory)}".encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def save_columnar(columnar: ColumnarClusteredOrders, directory: Path):
+    """
+    Write the clustering as one .npy file per array plus a JSON file with the
+    vocabularies. The bundle is written to a temporary directory and renamed
+    into place, so readers never see a partial bundle.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=directory.parent, prefix=f".{directory.name}-"))
+    try:
+        for field in fields(columnar):
+            value = getattr(columnar, field.name)
+            if isinstance(value, np.ndarray):
+                np.save(staging / f"{field.name}.npy", value, allow_pickle=False)
+
+        meta = {name: getattr(columnar, name) for name in _VOCABULARIES}
+        meta["priority_orders"] = [order.model_dump() for order in columnar.priority_orders]
+        meta["inventory_issues"] = [issue.model_dump() for issue in columnar.inventory_issues]
+        with open(staging / "meta.json", "w") as f:
+            json.dump(meta, f)
+
+        os.replace(staging, directory)
+    except OSError:
+        # Another process published the same bundle first, or the target is not writable
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def load_columnar(directory: Path) -> Optional[ColumnarClusteredOrders]:
+    """Memory-map a bundle written by save_columnar, None if there is no usable bundle."""
+    directory = Path(directory)
+    meta_path = directory / "meta.json"
+    if not meta_path.exists():
+        return None
+
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+
+    values = {name: meta[name] for name in _VOCABULARIES}
+    values["priority_orders"] = [PriorityOrder(**order) for order in meta["priority_orders"]]
+    values["inventory_issues"] = [InventoryIssue(**issue) for issue in meta["inventory_issues"]]
+    for field in fields(ColumnarClusteredOrders):
+        if field.name not in values:
+            array_path = directory / f"{field.name}.npy"
+            if not array_path.exists():
+                return None
+            values[field.name] = np.load(array_path, mmap_mode="r")
+
+    return ColumnarClusteredOrders(**values)
@@ -0,0 +1,231 @@
+import copy
+import operator
+from collections import defaultdict
+from functools import reduce
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from delivery_management.tools.cluster_orders import (
+    ClusteredOrder,
+    H3ClusteredOrdersInput,
+    H3LocationCluster,
+    LocationCluster
+)
+from delivery_management.tools.regulatory import load_of
+from delivery_management.tools.shared_data import get_shared, set_shared
+
+
+class LocationTotals(NamedTuple):
+    order_id: Optional[str]
+    order_count: int
+    total_weight: float
+    total_volume: float
+    est_delivery_time_hours: float
+    category_mask: int = 0
+
+
+def location_loads(location: LocationCluster) -> List[LocationTotals]:
+    """
+    Totals of every load of a location, see LocationCluster.load_masks. A
+    split location shares its delivery hours between the loads by weight.
+    """
+    load_masks = location.load_masks or [0]
+    if len(load_masks) == 1:
+        return [LocationTotals(
+            order_id=location.orders[0].order_id if location.orders else None,
+            order_count=len(location.orders),
+            total_weight=location.total_weight,
+            total_volume=location.total_volume,
+            est_delivery_time_hours=location.est_delivery_time_hours,
+            category_mask=load_masks[0]
+        )]
+
+    packages = [[] for _ in load_masks]
+    for order in location.orders:
+        packages[load_of(order.category_mask, load_masks)].append(order)
+    loads = []
+    for load_mask, orders in zip(load_masks, packages):
+        weight = sum(order.weight for order in orders)
+        share = weight / location.total_weight if location.total_weight else 1 / len(load_masks)
+        loads.append(LocationTotals(
+            order_id=orders[0].order_id if orders else None,
+            order_count=len(orders),
+            total_weight=weight,
+            total_volume=sum(order.volume for order in orders),
+            est_delivery_time_hours=location.est_delivery_time_hours * share,
+            category_mask=load_mask
+        ))
+    return loads
+
+
+class ClusterIndex:
+    """
+    Lookup tables over an H3ClusteredOrdersInput, so enrichment tools never scan
+    or re-serialize the clustered orders.
+
+    The index keeps a reference to the clustering it was built from and is
+    rebuilt by get_cluster_index() when a different clustering is published.
+    An index is never modified once built, updated() derives the index of a
+    new clustering version from it.
+    """
+
+    def __init__(self, h3_clustered_orders: H3ClusteredOrdersInput):
+        self.source = h3_clustered_orders
+        self.clusters: Dict[str, H3LocationCluster] = {}
+        self.locations: Dict[str, LocationCluster] = {}
+        self.location_h3: Dict[str, str] = {}
+        orders = defaultdict(list)
+        location_orders = defaultdict(list)
+
+        for cluster in h3_clustered_orders.h3_clusters or []:
+            # setdefault keeps the first match, like the linear scans this replaces
+            self.clusters.setdefault(cluster.h3_index, cluster)
+            for location in cluster.locations:
+                self.locations.setdefault(location.location_id, location)
+                self.location_h3.setdefault(location.location_id, cluster.h3_index)
+                for order in location.orders:
+                    orders[order.order_id].append(order)
+                    location_orders[(location.location_id, order.order_id)].append(order)
+
+        self.orders: Dict[str, List[ClusteredOrder]] = dict(orders)
+        self._location_orders = dict(location_orders)
+        self._location_totals: Dict[str, LocationTotals] = {}
+        self._load_totals: Dict[str, List[LocationTotals]] = {}
+
+    def updated(self, h3_clustered_orders: H3ClusteredOrdersInput, h3_indexes: Iterable[str]) -> "ClusterIndex":
+        """
+        Index of `h3_clustered_orders`, a new version of this index's source in
+        which only the clusters `h3_indexes` were added, changed or removed.
+        Entries of the other cells are carried over without scanning them.
+        """
+        h3_indexes = set(h3_indexes)
+        index = copy.copy(self)
+        index.source = h3_clustered_orders
+        index.clusters = dict(self.clusters)
+        index.locations = dict(self.locations)
+        index.location_h3 = dict(self.location_h3)
+        index.orders = dict(self.orders)
+        index._location_orders = dict(self._location_orders)
+        index._location_totals = dict(self._location_totals)
+        index._load_totals = dict(self._load_totals)
+
+        stale = set()
+        order_ids = set()
+        for h3_index in h3_indexes:
+            cluster = index.clusters.pop(h3_index, None)
+            for location in cluster.locations if cluster is not None else []:
+                if index.location_h3.get(location.location_id) != h3_index:
+                    continue
+                del index.locations[location.location_id]
+                del index.location_h3[location.location_id]
+                index._location_totals.pop(location.location_id, None)
+                index._load_totals.pop(location.location_id, None)
+                for order in location.orders:
+                    index._location_orders.pop((location.location_id, order.order_id), None)
+                    stale.add(id(order))
+                    order_ids.add(order.order_id)
+
+        added = defaultdict(list)
+        location_orders = defaultdict(list)
+        for cluster in h3_clustered_orders.h3_clusters or []:
+            if cluster.h3_index not in h3_indexes:
+                continue
+            index.clusters.setdefault(cluster.h3_index, cluster)
+            for location in cluster.locations:
+                index.locations.setdefault(location.location_id, location)
+                index.location_h3.setdefault(location.location_id, cluster.h3_index)
+                for order in location.orders:
+                    added[order.order_id].append(order)
+                    location_orders[(location.location_id, order.order_id)].append(order)
+        index._location_orders.update(location_orders)
+
+        # Lists are rebuilt, never appended to, as they are shared with this index
+        for order_id in order_ids | added.keys():
+            orders = [order for order in index.orders.get(order_id, []) if id(order) not in stale] + added.get(order_id, [])
+            if orders:
+                index.orders[order_id] = orders
+            else:
+                index.orders.pop(order_id, None)
+        return index
+
+    def location_in_cluster(self, h3_index: str, location_id: str) -> Optional[LocationCluster]:
+        """The location if it belongs to the given H3 cluster, else None."""
+        if self.location_h3.get(location_id) != h3_index:
+            return None
+        return self.locations[location_id]
+
+    def location_totals(self, location_id: str) -> Optional[LocationTotals]:
+        """Memoized totals of a location, taken from the precomputed LocationCluster fields."""
+        totals = self._location_totals.get(location_id)
+        if totals is None:
+            location = self.locations.get(location_id)
+            if location is None:
+                return None
+            totals = self._location_totals[location_id] = LocationTotals(
+                order_id=location.orders[0].order_id if location.orders else None,
+                order_count=len(location.orders),
+                total_weight=location.total_weight,
+                total_volume=location.total_volume,
+                est_delivery_time_hours=location.est_delivery_time_hours,
+                category_mask=reduce(operator.or_, location.load_masks, 0)
+            )
+        return totals
+
+    def load_totals(self, location_id: str, load: int = 0) -> Optional[LocationTotals]:
+        """Memoized totals of one load of a location, the whole location unless it is split."""
+        loads = self._load_totals.get(location_id)
+        if loads is None:
+            location = self.locations.get(location_id)
+            if location is None:
+                return None
+            loads = self._load_totals[location_id] = location_loads(location)
+        return loads[load] if 0 <= load < len(loads) else None
+
+    def orders_at(self, location_id: str, order_id: str, load: Optional[int] = None) -> List[ClusteredOrder]:
+        """Package rows of an order at a given location, only those of `load` when given."""
+        orders = self._location_orders.get((location_id, order_id), [])
+        if load is None or not orders:
+            return orders
+        load_masks = self.locations[location_id].load_masks
+        if len(load_masks) <= 1:
+            return orders if load == 0 else []
+        return [order for order in orders if load_of(order.category_mask, load_masks) == load]
+
+
+def publish_h3_clusters(h3_clustered_orders: H3ClusteredOrdersInput):
+    """Store the clustering in shared state together with its lookup index."""
+    set_shared("h3_clusters", h3_clustered_orders)
+    set_shared("h3_cluster_index", ClusterIndex(h3_clustered_orders))
+
+
+def publish_h3_cluster_changes(
+    previous: H3ClusteredOrdersInput,
+    h3_clustered_orders: H3ClusteredOrdersInput,
+    h3_indexes: Iterable[str]
+):
+    """
+    publish_h3_clusters() for a new version of `previous` that differs only in
+    the clusters `h3_indexes`. The shared index of `previous` is updated for
+    those cells, it is rebuilt only if the shared index is of another clustering.
+    """
+    index = get_shared("h3_cluster_index")
+    if index is None or index.source is not previous:
+        publish_h3_clusters(h3_clustered_orders)
+        return
+    set_shared("h3_clusters", h3_clustered_orders)
+    set_shared("h3_cluster_index", index.updated(h3_clustered_orders, h3_indexes))
+
+
+def get_cluster_index() -> Optional[ClusterIndex]:
+    """Index of the current shared `h3_clusters`, rebuilt only if the clustering changed."""
+    h3_clustered_orders = get_shared("h3_clusters")
+    if h3_clustered_orders is None:
+        return None
+
+    index = get_shared("h3_cluster_index")
+    if index is None or index.source is not h3_clustered_orders:
+        if isinstance(h3_clustered_orders, dict):
+            h3_clustered_orders = H3ClusteredOrdersInput.model_validate(h3_clustered_orders)
+            set_shared("h3_clusters", h3_clustered_orders)
+        index = ClusterIndex(h3_clustered_orders)
+        set_shared("h3_cluster_index", index)
+    return index
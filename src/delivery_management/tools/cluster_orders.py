@@ -1,15 +1,24 @@
 import json
 import h3
-from typing import Any, Type
+import numpy as np
+from dataclasses import dataclass, field
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from crewai.tools import BaseTool
-from pydantic import BaseModel, PrivateAttr
-from delivery_management.tools.shared_data import set_shared
-
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+from delivery_management.data.reference_data import load_reference
+from delivery_management.data.stream_data import iter_orders
+from delivery_management.tools.inventory import (
+    InventoryIssue,
+    OrderReservation,
+    SKUStockIndex,
+    deliverable_orders,
+    inventory_issues,
+    reserve_inventory
+)
+from delivery_management.tools.regulatory import RegulatoryIndex, sku_category_masks
+from delivery_management.tools.instrumentation import instrumented
 
 class LocationMeta(BaseModel):
     location_id: str = Field(..., description="Location ID of geo location")
@@ -32,6 +41,7 @@ class ClusteredOrder(BaseModel):
     product: str = Field(..., description="name of the product")
     quantity: int = Field(..., description="quantity of the product")
     metadata: Optional[SKUMeta] = Field(..., description="metadata of the product")
+    category_mask: int = Field(0, description="category bit of the product, see RegulatoryIndex")
 
 class LocationCluster(BaseModel):
     location_id: str = Field(..., description="unique id of the location")
@@ -39,6 +49,7 @@ class LocationCluster(BaseModel):
     total_weight: float = Field(...,description="sum of weights of all the orders in the cluster")
     total_volume: float = Field(...,description="sum of volumes of all the orders in the cluster")
     est_delivery_time_hours: float = Field(...,description="estimated delivery time for the location")
+    load_masks: List[int] = Field(default_factory=list, description="category mask of every load the location is delivered in, packages that may not travel together are in separate loads")
     orders: List[ClusteredOrder] = Field(..., description="list of clustered orders")
 
 class ProductSummary(BaseModel):
@@ -64,10 +75,76 @@ class ClusteredOrdersInput(BaseModel):
     locations: List[LocationCluster] = Field(..., description="unique id of the location")
     priority_orders: List[PriorityOrder] = Field(..., description="priority orders list")
     h3_clusters: Optional[List[H3LocationCluster]] = Field(..., description="Geo clustered locations using H3 index")
+    inventory_issues: List[InventoryIssue] = Field(default_factory=list, description="orders short of stock, blocked orders are not clustered")
 
 class H3ClusteredOrdersInput(BaseModel):
     priority_orders: List[PriorityOrder] = Field(..., description="priority orders list")
     h3_clusters: Optional[List[H3LocationCluster]] = Field(..., description="Geo clustered locations using H3 index")
+    inventory_issues: List[InventoryIssue] = Field(default_factory=list, description="orders short of stock, blocked orders are not clustered")
+
+@dataclass
+class ColumnarClusteredOrders:
+    """
+    Struct-of-arrays form of the H3 clustered orders.
+
+    Package rows reference their order, SKU and location by integer code and
+    location rows reference their H3 cell the same way. Every vocabulary keeps
+    first-seen order, which is also the order of the pydantic output.
+    """
+    # package rows
+    order_codes: np.ndarray
+    sku_codes: np.ndarray
+    location_codes: np.ndarray
+    quantity: np.ndarray
+    weight: np.ndarray
+    volume: np.ndarray
+    # location rows
+    latitude: np.ndarray
+    longitude: np.ndarray
+    location_weight: np.ndarray
+    location_volume: np.ndarray
+    est_delivery_time_hours: np.ndarray
+    cell_codes: np.ndarray
+    # cell rows
+    cell_weight: np.ndarray
+    cell_volume: np.ndarray
+    cell_delivery_hours: np.ndarray
+    # vocabularies
+    order_ids: List[str]
+    skus: List[str]
+    location_ids: List[str]
+    h3_indexes: List[str]
+    priority_orders: List[PriorityOrder]
+    inventory_issues: List[InventoryIssue] = field(default_factory=list)
+
+    def packages_by_location(self) -> List[np.ndarray]:
+        """Package row indexes of every location, in input order."""
+        rows = np.argsort(self.location_codes, kind="stable")
+        counts = np.bincount(self.location_codes, minlength=len(self.location_ids))
+        return np.split(rows, np.cumsum(counts)[:-1])
+
+    def locations_by_cell(self) -> List[np.ndarray]:
+        """Location row indexes of every H3 cell, in input order."""
+        rows = np.argsort(self.cell_codes, kind="stable")
+        counts = np.bincount(self.cell_codes, minlength=len(self.h3_indexes))
+        return np.split(rows, np.cumsum(counts)[:-1])
+
+
+def package_weight_volume(package: dict):
+    """Total weight and volume of a package line, i.e. multiplied by its quantity."""
+    quantity = package["quantity"]
+    dimensions = package.get("dimensions_m", {})
+    volume = (
+        (dimensions["l"] * dimensions["w"] * dimensions["h"])
+        if all(k in dimensions for k in ["l", "w", "h"]) else 0.0
+    ) * quantity
+    return package.get("weight_kg", 0) * quantity, volume
+
+
+def estimate_delivery_hours(weights: np.ndarray) -> np.ndarray:
+    """15 minutes of delivery time per 50 kg, rounded like the per-location estimate."""
+    return np.array([round(hours, 2) for hours in (((weights / 50) * 15) / 60).tolist()], dtype=np.float64)
+
 
 class ClusterOrdersByGeoTool(BaseTool):
 
@@ -77,11 +154,23 @@ class ClusterOrdersByGeoTool(BaseTool):
     _orders_path: str = PrivateAttr(default=None)
     _geolocations_path: str = PrivateAttr(default=None)
     _static_ref_path: str = PrivateAttr(default=None)
+    _regulatory_path: str = PrivateAttr(default=None)
     _inventory_path: str = PrivateAttr(default=None)
     _orders: list = PrivateAttr(default_factory=list)
     _geolocations: dict = PrivateAttr(default_factory=dict)
     _static_ref: dict = PrivateAttr(default_factory=dict)
     _inventory: dict = PrivateAttr(default_factory=dict)
+    _sku_masks: dict = PrivateAttr(default_factory=dict)
+    _regulatory: Optional[RegulatoryIndex] = PrivateAttr(default=None)
+    _stock: Optional[SKUStockIndex] = PrivateAttr(default=None)
+    _reserve_inventory: bool = PrivateAttr(default=True)
+    _reservations: Dict[str, OrderReservation] = PrivateAttr(default_factory=dict)
+    _streaming: bool = PrivateAttr(default=False)
+    _cache_dir: Optional[Path] = PrivateAttr(default=None)
+    _summary_budget: Optional[int] = PrivateAttr(default=None)
+    _encode_ids: bool = PrivateAttr(default=False)
+    _adaptive: bool = PrivateAttr(default=False)
+    _load_band: Any = PrivateAttr(default=None)
     
     # Builder methods
     def with_orders_file(self, path: Path):
@@ -100,22 +189,93 @@ class ClusterOrdersByGeoTool(BaseTool):
         self._inventory_path = path
         return self
 
+    def with_regulatory_file(self, path: Path):
+        """Forbidden package combinations, the shipped regulatory_constraints.json when not set."""
+        self._regulatory_path = path
+        return self
+
+    def with_streaming_ingestion(self, enabled: bool = True):
+        self._streaming = enabled
+        return self
+
+    def with_cache_dir(self, path: Path):
+        self._cache_dir = path
+        return self
+
+    def with_inventory_reservation(self, enabled: bool = True):
+        self._reserve_inventory = enabled
+        return self
+
+    def with_summary_output(self, token_budget: int = 4000, encode_ids: bool = False):
+        """Return the first page of per-location totals to the agent instead of every package."""
+        self._summary_budget = token_budget
+        self._encode_ids = encode_ids
+        return self
+
+    def with_adaptive_resolution(self, enabled: bool = True, band=None):
+        """
+        Split overloaded H3 cells into finer ones and merge sparse neighbors until
+        every cell fits a LoadBand, by default the one derived from fleets.json.
+        """
+        self._adaptive = enabled
+        self._load_band = band
+        return self
+
     def load_json_data(self):
         with open(self._orders_path, 'r') as f:
             self._orders = json.load(f)['orders']
 
-        with open(self._geolocations_path, 'r') as f:
-            self._geolocations = json.load(f)
-
-        with open(self._static_ref_path, 'r') as f:
-            self._static_ref = json.load(f)
+        self.load_reference_data()
+
+    def load_reference_data(self):
+        """Load every input except the orders, these are bounded by locations and SKUs."""
+        # Static files are shared through the reference data registry, parsed once per version
+        self._geolocations = load_reference(self._geolocations_path)
+        self._static_ref = load_reference(self._static_ref_path)
+        self._sku_masks = sku_category_masks(self._static_ref)
+        self._regulatory = RegulatoryIndex.from_data(
+            self._static_ref,
+            load_reference(self._regulatory_path or "regulatory_constraints.json")
+        )
 
         with open(self._inventory_path, 'r') as f:
             inventory_data = json.load(f)
             self._inventory = {
                 item["sku"]: item["available_quantity"]
                 for item in inventory_data.get("inventory", [])
-            }            
+            }
+            self._stock = SKUStockIndex.from_inventory(inventory_data)
+
+    def reserve_inventory(self, order_source: Callable[[], Iterable[dict]]) -> Dict[str, OrderReservation]:
+        """
+        Reserve stock for every order before clustering, high priority first.
+        Each call starts from the full inventory.
+        """
+        self._reservations = reserve_inventory(order_source, self._stock.copy()) if self._reserve_inventory else {}
+        return self._reservations
+
+    def deliverable(self, orders: Iterable[dict]) -> Iterable[dict]:
+        """Orders with blocked ones dropped and partial ones cut to their reserved quantities."""
+        return deliverable_orders(orders, self._reservations)
+
+    @property
+    def sku_masks(self) -> Dict[str, int]:
+        return self._sku_masks
+
+    @property
+    def regulatory(self) -> RegulatoryIndex:
+        return self._regulatory
+
+    def category_mask(self, skus) -> int:
+        """OR of the category bits of the given SKUs, unknown SKUs add nothing."""
+        mask = 0
+        for sku in skus:
+            mask |= self._sku_masks.get(sku, 0)
+        return mask
+
+    def load_masks(self, skus) -> List[int]:
+        """Category masks of the loads the given SKUs are delivered in, see RegulatoryIndex.loads()."""
+        return self._regulatory.loads(self.category_mask(skus))
 
     @staticmethod
     def build_location_map(geolocations: dict) -> dict:
@@ -140,15 +300,13 @@ class ClusterOrdersByGeoTool(BaseTool):
 
     def cluster(self) -> ClusteredOrdersInput:
         location_map = self.build_location_map(self._geolocations)
+        self.reserve_inventory(lambda: self._orders)
         sku_map_flat = self.flatten_sku_map(self._static_ref.get("sku_map", {}))
 
         location_clusters = defaultdict(list)
-        product_counter = defaultdict(int)
-        weight_volume_tracker = defaultdict(lambda: {"weight": 0.0, "volume": 0.0})
         priority_orders = []
-        raw_order_index = defaultdict(list)  # For tracking which order needs what SKUs
 
-        for order in self._orders:
+        for order in self.deliverable(self._orders):
             order_id = order.get("order_id")
             location_id = order.get("location_id")
             priority = order.get("priority")
@@ -181,22 +339,16 @@ class ClusterOrdersByGeoTool(BaseTool):
                     volume=volume,
                     product=sku,
                     quantity=quantity,
-                    metadata=metadata
+                    metadata=metadata,
+                    category_mask=self._sku_masks.get(sku, 0)
                 ))
 
-                product_counter[sku] += quantity
-                raw_order_index[sku].append((order_id, location_id, quantity))
-
-                weight_volume_tracker[location_id]["weight"] += weight * quantity
-                weight_volume_tracker[location_id]["volume"] += volume * quantity
-                weight_volume_tracker["__total__"]["weight"] += weight * quantity
-                weight_volume_tracker["__total__"]["volume"] += volume * quantity
-
         # 🧾 Final outputs
         return ClusteredOrdersInput(
             h3_clusters=None,
             locations=self._build_location_clusters(location_clusters, location_map),
-            priority_orders=priority_orders
+            priority_orders=priority_orders,
+            inventory_issues=inventory_issues(self._reservations)
         )
 
     def _build_location_clusters(self, location_clusters, location_map) -> List[LocationCluster]:
@@ -207,7 +359,8 @@ class ClusterOrdersByGeoTool(BaseTool):
                 orders=orders,
                 total_weight=(total_weight := sum(order.weight for order in orders)),
                 total_volume=sum(order.volume for order in orders),
-                est_delivery_time_hours=round(((total_weight / 50) * 15) / 60, 2)
+                est_delivery_time_hours=round(((total_weight / 50) * 15) / 60, 2),
+                load_masks=self.load_masks(order.product for order in orders)
             )
             for loc_id, orders in location_clusters.items()
         ]
@@ -254,12 +407,330 @@ class ClusterOrdersByGeoTool(BaseTool):
         # Return the updated clustered orders input with H3 clustering applied
         return H3ClusteredOrdersInput(
             priority_orders=clustered_orders_input.priority_orders,
-            h3_clusters=h3_location_clusters
+            h3_clusters=h3_location_clusters,
+            inventory_issues=clustered_orders_input.inventory_issues
         )
 
-    def _run(self):
+    def _extract_columns(self):
+        """Single pass over the raw orders that only appends scalars to flat lists."""
+        order_index, sku_index, location_index = {}, {}, {}
+        order_codes, sku_codes, location_codes = [], [], []
+        quantities, unit_weights, lengths, widths, heights = [], [], [], [], []
+        priority_orders = []
+
+        self.reserve_inventory(lambda: self._orders)
+        for order in self.deliverable(self._orders):
+            order_id = order.get("order_id")
+            location_id = order.get("location_id")
+            priority = order.get("priority")
+            packages = order.get("packages", [])
+
+            if priority == "high":
+                priority_orders.append(PriorityOrder(
+                    order_id=order_id,
+                    location_id=location_id,
+                    priority=priority,
+                ))
+
+            if not packages:
+                continue
+
+            order_code = order_index.setdefault(order_id, len(order_index))
+            location_code = location_index.setdefault(location_id, len(location_index))
+
+            for package in packages:
+                dimensions = package.get("dimensions_m", {})
+                order_codes.append(order_code)
+                location_codes.append(location_code)
+                sku_codes.append(sku_index.setdefault(package["sku"], len(sku_index)))
+                quantities.append(package["quantity"])
+                unit_weights.append(package.get("weight_kg", 0))
+                lengths.append(dimensions.get("l", np.nan))
+                widths.append(dimensions.get("w", np.nan))
+                heights.append(dimensions.get("h", np.nan))
+
+        return {
+            "order_ids": list(order_index),
+            "skus": list(sku_index),
+            "location_ids": list(location_index),
+            "order_codes": np.asarray(order_codes, dtype=np.int32),
+            "sku_codes": np.asarray(sku_codes, dtype=np.int32),
+            "location_codes": np.asarray(location_codes, dtype=np.int32),
+            "quantity": np.asarray(quantities, dtype=np.int64),
+            "unit_weight": np.asarray(unit_weights, dtype=np.float64),
+            "dimensions": (
+                np.asarray(lengths, dtype=np.float64),
+                np.asarray(widths, dtype=np.float64),
+                np.asarray(heights, dtype=np.float64)
+            ),
+            "priority_orders": priority_orders,
+            "inventory_issues": inventory_issues(self._reservations)
+        }
+
+    @staticmethod
+    def _assign_h3_cells(latitude: np.ndarray, longitude: np.ndarray, resolution: int):
+        """H3 cell per location, resolving each distinct coordinate only once."""
+        coordinates, inverse = np.unique(
+            np.column_stack((latitude, longitude)), axis=0, return_inverse=True
+        )
+        unique_cells = [h3.latlng_to_cell(lat, lng, resolution) for lat, lng in coordinates.tolist()]
+
+        cell_index = {}
+        cell_codes = np.fromiter(
+            (cell_index.setdefault(unique_cells[i], len(cell_index)) for i in inverse.ravel().tolist()),
+            dtype=np.int32,
+            count=len(latitude)
+        )
+        return cell_codes, list(cell_index)
+
+    def cluster_columnar(self, resolution: int) -> ColumnarClusteredOrders:
+        """
+        Vectorized equivalent of cluster() followed by _apply_h3_geo_clustering().
+
+        :param resolution: The resolution level for H3 clustering (e.g., 6).
+        :return: ColumnarClusteredOrders, no pydantic models are built.
+        """
+        columns = self._extract_columns()
+        location_map = self.build_location_map(self._geolocations)
+
+        quantity = columns["quantity"]
+        weight = columns["unit_weight"] * quantity
+        unit_volume = columns["dimensions"][0] * columns["dimensions"][1] * columns["dimensions"][2]
+        volume = np.where(np.isnan(unit_volume), 0.0, unit_volume) * quantity
+
+        location_ids = columns["location_ids"]
+        missing = [loc_id for loc_id in location_ids if loc_id not in location_map]
+        if missing:
+            raise ValueError(f"No geolocation found for locations: {', '.join(missing)}")
+        latitude = np.fromiter((location_map[loc_id]["latitude"] for loc_id in location_ids), dtype=np.float64, count=len(location_ids))
+        longitude = np.fromiter((location_map[loc_id]["longitude"] for loc_id in location_ids), dtype=np.float64, count=len(location_ids))
+
+        location_codes = columns["location_codes"]
+        location_weight = np.bincount(location_codes, weights=weight, minlength=len(location_ids))
+        location_volume = np.bincount(location_codes, weights=volume, minlength=len(location_ids))
+        est_delivery_time_hours = estimate_delivery_hours(location_weight)
+
+        cell_codes, h3_indexes = self._assign_h3_cells(latitude, longitude, resolution)
+
+        return ColumnarClusteredOrders(
+            order_codes=columns["order_codes"],
+            sku_codes=columns["sku_codes"],
+            location_codes=location_codes,
+            quantity=quantity,
+            weight=weight,
+            volume=volume,
+            latitude=latitude,
+            longitude=longitude,
+            location_weight=location_weight,
+            location_volume=location_volume,
+            est_delivery_time_hours=est_delivery_time_hours,
+            cell_codes=cell_codes,
+            cell_weight=np.bincount(cell_codes, weights=location_weight, minlength=len(h3_indexes)),
+            cell_volume=np.bincount(cell_codes, weights=location_volume, minlength=len(h3_indexes)),
+            cell_delivery_hours=np.bincount(cell_codes, weights=est_delivery_time_hours, minlength=len(h3_indexes)),
+            order_ids=columns["order_ids"],
+            skus=columns["skus"],
+            location_ids=location_ids,
+            h3_indexes=h3_indexes,
+            priority_orders=columns["priority_orders"],
+            inventory_issues=columns["inventory_issues"]
+        )
+
+    def to_h3_clustered_orders(self, columnar: ColumnarClusteredOrders) -> H3ClusteredOrdersInput:
+        """Build the pydantic output from the columnar result, this is the only place models are created."""
+        location_map = self.build_location_map(self._geolocations)
+        sku_map_flat = self.flatten_sku_map(self._static_ref.get("sku_map", {}))
+        sku_metadata = [SKUMeta(**sku_map_flat[sku]) if sku in sku_map_flat else None for sku in columnar.skus]
+        sku_masks = [self._sku_masks.get(sku, 0) for sku in columnar.skus]
+
+        order_codes = columnar.order_codes.tolist()
+        sku_codes = columnar.sku_codes.tolist()
+        quantity = columnar.quantity.tolist()
+        weight = columnar.weight.tolist()
+        volume = columnar.volume.tolist()
+        location_weight = columnar.location_weight.tolist()
+        location_volume = columnar.location_volume.tolist()
+        est_delivery_time_hours = columnar.est_delivery_time_hours.tolist()
+        packages_by_location = columnar.packages_by_location()
+
+        h3_clusters = []
+        for cell_code, location_rows in enumerate(columnar.locations_by_cell()):
+            h3_index = columnar.h3_indexes[cell_code]
+            locations = []
+            for loc in location_rows.tolist():
+                loc_id = columnar.location_ids[loc]
+                rows = packages_by_location[loc].tolist()
+                category_mask = 0
+                for row in rows:
+                    category_mask |= sku_masks[sku_codes[row]]
+                locations.append(LocationCluster(
+                    location_id=loc_id,
+                    location=LocationMeta(**location_map[loc_id]),
+                    total_weight=location_weight[loc],
+                    total_volume=location_volume[loc],
+                    est_delivery_time_hours=est_delivery_time_hours[loc],
+                    load_masks=self._regulatory.loads(category_mask),
+                    orders=[
+                        ClusteredOrder(
+                            h3_index=h3_index,
+                            order_id=columnar.order_ids[order_codes[row]],
+                            weight=weight[row],
+                            volume=volume[row],
+                            product=columnar.skus[sku_codes[row]],
+                            quantity=quantity[row],
+                            metadata=sku_metadata[sku_codes[row]],
+                            category_mask=sku_masks[sku_codes[row]]
+                        )
+                        for row in rows
+                    ]
+                ))
+            h3_clusters.append(H3LocationCluster(h3_index=h3_index, locations=locations))
+
+        return H3ClusteredOrdersInput(
+            priority_orders=columnar.priority_orders,
+            h3_clusters=h3_clusters,
+            inventory_issues=columnar.inventory_issues
+        )
+
+    def cluster_streaming(self, resolution: int) -> H3ClusteredOrdersInput:
+        """
+        Stream orders from the orders file and fold every package into the
+        per-location and per-H3 aggregates as it arrives.
+
+        Each location keeps one ClusteredOrder per package with the SKU
+        metadata, the same rows as the columnar path. Peak memory is bounded by
+        package lines, not by the orders file.
+        The inventory reservation reads the file twice more before clustering.
+
+        :param resolution: The resolution level for H3 clustering (e.g., 6).
+        """
+        location_map = self.build_location_map(self._geolocations)
+        sku_map_flat = self.flatten_sku_map(self._static_ref.get("sku_map", {}))
+
+        location_totals = {}  # location_id -> [weight, volume, h3_index]
+        location_packages = defaultdict(list)  # location_id -> [(order_id, sku, weight, volume, quantity)]
+        cell_locations = defaultdict(list)
+        priority_orders = []
+
+        self.reserve_inventory(lambda: iter_orders(self._orders_path))
+        for order in self.deliverable(iter_orders(self._orders_path)):
+            order_id = order.get("order_id")
+            location_id = order.get("location_id")
+            priority = order.get("priority")
+            packages = order.get("packages", [])
+
+            if priority == "high":
+                priority_orders.append(PriorityOrder(
+                    order_id=order_id,
+                    location_id=location_id,
+                    priority=priority,
+                ))
+
+            if not packages:
+                continue
+
+            totals = location_totals.get(location_id)
+            if totals is None:
+                if location_id not in location_map:
+                    raise ValueError(f"No geolocation found for locations: {location_id}")
+                location_meta = location_map[location_id]
+                h3_index = h3.latlng_to_cell(location_meta["latitude"], location_meta["longitude"], resolution)
+                totals = location_totals[location_id] = [0.0, 0.0, h3_index]
+                cell_locations[h3_index].append(location_id)
+
+            package_rows = location_packages[location_id]
+            for package in packages:
+                weight, volume = package_weight_volume(package)
+
+                totals[0] += weight
+                totals[1] += volume
+                package_rows.append((order_id, package["sku"], weight, volume, package["quantity"]))
+
+        h3_clusters = []
+        for h3_index, location_ids in cell_locations.items():
+            locations = []
+            for loc_id in location_ids:
+                total_weight, total_volume, _ = location_totals[loc_id]
+                locations.append(LocationCluster(
+                    location_id=loc_id,
+                    location=LocationMeta(**location_map[loc_id]),
+                    total_weight=total_weight,
+                    total_volume=total_volume,
+                    est_delivery_time_hours=round(((total_weight / 50) * 15) / 60, 2),
+                    load_masks=self.load_masks(sku for _, sku, _, _, _ in location_packages[loc_id]),
+                    orders=[
+                        ClusteredOrder(
+                            h3_index=h3_index,
+                            order_id=order_id,
+                            weight=weight,
+                            volume=volume,
+                            product=sku,
+                            quantity=quantity,
+                            metadata=SKUMeta(**sku_map_flat[sku]) if sku in sku_map_flat else None,
+                            category_mask=self._sku_masks.get(sku, 0)
+                        )
+                        for order_id, sku, weight, volume, quantity in location_packages[loc_id]
+                    ]
+                ))
+            h3_clusters.append(H3LocationCluster(h3_index=h3_index, locations=locations))
+
+        return H3ClusteredOrdersInput(
+            priority_orders=priority_orders,
+            h3_clusters=h3_clusters,
+            inventory_issues=inventory_issues(self._reservations)
+        )
+
+    def cluster_columnar_cached(self, resolution: int) -> ColumnarClusteredOrders:
+        """
+        cluster_columnar() backed by an on-disk bundle keyed by the content of the
+        input files and the resolution. A hit memory-maps the arrays and only loads
+        the reference data needed to build models.
+        """
+        # Imported here as the cache module depends on the models above
+        from delivery_management.tools.cluster_cache import cache_key, load_columnar, save_columnar
+
+        if self._cache_dir is None:
+            self.load_json_data()
+            return self.cluster_columnar(resolution)
+
+        input_paths = [self._orders_path, self._geolocations_path, self._static_ref_path, self._inventory_path]
+        bundle_dir = Path(self._cache_dir) / cache_key(input_paths, resolution, self._reserve_inventory)
+
+        columnar = load_columnar(bundle_dir)
+        if columnar is not None:
+            self.load_reference_data()
+            return columnar
+
         self.load_json_data()
-        clusteredOrders = self.cluster()
-        h3_clustered_orders = self._apply_h3_geo_clustering(clusteredOrders, 6)
-        set_shared("h3_clusters", h3_clustered_orders)
+        columnar = self.cluster_columnar(resolution)
+        save_columnar(columnar, bundle_dir)
+        return columnar
+
+    @instrumented
+    def _run(self):
+        # Imported here as these modules depend on the models above
+        from delivery_management.tools.adaptive_clustering import BASE_RESOLUTION, rebalance_columnar, rebalance_h3_clusters
+        from delivery_management.tools.cluster_index import publish_h3_clusters
+        from delivery_management.tools.prompt_payload import ClusterSummarizer
+
+        # One tool serves every crew of the process, see tools.factories. The reference
+        # data stays on it, the orders and reservations of this call live on a copy so
+        # concurrent runs never see each other's.
+        self.load_reference_data()
+        run = self.model_copy()
+
+        if run._streaming:
+            h3_clustered_orders = run.cluster_streaming(BASE_RESOLUTION)
+            if run._adaptive:
+                h3_clustered_orders = rebalance_h3_clusters(h3_clustered_orders, run._load_band)
+        else:
+            columnar = run.cluster_columnar_cached(BASE_RESOLUTION)
+            if run._adaptive:
+                # Cheap over the location rows, so the cached bundle stays at the base resolution
+                columnar = rebalance_columnar(columnar, run._load_band)
+            h3_clustered_orders = run.to_h3_clustered_orders(columnar)
+
+        publish_h3_clusters(h3_clustered_orders)
+        if self._summary_budget is not None:
+            return ClusterSummarizer(h3_clustered_orders, self._summary_budget, self._encode_ids).page(0)
         return h3_clustered_orders
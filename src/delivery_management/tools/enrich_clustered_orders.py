@@ -1,16 +1,16 @@
 from crewai.tools import BaseTool
 
-import json
 from typing import List
 from pydantic import BaseModel, Field
 
-from backup.models.clustered_orders import H3ClusteredOrdersInput
 from delivery_management.models.greedy_routes import GreedyRoutes
-from delivery_management.tools.shared_data import get_shared
+from delivery_management.tools.cluster_index import get_cluster_index
+from delivery_management.tools.instrumentation import instrumented
 
 class EnrichedLocation(BaseModel):
     location_id: str = Field(..., description="unique id of the delivery location")
     order_id: str = Field(..., description="unique id of the order")
+    load: int = Field(0, description="load of the location delivered at this stop, see LocationCluster.load_masks")
     order_count: int = Field(..., description="total package count")
     total_weight_kg: float = Field(..., description="total weight of the products to be delivered in that location")
     total_volume_m3: float = Field(..., description="total volume of the products to be delivered in that location")
@@ -39,16 +39,11 @@ class EnrichClusteredOrders(BaseTool):
         clustered_routes_output: GreedyRoutes
     ) -> EnrichedRoutesOutput:
         
-        # print(clustered_routes_output.model_dump_json())
-        clustered_orders_input: H3ClusteredOrdersInput = get_shared("h3_clusters")
-        # Create a lookup map for location_id to orders
-        # location_map = {locations.location_id: locations for locations in clustered_orders_input.h3_clusters}
-
-        location_map = {
-            location.location_id: location
-            for cluster in clustered_orders_input.h3_clusters
-            for location in cluster.locations
-        }
+        # Location totals come precomputed from ClusterOrdersByGeoTool and are memoized
+        # on the cluster index, which is rebuilt only when h3_clusters changes
+        index = get_cluster_index()
+        if hasattr(clustered_routes_output, "model_dump"):
+            clustered_routes_output = clustered_routes_output.model_dump()
 
         enriched_routes = []
 
@@ -56,27 +51,31 @@ class EnrichClusteredOrders(BaseTool):
             enriched_locations = []
             route_weight = 0.0
             route_volume = 0.0
+            seen_locations = set()
 
             for location in route["locations"]:
                 loc_id = location["location_id"]
-                location_cluster = location_map.get(loc_id)
-                if not location_cluster:
+                stop = (loc_id, location.get("load", 0))
+                # A stop listed once per order is still delivered (and counted) once
+                if stop in seen_locations:
                     continue
+                seen_locations.add(stop)
 
-                location_weight = sum(order.weight for order in location_cluster.orders)
-                location_volume = sum(order.volume for order in location_cluster.orders)
-                order_id = location_cluster.orders[0].order_id if location_cluster.orders else None
+                totals = index.load_totals(*stop) if index else None
+                if not totals:
+                    continue
 
-                route_weight += location_weight
-                route_volume += location_volume
+                route_weight += totals.total_weight
+                route_volume += totals.total_volume
 
                 enriched_location = EnrichedLocation(
                     location_id=loc_id,
-                    order_id=order_id,
-                    order_count=len(location_cluster.orders),
-                    total_weight_kg=location_weight,
-                    total_volume_m3=location_volume,
-                    est_delivery_time_hours= round(((location_weight/50) * 15)/60, 2)
+                    order_id=totals.order_id,
+                    load=stop[1],
+                    order_count=totals.order_count,
+                    total_weight_kg=totals.total_weight,
+                    total_volume_m3=totals.total_volume,
+                    est_delivery_time_hours=totals.est_delivery_time_hours
                 )
                 enriched_locations.append(enriched_location)
             
@@ -97,6 +96,6 @@ class EnrichClusteredOrders(BaseTool):
 
         return EnrichedRoutesOutput(routes=enriched_routes)
 
+    @instrumented
     def _run(self, clustered_routes_output: GreedyRoutes) -> EnrichedRoutesOutput:
-        print(clustered_routes_output)
         return self.enrich_routes(clustered_routes_output)
\ No newline at end of file
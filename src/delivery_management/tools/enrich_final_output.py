@@ -1,7 +1,8 @@
 from crewai.tools import BaseTool
 from typing import Any, Dict, List
 from pydantic import BaseModel, Field
-from delivery_management.tools.shared_data import get_shared
+from delivery_management.tools.cluster_index import get_cluster_index
+from delivery_management.tools.instrumentation import instrumented
 
 class EnrichedOrder(BaseModel):
     order_id: str = Field(..., description="Unique order identifier")
@@ -33,63 +34,52 @@ class FinalOutputEnricher(BaseTool):
     name: str = "Final Output Enricher"
     description: str = "Enhances final delivery routes with detailed order information"
 
+    @instrumented
     def _run(self, routes: Dict) -> Dict:
         """Enrich final routes output with detailed order data"""
-        clustered_orders = get_shared("h3_clusters")
+        index = get_cluster_index()
         enriched_routes = []
-        
-        # Convert clustered_orders to dict if needed
-        if hasattr(clustered_orders, 'dict'):
-            clustered_orders = clustered_orders.dict()
-            
+        if index is None:
+            return {"enriched_routes": enriched_routes}
+
         for route in routes["routes"]:
-            cluster = next(
-                (c for c in clustered_orders.get("h3_clusters", [])
-                 if c.get("h3_index") == route["h3_index"]),
-                None
-            )
-            if not cluster:
+            if route["h3_index"] not in index.clusters:
                 continue
-                
+
             enriched_locations = []
             total_weight = 0
             total_volume = 0
             total_time = 0
-            
+
             for loc in route["locations"]:
-                cluster_loc = next(
-                    (cl for cl in cluster["locations"] 
-                    if cl["location_id"] == loc["location_id"]),
-                    None
-                )
+                cluster_loc = index.location_in_cluster(route["h3_index"], loc["location_id"])
                 if not cluster_loc:
                     continue
-                    
+
                 enriched_orders = []
-                for order in cluster_loc["orders"]:
-                    if order["order_id"] == loc["order_id"]:
-                        enriched_orders.append(EnrichedOrder(
-                            order_id=order["order_id"],
-                            product=order["product"],
-                            product_name=order["metadata"]["name"],
-                            quantity=order["quantity"],
-                            weight=order["weight"],
-                            volume=order["volume"],
-                            category=order["metadata"]["category"],
-                            is_hazardous=order["metadata"]["is_hazardous"],
-                            is_perishable=order["metadata"]["is_perishable"]
-                        ))
-                        total_weight += order["weight"]
-                        total_volume += order["volume"]
-                        total_time += cluster_loc["est_delivery_time_hours"]
-                
+                for order in index.orders_at(cluster_loc.location_id, loc["order_id"], loc.get("load")):
+                    enriched_orders.append(EnrichedOrder(
+                        order_id=order.order_id,
+                        product=order.product,
+                        product_name=order.metadata.name,
+                        quantity=order.quantity,
+                        weight=order.weight,
+                        volume=order.volume,
+                        category=order.metadata.category,
+                        is_hazardous=order.metadata.is_hazardous,
+                        is_perishable=order.metadata.is_perishable
+                    ))
+                    total_weight += order.weight
+                    total_volume += order.volume
+                    total_time += cluster_loc.est_delivery_time_hours
+
                 enriched_locations.append(EnrichedLocation(
-                    location_id=cluster_loc["location_id"],
-                    latitude=cluster_loc["location"]["latitude"],
-                    longitude=cluster_loc["location"]["longitude"],
+                    location_id=cluster_loc.location_id,
+                    latitude=cluster_loc.location.latitude,
+                    longitude=cluster_loc.location.longitude,
                     orders=enriched_orders
                 ))
-            
+
             enriched_routes.append(EnrichedRoute(
                 h3_index=route["h3_index"],
                 fleet_id=route["fleet_id"],
@@ -99,5 +89,5 @@ class FinalOutputEnricher(BaseTool):
                 total_volume=total_volume,
                 estimated_time=total_time
             ))
-        
+
         return {"enriched_routes": enriched_routes}
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+Process-wide tools over the shipped data files.
+
+Every factory builds its tool on the first call and returns the same instance
+afterwards, so the crew and all task factories share one tool per process and
+nothing is built or read from disk at import.
+"""
+from functools import lru_cache
+from pathlib import Path
+
+from delivery_management.tools import (
+    cluster_cache,
+    cluster_orders,
+    enrich_clustered_orders,
+    fleet,
+    fleet_assignment,
+    local_search,
+    prompt_payload,
+    route_builder,
+    schedule_simulator,
+    time_constraints,
+    travel_matrix
+)
+from delivery_management.tools.optimization_collector import OptimizationCollectorTool
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@lru_cache(maxsize=None)
+def cluster_orders_tool(summary_output: bool = False) -> cluster_orders.ClusterOrdersByGeoTool:
+    """
+    The clustering tool, with summary_output it returns the first summary page to agents.
+
+    Only the paths and the reference data are kept on the shared tool, every run
+    clusters its orders on its own copy.
+    """
+    tool = cluster_orders.ClusterOrdersByGeoTool()\
+        .with_orders_file(DATA_DIR / "orders.json")\
+        .with_geolocations_file(DATA_DIR / "geolocations.json")\
+        .with_static_ref_file(DATA_DIR / "static_reference_data.json")\
+        .with_inventory_file(DATA_DIR / "inventory.json")\
+        .with_cache_dir(cluster_cache.DEFAULT_CACHE_DIR)
+    if summary_output:
+        tool = tool.with_summary_output(prompt_payload.DEFAULT_TOKEN_BUDGET)
+    return tool
+
+
+@lru_cache(maxsize=None)
+def fleet_tool() -> fleet.Fleet:
+    return fleet.Fleet()
+
+
+@lru_cache(maxsize=None)
+def time_constraints_tool() -> time_constraints.TimeConstraints:
+    return time_constraints.TimeConstraints().with_data_file(DATA_DIR / "time_constraints.json")
+
+
+@lru_cache(maxsize=None)
+def enrich_clusters_tool() -> enrich_clustered_orders.EnrichClusteredOrders:
+    return enrich_clustered_orders.EnrichClusteredOrders()
+
+
+@lru_cache(maxsize=None)
+def route_builder_tool() -> route_builder.RouteBuilderTool:
+    return route_builder.RouteBuilderTool()
+
+
+@lru_cache(maxsize=None)
+def cluster_page_tool() -> prompt_payload.ClusterSummaryPageTool:
+    return prompt_payload.ClusterSummaryPageTool()
+
+
+@lru_cache(maxsize=None)
+def cluster_detail_tool() -> prompt_payload.ClusterDetailTool:
+    return prompt_payload.ClusterDetailTool()
+
+
+@lru_cache(maxsize=None)
+def travel_matrix_tool() -> travel_matrix.TravelMatrixTool:
+    return travel_matrix.TravelMatrixTool()\
+        .with_geolocations_file(DATA_DIR / "geolocations.json")\
+        .with_time_constraints_file(DATA_DIR / "time_constraints.json")
+
+
+@lru_cache(maxsize=None)
+def schedule_simulator_tool() -> schedule_simulator.ScheduleSimulatorTool:
+    return schedule_simulator.ScheduleSimulatorTool()\
+        .with_geolocations_file(DATA_DIR / "geolocations.json")\
+        .with_time_constraints_file(DATA_DIR / "time_constraints.json")
+
+
+@lru_cache(maxsize=None)
+def fleet_assignment_tool() -> fleet_assignment.FleetAssignmentTool:
+    return fleet_assignment.FleetAssignmentTool()\
+        .with_geolocations_file(DATA_DIR / "geolocations.json")\
+        .with_time_constraints_file(DATA_DIR / "time_constraints.json")
+
+
+@lru_cache(maxsize=None)
+def optimization_collector_tool() -> OptimizationCollectorTool:
+    return OptimizationCollectorTool()
+
+
+@lru_cache(maxsize=None)
+def route_improver() -> local_search.RouteImprover:
+    return local_search.RouteImprover.from_data_files(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json")
+
+
+@lru_cache(maxsize=None)
+def fleet_assigner() -> fleet_assignment.FleetAssigner:
+    return fleet_assignment.FleetAssigner.from_data_files(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json")
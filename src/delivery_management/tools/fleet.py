@@ -1,51 +1,69 @@
 from crewai.tools import BaseTool
-from typing import Any, List, Type
-from pydantic import BaseModel, Field
-from delivery_management.data.load_data import DataLoader
+from typing import Any, Tuple, Type
+from pydantic import BaseModel, ConfigDict, Field
+from delivery_management.data.reference_data import load_reference
+from delivery_management.tools.instrumentation import instrumented
 
 class FleetInput(BaseModel):
     fleet_type: str = Field(..., description="Type of fleet (Small, Medium, Large)")
 
 class Units(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     volume: str = Field(..., description="Volume unit cubic meters or centi-meters often represented as cubic_meters")
     weight: str = Field(..., description="Unit of weight, kg gms")
 
 class Capacity(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     volume: float = Field(..., description="total volume that a fleet can accommodate, refer the units.volume for unit measurement")
     weight: float = Field(..., description="total weight that a fleet can carry, refer the unit.weight for weight measurement")
     units: Units = Field(..., description="unit of volume and weight")
 
 class OperationalCost(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     per_km: float = Field(..., description="operational cost of the fleet per km")
     maintenance_monthly: float = Field(..., description="monthly maintenance")
     fuel_efficiency: float = Field(..., description="fuel efficiency factor")
 
 class AvailableFleet(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     type_id: int = Field(..., description="fleet type id")
     type: str = Field(..., description="fleet type")
     count: int = Field(..., description="number of fleet that we have in that specific type for use")
     capacity: Capacity = Field(..., description="volume and weight")
     operational_cost: OperationalCost = Field(..., description="operational cost per_km, maintenance_monthly, fuel_efficience factor")
-    fleets: List[str] = Field(..., description="id of the fleets")
+    fleets: Tuple[str, ...] = Field(..., description="id of the fleets")
 
 class FleetData(BaseModel):
+    """fleets.json, shared through the reference data registry, so this and all nested models are frozen."""
+    model_config = ConfigDict(frozen=True)
+
     total_fleet_count: int = Field(..., description="total number of fleets that are available")
-    available_fleets: List[AvailableFleet] = Field(..., description="list of available fleets")
+    available_fleets: Tuple[AvailableFleet, ...] = Field(..., description="list of available fleets")
 
 class Fleet(BaseTool):
     name: str = "Returns Fleet Data"
     description: str = "Returns the fleet details for a given fleet type"
     args_schema: Type[BaseModel] = FleetInput
-    jsondata: Any = DataLoader.load_data("fleets.json")
 
     def __init__(self):
         super().__init__()
 
+    @property
+    def jsondata(self) -> Any:
+        # Parsed document shared through the reference data registry, read on first use
+        return load_reference("fleets.json")
+
     def get_fleet_by_type(self, fleet_type):
+        """Copies of the fleets of the type, the shared reference data is never handed out."""
         return [
-            fleet for fleet in self.jsondata["available_fleets"]
-            if fleet["type"] == fleet_type
+            fleet.model_dump() for fleet in load_reference("fleets.json", FleetData).available_fleets
+            if fleet.type == fleet_type
         ]
 
+    @instrumented
     def _run(self, fleet_type: str) -> FleetData:
         return self.get_fleet_by_type(fleet_type)
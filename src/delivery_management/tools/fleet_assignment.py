@@ -0,0 +1,226 @@
+from pathlib import Path
+from typing import List, Optional, Type
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from delivery_management.data.reference_data import load_reference
+from delivery_management.models.greedy_routes import GreedyRoutes
+from delivery_management.models.optimized_routes import Location
+from delivery_management.tools.cluster_index import ClusterIndex, get_cluster_index
+from delivery_management.tools.fleet import FleetData
+from delivery_management.tools.instrumentation import instrumented
+from delivery_management.tools.regulatory import RegulatoryIndex, load_regulatory_index
+from delivery_management.tools.travel_matrix import TravelMatrix, load_travel_matrix
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy is optional, the regret greedy below is used instead
+    linear_sum_assignment = None
+
+DEFAULT_UTILIZATION_WEIGHT = 0.5
+# Stand-in for infeasible pairs, the assignment solver needs finite costs
+_INFEASIBLE = 1e12
+
+
+class AssignedRoute(BaseModel):
+    h3_index: Optional[str] = Field(..., description="H3 index of the route")
+    fleet_id: str = Field(..., description="Fleet assigned to the route")
+    fleet_type: str = Field(..., description="Type of the assigned fleet")
+    locations: List[Location] = Field(..., description="Locations of the route in visiting order")
+    total_weight_kg: float = Field(..., description="Total weight carried on the route")
+    total_volume_m3: float = Field(..., description="Total volume carried on the route")
+    distance_km: float = Field(..., description="Route distance from the warehouse and back")
+    weight_utilization: float = Field(..., description="Share of the fleet weight capacity used, 0 to 1")
+    volume_utilization: float = Field(..., description="Share of the fleet volume capacity used, 0 to 1")
+    cost: float = Field(..., description="Operational cost of the route, per_km times distance")
+
+class UnassignedRoute(BaseModel):
+    h3_index: Optional[str] = Field(..., description="H3 index of the route")
+    locations: List[Location] = Field(..., description="Locations of the route in visiting order")
+    total_weight_kg: float = Field(..., description="Total weight carried on the route")
+    total_volume_m3: float = Field(..., description="Total volume carried on the route")
+    reason: str = Field(..., description="Why no fleet could be assigned")
+
+class FleetAssignment(BaseModel):
+    routes: List[AssignedRoute] = Field(..., description="Routes with an assigned fleet, in input order")
+    unassigned: List[UnassignedRoute] = Field(..., description="Routes no available fleet can carry")
+    total_cost: float = Field(..., description="Operational cost of all assigned routes")
+
+
+class FleetAssigner:
+    """
+    Assigns one vehicle from fleets.json to every route.
+
+    A fleet type can carry a route when both its weight and volume capacity
+    hold the route load. The score of a feasible pair is the operational cost
+    (per_km times route distance) inflated by the unused share of the binding
+    capacity, so cheap and well utilized vehicles win. Per-type counts limit how
+    many routes a type takes. Route loads are summed per stop, one load of a
+    location, and routes carrying a forbidden package combination get no
+    vehicle. With scipy installed the assignment is solved exactly with
+    linear_sum_assignment, otherwise by a regret greedy.
+    """
+
+    def __init__(
+        self,
+        fleet_data: FleetData,
+        matrix: TravelMatrix,
+        utilization_weight: float = DEFAULT_UTILIZATION_WEIGHT,
+        regulatory: Optional[RegulatoryIndex] = None
+    ):
+        fleets = sorted(fleet_data.available_fleets, key=lambda fleet: fleet.type_id)
+        self.fleets = fleets
+        self.matrix = matrix
+        self.utilization_weight = utilization_weight
+        self.regulatory = regulatory
+        self.weight_capacity = np.array([fleet.capacity.weight for fleet in fleets], dtype=np.float64)
+        self.volume_capacity = np.array([fleet.capacity.volume for fleet in fleets], dtype=np.float64)
+        self.per_km = np.array([fleet.operational_cost.per_km for fleet in fleets], dtype=np.float64)
+        self.counts = [min(fleet.count, len(fleet.fleets)) for fleet in fleets]
+
+    @classmethod
+    def from_data_files(cls, geolocations_path: Path, time_constraints_path: Path, utilization_weight: float = DEFAULT_UTILIZATION_WEIGHT):
+        fleet_data = load_reference("fleets.json", FleetData)
+        return cls(fleet_data, load_travel_matrix(geolocations_path, time_constraints_path), utilization_weight, load_regulatory_index())
+
+    def scores(self, weight: np.ndarray, volume: np.ndarray, distance: np.ndarray) -> np.ndarray:
+        """Routes x fleet types score matrix, inf where the type cannot carry the route."""
+        utilization = np.maximum(weight[:, None] / self.weight_capacity, volume[:, None] / self.volume_capacity)
+        cost = distance[:, None] * self.per_km
+        # Type order breaks ties between zero-distance routes in favour of smaller vehicles
+        scores = cost * (1 + self.utilization_weight * (1 - utilization)) + np.arange(len(self.fleets)) * 1e-9
+        scores[utilization > 1 + 1e-9] = np.inf
+        return scores
+
+    def _solve_exact(self, scores: np.ndarray) -> np.ndarray:
+        columns = np.repeat(np.arange(len(self.fleets)), self.counts)
+        expanded = np.where(np.isinf(scores[:, columns]), _INFEASIBLE, scores[:, columns])
+        rows, cols = linear_sum_assignment(expanded)
+        choice = np.full(len(scores), -1, dtype=np.int64)
+        feasible = expanded[rows, cols] < _INFEASIBLE
+        choice[rows[feasible]] = columns[cols[feasible]]
+        return choice
+
+    def _solve_greedy(self, scores: np.ndarray) -> np.ndarray:
+        """Routes that lose most by not getting their best type choose first."""
+        remaining = list(self.counts)
+        ordered = np.sort(scores, axis=1)
+        second = ordered[:, 1] if scores.shape[1] > 1 else np.full(len(scores), np.inf)
+        with np.errstate(invalid="ignore"):
+            regret = np.where(np.isinf(second), np.inf, second - ordered[:, 0])
+        # Routes with a single feasible type (infinite regret) go first, unservable ones last
+        regret[np.isinf(ordered[:, 0])] = -np.inf
+
+        preference = np.argsort(scores, axis=1, kind="stable").tolist()
+        feasible = np.isfinite(scores).tolist()
+        choice = np.full(len(scores), -1, dtype=np.int64)
+        for r in np.lexsort((np.arange(len(scores)), -regret)).tolist():
+            for t in preference[r]:
+                if not feasible[r][t]:
+                    break
+                if remaining[t]:
+                    remaining[t] -= 1
+                    choice[r] = t
+                    break
+        return choice
+
+    def assign(self, routes, index: ClusterIndex) -> FleetAssignment:
+        """
+        :param routes: GreedyRoutes or OptimizedRoutes, as a model or dict. Existing fleets are ignored.
+        :param index: Cluster index the route weights and volumes are read from.
+        """
+        data = routes.model_dump() if hasattr(routes, "model_dump") else routes
+        route_list = data.get("routes", [])
+
+        weight = np.zeros(len(route_list))
+        volume = np.zeros(len(route_list))
+        distance = np.zeros(len(route_list))
+        category_mask = [0] * len(route_list)
+        for r, route in enumerate(route_list):
+            stops = dict.fromkeys((location["location_id"], location.get("load", 0)) for location in route["locations"])
+            location_ids = list(dict.fromkeys(location_id for location_id, _ in stops))
+            for stop in stops:
+                totals = index.load_totals(*stop)
+                if totals:
+                    weight[r] += totals.total_weight
+                    volume[r] += totals.total_volume
+                    category_mask[r] |= totals.category_mask
+            distance[r] = self.matrix.route_distance_km(location_ids) if location_ids else 0.0
+
+        scores = self.scores(weight, volume, distance)
+        if self.regulatory is not None:
+            compatible = np.fromiter((self.regulatory.is_compatible(mask) for mask in category_mask), dtype=bool, count=len(route_list))
+            scores[~compatible] = np.inf
+        choice = self._solve_exact(scores) if linear_sum_assignment is not None else self._solve_greedy(scores)
+
+        next_id = [0] * len(self.fleets)
+        assigned, unassigned = [], []
+        for r, route in enumerate(route_list):
+            t = int(choice[r])
+            if t < 0:
+                violations = self.regulatory.violations(category_mask[r]) if self.regulatory is not None else []
+                if violations:
+                    reason = "forbidden package combination: " + "; ".join(violations)
+                elif np.isinf(scores[r]).all():
+                    reason = "no fleet type can carry the load"
+                else:
+                    reason = "all fleets that can carry the load are taken"
+                unassigned.append(UnassignedRoute(
+                    h3_index=route.get("h3_index"),
+                    locations=route["locations"],
+                    total_weight_kg=weight[r],
+                    total_volume_m3=volume[r],
+                    reason=reason
+                ))
+                continue
+            fleet = self.fleets[t]
+            assigned.append(AssignedRoute(
+                h3_index=route.get("h3_index"),
+                fleet_id=fleet.fleets[next_id[t]],
+                fleet_type=fleet.type,
+                locations=route["locations"],
+                total_weight_kg=weight[r],
+                total_volume_m3=volume[r],
+                distance_km=distance[r],
+                weight_utilization=weight[r] / self.weight_capacity[t],
+                volume_utilization=volume[r] / self.volume_capacity[t],
+                cost=distance[r] * self.per_km[t]
+            ))
+            next_id[t] += 1
+
+        return FleetAssignment(routes=assigned, unassigned=unassigned, total_cost=sum(route.cost for route in assigned))
+
+
+class FleetAssignmentInput(BaseModel):
+    clustered_routes_output: GreedyRoutes = Field(..., description="Routes with h3_index and locations; fleets already on the routes are replaced")
+
+
+class FleetAssignmentTool(BaseTool):
+    name: str = "Assign Fleets"
+    description: str = (
+        "Assigns a fleet_id and fleet_type to every route so that weight and volume capacities are never exceeded, "
+        "per-type fleet counts are respected and operational cost is minimal. Routes that cannot be carried are "
+        "returned as unassigned with a reason. Requires 'Cluster Orders by H3 Index' to have run first."
+    )
+    args_schema: Type[BaseModel] = FleetAssignmentInput
+    _geolocations_path: str = PrivateAttr(default=None)
+    _time_constraints_path: str = PrivateAttr(default=None)
+
+    def with_geolocations_file(self, path: Path):
+        self._geolocations_path = path
+        return self
+
+    def with_time_constraints_file(self, path: Path):
+        self._time_constraints_path = path
+        return self
+
+    @instrumented
+    def _run(self, clustered_routes_output: GreedyRoutes) -> FleetAssignment:
+        index = get_cluster_index()
+        if index is None:
+            raise ValueError("h3_clusters not found in shared state, run ClusterOrdersByGeoTool first")
+
+        assigner = FleetAssigner.from_data_files(self._geolocations_path, self._time_constraints_path)
+        return assigner.assign(clustered_routes_output, index)
@@ -0,0 +1,324 @@
+import h3
+from typing import Dict, List, Optional, Set
+from pydantic import BaseModel, Field
+
+from delivery_management.sharding import merge_routes
+from delivery_management.tools.adaptive_clustering import AdaptiveCells
+from delivery_management.tools.cluster_index import publish_h3_cluster_changes
+from delivery_management.tools.cluster_orders import (
+    ClusterOrdersByGeoTool,
+    ClusteredOrder,
+    H3ClusteredOrdersInput,
+    H3LocationCluster,
+    LocationCluster,
+    LocationMeta,
+    PriorityOrder,
+    SKUMeta,
+    package_weight_volume
+)
+from delivery_management.tools.inventory import (
+    FULFILLABLE,
+    InventoryIssue,
+    SKUStockIndex,
+    deliverable_orders,
+    inventory_issues,
+    reserve_inventory
+)
+from delivery_management.tools.regulatory import RegulatoryIndex
+from delivery_management.tools.shared_data import set_shared
+
+
+class OrderChanges(BaseModel):
+    added: List[dict] = Field(default_factory=list, description="new orders, in the orders.json format")
+    cancelled: List[str] = Field(default_factory=list, description="ids of cancelled orders")
+    modified: List[dict] = Field(default_factory=list, description="full replacement of existing orders, in the orders.json format")
+
+
+class IncrementalClusterer:
+    """
+    Keeps an H3 clustering up to date as orders change during the day.
+
+    Every apply() produces a new H3ClusteredOrdersInput, the previous one may
+    already be published and is never modified. Only the LocationCluster and
+    H3LocationCluster objects an order touches are copied, all others are shared
+    between the versions. The H3 indexes whose content changed are collected as
+    dirty so that route stages can re-plan just those cells.
+
+    With a stock index, the quantities already clustered are taken off it and
+    every added or modified order reserves its packages against what is left,
+    in arrival order. Removed orders put their quantities back.
+
+    New locations go to their cell at `resolution`, or for an adaptive
+    clustering to the cell its AdaptiveCells place them in. Cell loads are not
+    rebalanced as orders change.
+    """
+
+    def __init__(
+        self,
+        h3_clustered_orders: H3ClusteredOrdersInput,
+        location_map: dict,
+        sku_map: dict,
+        resolution: int = 6,
+        sku_masks: Optional[Dict[str, int]] = None,
+        regulatory: Optional[RegulatoryIndex] = None,
+        stock: Optional[SKUStockIndex] = None,
+        cells: Optional[AdaptiveCells] = None
+    ):
+        self.h3_clustered_orders = h3_clustered_orders
+        self.resolution = resolution
+        self._location_map = location_map
+        self._sku_map = sku_map
+        self._sku_masks = sku_masks or {}
+        self._regulatory = regulatory
+        self._cells = cells
+        self._stock = stock.copy() if stock is not None else None
+        self._issues: Dict[str, InventoryIssue] = {issue.order_id: issue for issue in h3_clustered_orders.inventory_issues}
+        self._dirty: Set[str] = set()
+        # Last published version and the cells changed since, for the index update
+        self._published = h3_clustered_orders
+        self._unpublished: Set[str] = set()
+        # Objects already copied by the running apply()
+        self._own_clusters: Set[str] = set()
+        self._own_locations: Set[str] = set()
+        self._priority_orders: List[PriorityOrder] = []
+
+        self._clusters: Dict[str, H3LocationCluster] = {}
+        self._locations: Dict[str, LocationCluster] = {}
+        self._location_h3: Dict[str, str] = {}
+        self._order_location: Dict[str, str] = {}
+        for cluster in h3_clustered_orders.h3_clusters or []:
+            self._clusters[cluster.h3_index] = cluster
+            for location in cluster.locations:
+                if cells is None and self._cell_of(location.location.latitude, location.location.longitude) != cluster.h3_index:
+                    raise ValueError(
+                        f"Location {location.location_id} is not in its resolution {resolution} cell, "
+                        "adaptive clusterings need their AdaptiveCells"
+                    )
+                self._locations[location.location_id] = location
+                self._location_h3[location.location_id] = cluster.h3_index
+                for order in location.orders:
+                    self._order_location[order.order_id] = location.location_id
+                    if self._stock is not None:
+                        self._stock.reserve(order.product, order.quantity)
+
+    @classmethod
+    def from_cluster_tool(cls, tool: ClusterOrdersByGeoTool, h3_clustered_orders: H3ClusteredOrdersInput, resolution: int = 6):
+        """
+        Build from a tool that has already run, reusing its loaded reference data.
+        The cells of an adaptive tool are assigned again from the clustering.
+        """
+        return cls(
+            h3_clustered_orders,
+            tool.build_location_map(tool._geolocations),
+            tool.flatten_sku_map(tool._static_ref.get("sku_map", {})),
+            resolution,
+            tool.sku_masks,
+            tool.regulatory,
+            tool._stock if tool._reserve_inventory else None,
+            AdaptiveCells.from_h3_clusters(h3_clustered_orders, tool._load_band, resolution) if tool._adaptive else None
+        )
+
+    @property
+    def dirty_cells(self) -> Set[str]:
+        return set(self._dirty)
+
+    def clear_dirty(self):
+        self._dirty.clear()
+
+    def apply(self, changes: OrderChanges, publish: bool = True) -> Set[str]:
+        """
+        Apply cancellations, modifications and additions, in that order. An
+        added order whose id is already clustered replaces it like a modification.
+
+        :param changes: The order updates.
+        :param publish: Publish the updated clustering and dirty cells to shared state.
+        :return: H3 indexes touched by this call.
+        """
+        self._own_clusters.clear()
+        self._own_locations.clear()
+        self._priority_orders = list(self.h3_clustered_orders.priority_orders)
+
+        touched = set()
+        for order_id in changes.cancelled:
+            touched |= self._remove_order(order_id)
+        for order in changes.modified:
+            touched |= self._remove_order(order["order_id"])
+            touched |= self._add_order(order)
+        for order in changes.added:
+            touched |= self._remove_order(order["order_id"])
+            touched |= self._add_order(order)
+
+        self.h3_clustered_orders = H3ClusteredOrdersInput(
+            priority_orders=self._priority_orders,
+            h3_clusters=list(self._clusters.values()),
+            inventory_issues=list(self._issues.values())
+        )
+        self._dirty |= touched
+        self._unpublished |= touched
+        if publish:
+            publish_h3_cluster_changes(self._published, self.h3_clustered_orders, self._unpublished)
+            self._published = self.h3_clustered_orders
+            self._unpublished = set()
+            set_shared("dirty_h3_cells", sorted(self._dirty))
+        return touched
+
+    def dirty_subset(self) -> H3ClusteredOrdersInput:
+        """The clustering restricted to the dirty cells that still hold locations."""
+        clusters = [
+            cluster for cluster in self.h3_clustered_orders.h3_clusters or []
+            if cluster.h3_index in self._dirty
+        ]
+        location_ids = {location.location_id for cluster in clusters for location in cluster.locations}
+        return H3ClusteredOrdersInput(
+            priority_orders=[order for order in self.h3_clustered_orders.priority_orders if order.location_id in location_ids],
+            h3_clusters=clusters
+        )
+
+    def replan_routes(self, previous_routes: dict, dirty_routes: dict) -> dict:
+        """
+        Replace the routes of dirty cells in `previous_routes` with `dirty_routes`,
+        keeping H3 cluster order. Routes of removed cells are dropped.
+        """
+        live_cells = [cluster.h3_index for cluster in self.h3_clustered_orders.h3_clusters or []]
+        kept = {
+            "routes": [
+                route for route in previous_routes.get("routes", [])
+                if route.get("h3_index") not in self._dirty and route.get("h3_index") in self._clusters
+            ]
+        }
+        return merge_routes([kept, dirty_routes], live_cells)
+
+    def _own_cluster(self, h3_index: str) -> H3LocationCluster:
+        """The cluster, copied on its first change in this apply()."""
+        cluster = self._clusters[h3_index]
+        if h3_index not in self._own_clusters:
+            cluster = self._clusters[h3_index] = cluster.model_copy(update={"locations": list(cluster.locations)})
+            self._own_clusters.add(h3_index)
+        return cluster
+
+    def _own_location(self, location_id: str) -> LocationCluster:
+        """The location, copied on its first change in this apply() and replaced in its cluster."""
+        location = self._locations[location_id]
+        if location_id not in self._own_locations:
+            location = self._locations[location_id] = location.model_copy(update={"orders": list(location.orders)})
+            self._own_locations.add(location_id)
+            cluster = self._own_cluster(self._location_h3[location_id])
+            cluster.locations = [location if loc.location_id == location_id else loc for loc in cluster.locations]
+        return location
+
+    def _remove_order(self, order_id: str) -> Set[str]:
+        self._priority_orders = [order for order in self._priority_orders if order.order_id != order_id]
+        self._issues.pop(order_id, None)
+        location_id = self._order_location.pop(order_id, None)
+        if location_id is None:
+            return set()
+
+        h3_index = self._location_h3[location_id]
+        location = self._own_location(location_id)
+        if self._stock is not None:
+            for order in location.orders:
+                if order.order_id == order_id:
+                    self._stock.release(order.product, order.quantity)
+        location.orders = [order for order in location.orders if order.order_id != order_id]
+
+        if location.orders:
+            self._refresh_totals(location)
+        else:
+            cluster = self._own_cluster(h3_index)
+            cluster.locations = [loc for loc in cluster.locations if loc.location_id != location_id]
+            del self._locations[location_id]
+            del self._location_h3[location_id]
+            if not cluster.locations:
+                del self._clusters[h3_index]
+
+        return {h3_index}
+
+    def _add_order(self, order: dict) -> Set[str]:
+        if self._stock is not None:
+            order = self._reserve(order)
+            if order is None:
+                return set()
+
+        order_id = order.get("order_id")
+        location_id = order.get("location_id")
+        priority = order.get("priority")
+        packages = order.get("packages", [])
+
+        if priority == "high":
+            self._priority_orders.append(PriorityOrder(
+                order_id=order_id,
+                location_id=location_id,
+                priority=priority,
+            ))
+
+        if not packages:
+            return set()
+
+        location = self._own_location(location_id) if location_id in self._locations else self._new_location(location_id)
+        h3_index = self._location_h3[location_id]
+
+        for package in packages:
+            sku = package["sku"]
+            weight, volume = package_weight_volume(package)
+            location.orders.append(ClusteredOrder(
+                h3_index=h3_index,
+                order_id=order_id,
+                weight=weight,
+                volume=volume,
+                product=sku,
+                quantity=package["quantity"],
+                metadata=SKUMeta(**self._sku_map[sku]) if sku in self._sku_map else None,
+                category_mask=self._sku_masks.get(sku, 0)
+            ))
+
+        self._order_location[order_id] = location_id
+        self._refresh_totals(location)
+        return {h3_index}
+
+    def _reserve(self, order: dict) -> Optional[dict]:
+        """The order cut to the stock left, None when it is blocked."""
+        reservations = reserve_inventory(lambda: [order], self._stock)
+        reservation = reservations[order.get("order_id")]
+        if reservation.status != FULFILLABLE:
+            self._issues[reservation.order_id] = inventory_issues(reservations)[0]
+        return next(deliverable_orders([order], reservations), None)
+
+    def _new_location(self, location_id: str) -> LocationCluster:
+        if location_id not in self._location_map:
+            raise ValueError(f"No geolocation found for locations: {location_id}")
+        location_meta = self._location_map[location_id]
+        h3_index = self._cell_of(location_meta["latitude"], location_meta["longitude"])
+
+        location = LocationCluster(
+            location_id=location_id,
+            location=LocationMeta(**location_meta),
+            total_weight=0.0,
+            total_volume=0.0,
+            est_delivery_time_hours=0.0,
+            orders=[]
+        )
+        if h3_index in self._clusters:
+            cluster = self._own_cluster(h3_index)
+        else:
+            cluster = self._clusters[h3_index] = H3LocationCluster(h3_index=h3_index, locations=[])
+            self._own_clusters.add(h3_index)
+        cluster.locations.append(location)
+
+        self._locations[location_id] = location
+        self._location_h3[location_id] = h3_index
+        self._own_locations.add(location_id)
+        return location
+
+    def _cell_of(self, latitude: float, longitude: float) -> str:
+        if self._cells is not None:
+            return self._cells.cell_of(latitude, longitude)
+        return h3.latlng_to_cell(latitude, longitude, self.resolution)
+
+    def _refresh_totals(self, location: LocationCluster):
+        location.total_weight = total_weight = sum(order.weight for order in location.orders)
+        location.total_volume = sum(order.volume for order in location.orders)
+        location.est_delivery_time_hours = round(((total_weight / 50) * 15) / 60, 2)
+        category_mask = 0
+        for order in location.orders:
+            category_mask |= order.category_mask
+        location.load_masks = self._regulatory.loads(category_mask) if self._regulatory is not None else [category_mask]
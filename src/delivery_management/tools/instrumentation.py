@@ -0,0 +1,235 @@
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from crewai.events import (
+    BaseEventListener,
+    LLMCallCompletedEvent,
+    LLMCallStartedEvent,
+    TaskCompletedEvent,
+    TaskStartedEvent,
+    ToolUsageFinishedEvent
+)
+
+# Rough size of a token in characters, used where the provider reports no usage
+CHARS_PER_TOKEN = 4
+
+TOOL = "tool"
+TASK = "task"
+AGENT = "agent"
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    tool_calls: int = 0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    payload_bytes: int = 0
+
+
+def payload_size(payload) -> int:
+    """Size in bytes of a tool result or task output as it would be sent to an agent."""
+    if payload is None:
+        return 0
+    if hasattr(payload, "model_dump_json"):
+        text = payload.model_dump_json()
+    elif isinstance(payload, (dict, list)):
+        text = json.dumps(payload, default=str)
+    else:
+        text = str(payload)
+    return len(text.encode())
+
+
+def estimate_tokens(content) -> int:
+    if content is None:
+        return 0
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    return -(-len(content) // CHARS_PER_TOKEN)
+
+
+class RunMetrics:
+    """
+    Wall time, call counts, tokens and payload sizes per tool, task and agent.
+
+    Tools report through the @instrumented decorator on their _run, task
+    callbacks through record_task() and LLM calls and agent tool usage through
+    MetricsListener. Token counts are estimated from the prompt and response
+    length. Payload sizes serialize every tool result and task output, so they
+    are only measured with measure_payloads set. With profile_tools set, every
+    tool call is also run under cProfile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats: Dict[Tuple[str, str], StageStats] = {}
+        self.profile_tools = False
+        self.measure_payloads = False
+        self.profiles: Dict[str, pstats.Stats] = {}
+
+    def stat(self, kind: str, name: str) -> StageStats:
+        key = (kind, name or "unknown")
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats.setdefault(key, StageStats())
+        return stats
+
+    def record_tool(self, name: str, seconds: float, payload_bytes: int):
+        with self._lock:
+            stats = self.stat(TOOL, name)
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.payload_bytes += payload_bytes
+
+    def record_agent_tool_call(self, agent: str, task: Optional[str]):
+        with self._lock:
+            self.stat(AGENT, agent).tool_calls += 1
+            if task:
+                self.stat(TASK, task).tool_calls += 1
+
+    def record_llm_call(self, agent: Optional[str], task: Optional[str], seconds: float, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            for kind, name in ((AGENT, agent), (TASK, task)):
+                if name:
+                    stats = self.stat(kind, name)
+                    stats.llm_calls += 1
+                    stats.prompt_tokens += prompt_tokens
+                    stats.completion_tokens += completion_tokens
+                    if kind == AGENT:
+                        stats.seconds += seconds
+
+    def record_task(self, name: str, output=None, seconds: Optional[float] = None):
+        """Called from a task's store_output_callback with its output, or by the listener with the task duration."""
+        with self._lock:
+            stats = self.stat(TASK, name)
+            if seconds is not None:
+                stats.calls += 1
+                stats.seconds += seconds
+            if output is not None and self.measure_payloads:
+                stats.payload_bytes += payload_size(output)
+
+    def add_profile(self, name: str, profile: cProfile.Profile):
+        with self._lock:
+            if name in self.profiles:
+                self.profiles[name].add(profile)
+            else:
+                self.profiles[name] = pstats.Stats(profile)
+
+    def profile_report(self, name: str, limit: int = 20) -> str:
+        """Top functions by cumulative time of a profiled tool."""
+        out = io.StringIO()
+        stats = self.profiles.get(name)
+        if stats is not None:
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.profiles.clear()
+
+    def to_dict(self) -> Dict[str, Dict[str, dict]]:
+        result: Dict[str, Dict[str, dict]] = {TOOL: {}, TASK: {}, AGENT: {}}
+        with self._lock:
+            for (kind, name), stats in sorted(self.stats.items()):
+                result[kind][name] = asdict(stats)
+        return result
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "delivery_management") -> str:
+        """Prometheus text exposition format, one counter per StageStats field."""
+        data = self.to_dict()
+        lines = []
+        for field in StageStats.__dataclass_fields__:
+            metric = f"{prefix}_{field}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for kind, entries in data.items():
+                for name, stats in entries.items():
+                    label = name.replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(f'{metric}{{kind="{kind}",name="{label}"}} {stats[field]}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = RunMetrics()
+
+
+def write_metrics(path: Path, run_metrics: RunMetrics = None):
+    """Write the metrics as Prometheus text for a .prom file, as JSON otherwise."""
+    run_metrics = run_metrics or metrics
+    path = Path(path)
+    path.write_text(run_metrics.to_prometheus() if path.suffix == ".prom" else run_metrics.to_json())
+
+
+def instrumented(run):
+    """Decorator for BaseTool._run that reports the call to `metrics`."""
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        profile = cProfile.Profile() if metrics.profile_tools else None
+        started = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            result = run(self, *args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+                metrics.add_profile(self.name, profile)
+        metrics.record_tool(self.name, time.perf_counter() - started, payload_size(result) if metrics.measure_payloads else 0)
+        return result
+
+    return wrapper
+
+
+class MetricsListener(BaseEventListener):
+    """Feeds LLM calls, task durations and agent tool usage from the crewAI event bus into `metrics`."""
+
+    def __init__(self, run_metrics: RunMetrics = None):
+        self.metrics = run_metrics or metrics
+        self._llm_started: Dict[Tuple[Optional[str], Optional[str]], float] = {}
+        self._task_started: Dict[Optional[str], float] = {}
+        super().__init__()
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event: LLMCallStartedEvent):
+            self._llm_started[(event.agent_id, event.task_id)] = time.perf_counter()
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event: LLMCallCompletedEvent):
+            started = self._llm_started.pop((event.agent_id, event.task_id), None)
+            self.metrics.record_llm_call(
+                event.agent_role,
+                event.task_name,
+                time.perf_counter() - started if started is not None else 0.0,
+                estimate_tokens(event.messages),
+                estimate_tokens(event.response)
+            )
+
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event: TaskStartedEvent):
+            self._task_started[getattr(event.task, "name", None)] = time.perf_counter()
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event: TaskCompletedEvent):
+            name = getattr(event.task, "name", None)
+            started = self._task_started.pop(name, None)
+            if started is not None:
+                self.metrics.record_task(name, seconds=time.perf_counter() - started)
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event: ToolUsageFinishedEvent):
+            self.metrics.record_agent_tool_call(event.agent_role, event.task_name)
@@ -0,0 +1,135 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, NamedTuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+FULFILLABLE = "fulfillable"
+PARTIAL = "partial"
+BLOCKED = "blocked"
+
+
+class InventoryIssue(BaseModel):
+    order_id: str = Field(..., description="unique id of the order")
+    location_id: str = Field(..., description="location id of the order")
+    priority: str = Field(..., description="priority of the order")
+    status: Literal["partial", "blocked"] = Field(..., description="partial orders are delivered with the reserved quantities only, blocked orders are not routed")
+    shortages: Dict[str, int] = Field(..., description="missing quantity per SKU")
+
+
+class OrderReservation(NamedTuple):
+    order_id: str
+    location_id: str
+    priority: str
+    status: str
+    reserved: List[int]
+    shortages: Dict[str, int]
+
+
+class SKUStockIndex:
+    """
+    Available stock per SKU in an int64 array, SKUs are looked up by integer code.
+
+    Inventory records of the same SKU are separate stock lots and are summed.
+    """
+
+    def __init__(self, skus: List[str], available: np.ndarray):
+        self.skus = skus
+        self.codes = {sku: code for code, sku in enumerate(skus)}
+        self.available = available
+
+    @classmethod
+    def from_inventory(cls, inventory_data: dict) -> "SKUStockIndex":
+        codes, quantities = {}, []
+        for item in inventory_data.get("inventory", []):
+            code = codes.setdefault(item["sku"], len(codes))
+            if code == len(quantities):
+                quantities.append(0)
+            quantities[code] += item["available_quantity"]
+        return cls(list(codes), np.asarray(quantities, dtype=np.int64))
+
+    def copy(self) -> "SKUStockIndex":
+        return SKUStockIndex(self.skus, self.available.copy())
+
+    def available_quantity(self, sku: str) -> int:
+        code = self.codes.get(sku)
+        return 0 if code is None else int(self.available[code])
+
+    def reserve(self, sku: str, quantity: int) -> int:
+        """Take up to `quantity` of a SKU off the stock, returns what was reserved."""
+        code = self.codes.get(sku)
+        if code is None:
+            return 0
+        reserved = min(int(self.available[code]), quantity)
+        self.available[code] -= reserved
+        return reserved
+
+    def release(self, sku: str, quantity: int):
+        """Put a reserved quantity of a SKU back on the stock."""
+        code = self.codes.get(sku)
+        if code is not None:
+            self.available[code] += quantity
+
+
+def reserve_inventory(order_source: Callable[[], Iterable[dict]], stock: SKUStockIndex) -> Dict[str, OrderReservation]:
+    """
+    Allocate stock to orders, high priority orders first and otherwise in input order.
+
+    `order_source` is called once per priority pass, so streamed orders are
+    read twice instead of being held in memory. `stock` is consumed.
+    """
+    reservations = {}
+    for high_priority in (True, False):
+        for order in order_source():
+            if (order.get("priority") == "high") != high_priority:
+                continue
+
+            reserved, shortages = [], {}
+            for package in order.get("packages", []):
+                quantity = stock.reserve(package["sku"], package["quantity"])
+                reserved.append(quantity)
+                if quantity < package["quantity"]:
+                    shortages[package["sku"]] = shortages.get(package["sku"], 0) + package["quantity"] - quantity
+
+            if not shortages:
+                status = FULFILLABLE
+            elif any(reserved):
+                status = PARTIAL
+            else:
+                status = BLOCKED
+            reservations[order.get("order_id")] = OrderReservation(
+                order.get("order_id"), order.get("location_id"), order.get("priority"), status, reserved, shortages
+            )
+    return reservations
+
+
+def deliverable_orders(orders: Iterable[dict], reservations: Dict[str, OrderReservation]) -> Iterator[dict]:
+    """
+    Orders as they should be routed: blocked orders are dropped and partial
+    orders only keep their reserved quantities. Orders without a reservation
+    pass through unchanged.
+    """
+    for order in orders:
+        reservation = reservations.get(order.get("order_id"))
+        if reservation is None or reservation.status == FULFILLABLE:
+            yield order
+        elif reservation.status == PARTIAL:
+            yield dict(order, packages=[
+                dict(package, quantity=quantity)
+                for package, quantity in zip(order.get("packages", []), reservation.reserved)
+                if quantity > 0
+            ])
+
+
+def inventory_issues(reservations: Dict[str, OrderReservation]) -> List[InventoryIssue]:
+    """Partial and blocked orders, in reservation order."""
+    return [
+        InventoryIssue(
+            order_id=reservation.order_id,
+            location_id=reservation.location_id,
+            priority=reservation.priority,
+            status=reservation.status,
+            shortages=reservation.shortages
+        )
+        for reservation in reservations.values()
+        if reservation.status != FULFILLABLE
+    ]
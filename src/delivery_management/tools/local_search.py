@@ -0,0 +1,278 @@
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from delivery_management.data.reference_data import load_reference
+from delivery_management.tools.cluster_index import ClusterIndex
+from delivery_management.tools.regulatory import RegulatoryIndex, load_regulatory_index
+from delivery_management.tools.schedule_simulator import ScheduleSimulator, load_schedule_simulator
+from delivery_management.tools.travel_matrix import WAREHOUSE_ID
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIME_BUDGET_SECONDS = 2.0
+MAX_OR_OPT_SEGMENT = 3
+_EPSILON = 1e-6
+
+
+def fleet_capacities(fleets: Optional[dict] = None) -> Dict[str, Tuple[float, float]]:
+    """(weight, volume) capacity per fleet type from fleets.json."""
+    fleets = fleets or load_reference("fleets.json")
+    return {
+        fleet["type"]: (fleet["capacity"]["weight"], fleet["capacity"]["volume"])
+        for fleet in fleets["available_fleets"]
+    }
+
+
+class ImprovementStats(NamedTuple):
+    distance_before_km: float
+    distance_after_km: float
+    moves: int
+    timed_out: bool
+
+
+class _CellSearch:
+    """
+    Search state of the routes of one H3 cell.
+
+    Every stop, one load of a location, is a node: node 0 is the warehouse,
+    the others index the local distance matrix and the per-node weight,
+    volume and delivery minutes.
+    """
+
+    def __init__(self, improver: "RouteImprover", routes: List[dict], index: ClusterIndex):
+        self.improver = improver
+        self.routes: List[List[int]] = []
+        self.entries: List[List[dict]] = [[]]
+        self.weight, self.volume, self.service = [0.0], [0.0], [0.0]
+        self.category_mask = [0]
+        location_ids = [WAREHOUSE_ID]
+
+        for route in routes:
+            stops = {}
+            for location in route["locations"]:
+                stops.setdefault((location["location_id"], location.get("load", 0)), []).append(location)
+            nodes = []
+            for (location_id, load), entries in stops.items():
+                totals = index.load_totals(location_id, load)
+                nodes.append(len(location_ids))
+                location_ids.append(location_id)
+                self.entries.append(entries)
+                self.weight.append(totals.total_weight if totals else 0.0)
+                self.volume.append(totals.total_volume if totals else 0.0)
+                self.service.append(totals.est_delivery_time_hours * 60 if totals else 0.0)
+                self.category_mask.append(totals.category_mask if totals else 0)
+            self.routes.append(nodes)
+
+        self.distance = improver.simulator.matrix.square(location_ids).tolist()
+        self.capacity = [improver.capacity(route.get("fleet_type")) for route in routes]
+        self.loads = [self._load(nodes) for nodes in self.routes]
+        self.on_time = [self._on_time(nodes) for nodes in self.routes]
+        self.compatible = [self._compatible(nodes) for nodes in self.routes]
+        self.moves = 0
+
+    def _load(self, nodes: List[int]) -> Tuple[float, float]:
+        return sum(self.weight[k] for k in nodes), sum(self.volume[k] for k in nodes)
+
+    def _compatible(self, nodes: List[int]) -> bool:
+        regulatory = self.improver.regulatory
+        if regulatory is None:
+            return True
+        mask = 0
+        for k in nodes:
+            mask |= self.category_mask[k]
+        return regulatory.is_compatible(mask)
+
+    def _on_time(self, nodes: List[int]) -> bool:
+        if not nodes:
+            return True
+        d = self.distance
+        path = [0] + nodes + [0]
+        legs = [d[a][b] for a, b in zip(path[:-1], path[1:])]
+        return self.improver.simulator.is_feasible(legs, [self.service[k] for k in nodes])
+
+    def cost(self, nodes: List[int]) -> float:
+        path = [0] + nodes + [0]
+        return sum(self.distance[a][b] for a, b in zip(path[:-1], path[1:]))
+
+    def _apply(self, changes: Dict[int, List[int]]) -> bool:
+        """Commit new node sequences if no route becomes over capacity, late or carries forbidden combinations."""
+        checked = {}
+        for r, nodes in changes.items():
+            weight, volume = self._load(nodes)
+            max_weight, max_volume = self.capacity[r]
+            old_weight, old_volume = self.loads[r]
+            if weight > max_weight + _EPSILON and weight > old_weight + _EPSILON:
+                return False
+            if volume > max_volume + _EPSILON and volume > old_volume + _EPSILON:
+                return False
+            compatible = self._compatible(nodes)
+            # A route that already carries a forbidden combination may not take on more stops
+            if not compatible and (self.compatible[r] or len(nodes) > len(self.routes[r])):
+                return False
+            on_time = self._on_time(nodes)
+            if self.on_time[r] and not on_time:
+                return False
+            checked[r] = (weight, volume), on_time, compatible
+
+        for r, nodes in changes.items():
+            self.routes[r] = nodes
+            self.loads[r], self.on_time[r], self.compatible[r] = checked[r]
+        self.moves += 1
+        return True
+
+    def _neighbours(self, nodes: List[int], i: int, j: int) -> Tuple[int, int]:
+        """Nodes before position i and after position j, the warehouse at the ends."""
+        return (nodes[i - 1] if i > 0 else 0), (nodes[j + 1] if j + 1 < len(nodes) else 0)
+
+    def two_opt(self, r: int) -> bool:
+        d, nodes = self.distance, self.routes[r]
+        for i in range(len(nodes) - 1):
+            for j in range(i + 1, len(nodes)):
+                a, b = self._neighbours(nodes, i, j)
+                delta = d[a][nodes[j]] + d[nodes[i]][b] - d[a][nodes[i]] - d[nodes[j]][b]
+                if delta < -_EPSILON and self._apply({r: nodes[:i] + nodes[i:j + 1][::-1] + nodes[j + 1:]}):
+                    return True
+        return False
+
+    def or_opt(self, r: int) -> bool:
+        d, nodes = self.distance, self.routes[r]
+        for length in range(1, min(MAX_OR_OPT_SEGMENT, len(nodes) - 1) + 1):
+            for i in range(len(nodes) - length + 1):
+                first, last = nodes[i], nodes[i + length - 1]
+                p, n = self._neighbours(nodes, i, i + length - 1)
+                gain = d[p][first] + d[last][n] - d[p][n]
+                rest = nodes[:i] + nodes[i + length:]
+                for k in range(len(rest) + 1):
+                    if k == i:
+                        continue
+                    x, y = (rest[k - 1] if k > 0 else 0), (rest[k] if k < len(rest) else 0)
+                    delta = d[x][first] + d[last][y] - d[x][y] - gain
+                    if delta < -_EPSILON and self._apply({r: rest[:k] + nodes[i:i + length] + rest[k:]}):
+                        return True
+        return False
+
+    def relocate(self, a: int, b: int) -> bool:
+        d, source, target = self.distance, self.routes[a], self.routes[b]
+        for i, node in enumerate(source):
+            p, n = self._neighbours(source, i, i)
+            gain = d[p][node] + d[node][n] - d[p][n]
+            for k in range(len(target) + 1):
+                x, y = (target[k - 1] if k > 0 else 0), (target[k] if k < len(target) else 0)
+                delta = d[x][node] + d[node][y] - d[x][y] - gain
+                if delta < -_EPSILON and self._apply({
+                    a: source[:i] + source[i + 1:],
+                    b: target[:k] + [node] + target[k:]
+                }):
+                    return True
+        return False
+
+    def swap(self, a: int, b: int) -> bool:
+        d, first, second = self.distance, self.routes[a], self.routes[b]
+        for i, u in enumerate(first):
+            pu, nu = self._neighbours(first, i, i)
+            for j, v in enumerate(second):
+                pv, nv = self._neighbours(second, j, j)
+                delta = (
+                    d[pu][v] + d[v][nu] - d[pu][u] - d[u][nu]
+                    + d[pv][u] + d[u][nv] - d[pv][v] - d[v][nv]
+                )
+                if delta < -_EPSILON and self._apply({
+                    a: first[:i] + [v] + first[i + 1:],
+                    b: second[:j] + [u] + second[j + 1:]
+                }):
+                    return True
+        return False
+
+    def run(self, deadline: float) -> bool:
+        """Apply first-improvement moves until none is left; False when the deadline stopped the search."""
+        count = len(self.routes)
+        improved = True
+        while improved:
+            if time.perf_counter() > deadline:
+                return False
+            improved = any(self.two_opt(r) or self.or_opt(r) for r in range(count)) or any(
+                self.relocate(a, b) or self.swap(a, b)
+                for a in range(count) for b in range(count) if a != b
+            )
+        return True
+
+    def locations(self, r: int) -> List[dict]:
+        return [entry for k in self.routes[r] for entry in self.entries[k]]
+
+
+class RouteImprover:
+    """
+    Shortens routes with 2-opt, Or-opt and inter-route relocate/swap moves.
+
+    Moves never cross H3 cells. Candidate moves are scored by their distance
+    delta on the travel matrix; only improving moves are checked against the
+    fleet capacity, the regulatory combinations and the schedule simulator
+    before they are applied.
+    """
+
+    def __init__(
+        self,
+        simulator: ScheduleSimulator,
+        capacities: Dict[str, Tuple[float, float]],
+        time_budget_seconds: float = DEFAULT_TIME_BUDGET_SECONDS,
+        regulatory: Optional[RegulatoryIndex] = None
+    ):
+        self.simulator = simulator
+        self.capacities = capacities
+        self.time_budget_seconds = time_budget_seconds
+        self.regulatory = regulatory
+        self.last_stats: Optional[ImprovementStats] = None
+
+    @classmethod
+    def from_data_files(cls, geolocations_path: Path, time_constraints_path: Path, time_budget_seconds: float = DEFAULT_TIME_BUDGET_SECONDS):
+        return cls(
+            load_schedule_simulator(geolocations_path, time_constraints_path),
+            fleet_capacities(),
+            time_budget_seconds,
+            load_regulatory_index()
+        )
+
+    def capacity(self, fleet_type: Optional[str]) -> Tuple[float, float]:
+        """Capacity of a fleet type; routes without a fleet are held to the largest one."""
+        if fleet_type in self.capacities:
+            return self.capacities[fleet_type]
+        return max(self.capacities.values(), default=(float("inf"), float("inf")))
+
+    def improve(self, routes, index: ClusterIndex):
+        """
+        Improve routes shaped like GreedyRoutes or OptimizedRoutes.
+
+        :param routes: A routes model or its dict form.
+        :param index: Cluster index the weights, volumes and delivery hours are read from.
+        :return: The improved routes in the type they were passed in. Routes emptied by
+            relocation are dropped, all other routes keep their position and fields.
+        """
+        deadline = time.perf_counter() + self.time_budget_seconds
+        data = routes.model_dump() if hasattr(routes, "model_dump") else routes
+        route_list = data.get("routes", [])
+
+        cells: Dict[Optional[str], List[int]] = {}
+        for position, route in enumerate(route_list):
+            cells.setdefault(route.get("h3_index"), []).append(position)
+
+        improved = list(route_list)
+        before = after = 0.0
+        moves = 0
+        timed_out = False
+        for positions in cells.values():
+            search = _CellSearch(self, [route_list[p] for p in positions], index)
+            before += sum(search.cost(nodes) for nodes in search.routes)
+            if not timed_out:
+                timed_out = not search.run(deadline)
+            after += sum(search.cost(nodes) for nodes in search.routes)
+            moves += search.moves
+            for r, position in enumerate(positions):
+                improved[position] = dict(route_list[position], locations=search.locations(r))
+
+        self.last_stats = ImprovementStats(before, after, moves, timed_out)
+        logger.info("Local search: %.1f km -> %.1f km with %d moves%s", before, after, moves, " (time budget reached)" if timed_out else "")
+
+        result = dict(data, routes=[route for route in improved if route["locations"]])
+        return type(routes).model_validate(result) if hasattr(routes, "model_dump") else result
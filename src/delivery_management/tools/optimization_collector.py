@@ -1,7 +1,8 @@
 from crewai.tools import BaseTool
-from typing import Dict, List
+from typing import Callable, Dict, List
 from pydantic import BaseModel, Field
 from delivery_management.tools.shared_data import get_shared, set_shared
+from delivery_management.tools.instrumentation import instrumented
 
 class OptimizationData(BaseModel):
     stage: str = Field(..., description="Optimization stage name")
@@ -11,7 +12,10 @@ class OptimizationData(BaseModel):
 class OptimizationCollectorTool(BaseTool):
     name: str = "OptimizationCollector"
     description: str = "Collects and processes optimization outputs from all stages"
+    # Never cached by the crew, the stage outputs it reads change while the crew runs
+    cache_function: Callable = lambda _args=None, _result=None: False
 
+    @instrumented
     def _run(self) -> List[OptimizationData]:
         """Collect and process all optimization stage outputs"""
         stages = [
@@ -24,10 +28,6 @@ class OptimizationCollectorTool(BaseTool):
         results = []
         for name, key in stages:
             data = get_shared(key)
-            print(f"\nDEBUG: Data for {name} ({key}):")  # Debug print
-            print(f"Type: {type(data)}")  # Debug print
-            print(f"Content: {data}")  # Debug print
-            
             if data and isinstance(data, dict):
                 results.append(self._process_stage(name, data))
         
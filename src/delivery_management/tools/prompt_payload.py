@@ -0,0 +1,179 @@
+import json
+from typing import Dict, List, Optional, Type, Union
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from delivery_management.tools.cluster_index import get_cluster_index
+from delivery_management.tools.cluster_orders import H3ClusteredOrdersInput, H3LocationCluster, PriorityOrder
+from delivery_management.tools.instrumentation import estimate_tokens, instrumented
+from delivery_management.tools.shared_data import get_shared
+
+DEFAULT_TOKEN_BUDGET = 4000
+# Page number, counts and field names around the cells
+_PAGE_OVERHEAD_TOKENS = 30
+
+SUMMARY_KEYS = {
+    "h3": "H3 index of the cluster",
+    "id": "location id, an index into ids when ids is present",
+    "w": "total weight in kg",
+    "v": "total volume in m3",
+    "t": "estimated delivery time in hours",
+    "n": "number of package rows",
+    "o": "order ids delivered at the location",
+    "locs": "locations of the cluster"
+}
+
+
+class LocationSummary(BaseModel):
+    id: Union[str, int] = Field(..., description="location id, or its index in ids")
+    w: float = Field(..., description="total weight in kg")
+    v: float = Field(..., description="total volume in m3")
+    t: float = Field(..., description="estimated delivery time in hours")
+    n: int = Field(..., description="number of package rows")
+    o: List[str] = Field(..., description="order ids delivered at the location")
+
+class CellSummary(BaseModel):
+    h3: str = Field(..., description="H3 index of the cluster")
+    w: float = Field(..., description="total weight in kg")
+    v: float = Field(..., description="total volume in m3")
+    t: float = Field(..., description="estimated delivery time in hours")
+    locs: List[LocationSummary] = Field(..., description="locations of the cluster")
+
+class ClusterSummaryPage(BaseModel):
+    keys: Dict[str, str] = Field(..., description="meaning of the short keys")
+    page: int = Field(..., description="page number, starting at 0")
+    pages: int = Field(..., description="number of pages")
+    ids: Optional[List[str]] = Field(None, description="location ids of this page when ids are dictionary encoded")
+    cells: List[CellSummary] = Field(..., description="H3 clusters of this page with per-location totals")
+    priority_orders: List[PriorityOrder] = Field(default_factory=list, description="high priority orders, on page 0 only")
+    inventory_issues: int = Field(0, description="number of partial or blocked orders")
+
+
+class ClusterSummarizer:
+    """
+    Per-location totals of a clustering, split into pages that fit a token budget.
+
+    Packages and SKU metadata are left out, agents fetch them for one cluster
+    at a time with the 'Get H3 Cluster Detail' tool. Token counts are estimated
+    from the JSON length. A cluster larger than the budget gets a page of its own.
+    """
+
+    def __init__(self, h3_clustered_orders: H3ClusteredOrdersInput, token_budget: int = DEFAULT_TOKEN_BUDGET, encode_ids: bool = False):
+        self.h3_clustered_orders = h3_clustered_orders
+        self.token_budget = token_budget
+        self.encode_ids = encode_ids
+        self._cells = [self._summarize(cluster) for cluster in h3_clustered_orders.h3_clusters or []]
+        self._pages = self._paginate()
+
+    @staticmethod
+    def _summarize(cluster: H3LocationCluster) -> CellSummary:
+        locations = [
+            LocationSummary(
+                id=location.location_id,
+                w=round(location.total_weight, 2),
+                v=round(location.total_volume, 3),
+                t=round(location.est_delivery_time_hours, 2),
+                n=len(location.orders),
+                o=list(dict.fromkeys(order.order_id for order in location.orders))
+            )
+            for location in cluster.locations
+        ]
+        return CellSummary(
+            h3=cluster.h3_index,
+            w=round(sum(location.total_weight for location in cluster.locations), 2),
+            v=round(sum(location.total_volume for location in cluster.locations), 3),
+            t=round(sum(location.est_delivery_time_hours for location in cluster.locations), 2),
+            locs=locations
+        )
+
+    def _paginate(self) -> List[List[int]]:
+        header = estimate_tokens(json.dumps(SUMMARY_KEYS)) + _PAGE_OVERHEAD_TOKENS
+        # The first page also carries the priority orders
+        priority = sum(estimate_tokens(order.model_dump_json()) for order in self.h3_clustered_orders.priority_orders)
+        pages, current, size = [], [], header + priority
+        for i, cell in enumerate(self._cells):
+            cell_size = estimate_tokens(cell.model_dump_json())
+            if current and size + cell_size > self.token_budget:
+                pages.append(current)
+                current, size = [], header
+            current.append(i)
+            size += cell_size
+        if current or not pages:
+            pages.append(current)
+        return pages
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def page(self, number: int = 0) -> ClusterSummaryPage:
+        if not 0 <= number < len(self._pages):
+            raise ValueError(f"Page {number} out of range, there are {len(self._pages)} pages")
+
+        cells = [self._cells[i] for i in self._pages[number]]
+        ids = None
+        if self.encode_ids:
+            codes = {}
+            cells = [
+                cell.model_copy(update={"locs": [
+                    location.model_copy(update={"id": codes.setdefault(location.id, len(codes))})
+                    for location in cell.locs
+                ]})
+                for cell in cells
+            ]
+            ids = list(codes)
+
+        return ClusterSummaryPage(
+            keys=SUMMARY_KEYS,
+            page=number,
+            pages=len(self._pages),
+            ids=ids,
+            cells=cells,
+            priority_orders=self.h3_clustered_orders.priority_orders if number == 0 else [],
+            inventory_issues=len(self.h3_clustered_orders.inventory_issues)
+        )
+
+
+def _shared_clusters() -> H3ClusteredOrdersInput:
+    h3_clustered_orders = get_shared("h3_clusters")
+    if h3_clustered_orders is None:
+        raise ValueError("h3_clusters not found in shared state, run ClusterOrdersByGeoTool first")
+    return h3_clustered_orders
+
+
+class ClusterSummaryPageInput(BaseModel):
+    page: int = Field(0, description="page number, starting at 0")
+
+class ClusterSummaryPageTool(BaseTool):
+    name: str = "Get Clustered Orders Page"
+    description: str = (
+        "Returns one page of the clustered orders with per-location totals (short keys are explained in 'keys'). "
+        "Use it for the pages after the first one returned by 'Cluster Orders by H3 Index'."
+    )
+    args_schema: Type[BaseModel] = ClusterSummaryPageInput
+    token_budget: int = Field(DEFAULT_TOKEN_BUDGET, description="estimated tokens per page")
+    encode_ids: bool = Field(False, description="dictionary encode location ids")
+
+    @instrumented
+    def _run(self, page: int = 0) -> ClusterSummaryPage:
+        return ClusterSummarizer(_shared_clusters(), self.token_budget, self.encode_ids).page(page)
+
+
+class ClusterDetailInput(BaseModel):
+    h3_index: str = Field(..., description="H3 index of the cluster")
+    include_metadata: bool = Field(False, description="include the SKU metadata of every package")
+
+class ClusterDetailTool(BaseTool):
+    name: str = "Get H3 Cluster Detail"
+    description: str = "Returns the locations and packages of one H3 cluster. Requires 'Cluster Orders by H3 Index' to have run first."
+    args_schema: Type[BaseModel] = ClusterDetailInput
+
+    @instrumented
+    def _run(self, h3_index: str, include_metadata: bool = False) -> dict:
+        _shared_clusters()
+        cluster = get_cluster_index().clusters.get(h3_index)
+        if cluster is None:
+            raise ValueError(f"No H3 cluster found for index: {h3_index}")
+        exclude = None if include_metadata else {"locations": {"__all__": {"orders": {"__all__": {"metadata"}}}}}
+        return cluster.model_dump(exclude=exclude)
@@ -0,0 +1,150 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from delivery_management.data.reference_data import load_reference
+
+
+def package_categories(static_ref: dict) -> List[str]:
+    """Category codes in bit order: package_categories first, then any other sku_map category."""
+    categories = list(static_ref.get("package_categories", []))
+    for category_map in static_ref.get("sku_map", {}).values():
+        for data in category_map.values():
+            if data["category"] not in categories:
+                categories.append(data["category"])
+    return categories
+
+
+def sku_category_masks(static_ref: dict) -> Dict[str, int]:
+    """One category bit per SKU of the sku_map."""
+    bits = {category: 1 << i for i, category in enumerate(package_categories(static_ref))}
+    return {
+        sku_id: bits[data["category"]]
+        for category_map in static_ref.get("sku_map", {}).values()
+        for sku_id, data in category_map.items()
+    }
+
+
+def resolve_package_groups(static_ref: dict, package_groups: dict) -> Dict[str, List[str]]:
+    """
+    Categories of every package group of regulatory_constraints.json. A group
+    selects the SKUs whose sku_map entry has all of its attribute values, e.g.
+    {"is_hazardous": true}, and stands for the categories of those SKUs.
+    Conflicts are checked per category, so a group must select every SKU of
+    the categories it touches.
+    """
+    skus = [data for category_map in static_ref.get("sku_map", {}).values() for data in category_map.values()]
+    groups = {}
+    for name, selector in package_groups.items():
+        selected = [all(data.get(key) == value for key, value in selector.items()) for data in skus]
+        categories = list(dict.fromkeys(data["category"] for data, hit in zip(skus, selected) if hit))
+        partial = sorted({data["category"] for data, hit in zip(skus, selected) if not hit and data["category"] in categories})
+        if partial:
+            raise ValueError(f"Package group {name} selects only some SKUs of the categories {', '.join(partial)}")
+        groups[name] = categories
+    return groups
+
+
+class RegulatoryIndex:
+    """
+    Forbidden package combinations as category bitmasks.
+
+    Each category is one bit, every package carries the bit of its category
+    and a load the OR of its packages. The names in forbidden combinations are
+    package groups or category codes. Every category bit keeps the mask of
+    the categories it may not travel with, so checking a load ANDs it with
+    the conflicts of each of its bits.
+    """
+
+    def __init__(self, categories: List[str], forbidden_combinations: List[dict], package_groups: Optional[Dict[str, List[str]]] = None):
+        self.categories = categories
+        self.bits = {category: 1 << i for i, category in enumerate(categories)}
+        self._groups = package_groups or {}
+        self._rules: List[Tuple[int, int, str]] = []
+
+        self._conflicts = [0] * len(categories)
+        for combination in forbidden_combinations:
+            first, second = (self.group_mask(name) for name in combination["packages"])
+            self._rules.append((first, second, f"{' with '.join(combination['packages'])}: {combination.get('reason', 'forbidden')}"))
+            for bit in range(len(categories)):
+                if first >> bit & 1:
+                    self._conflicts[bit] |= second
+                if second >> bit & 1:
+                    self._conflicts[bit] |= first
+
+    @classmethod
+    def from_data(cls, static_ref: dict, regulatory_constraints: dict) -> "RegulatoryIndex":
+        constraints = regulatory_constraints.get("regulatory_constraints", {})
+        return cls(
+            package_categories(static_ref),
+            constraints.get("forbidden_combinations", []),
+            resolve_package_groups(static_ref, constraints.get("package_groups", {}))
+        )
+
+    def group_mask(self, name: str) -> int:
+        """Categories of a package name used in the constraints, a package group or a category code."""
+        if name in self._groups:
+            return self.mask(self._groups[name])
+        if name in self.bits:
+            return self.bits[name]
+        raise ValueError(f"Unknown package category in regulatory constraints: {name}")
+
+    def mask(self, categories: Iterable[str]) -> int:
+        mask = 0
+        for category in categories:
+            mask |= self.bits[category]
+        return mask
+
+    def conflicts(self, mask: int) -> int:
+        """Categories that may not travel with any category in `mask`."""
+        conflicts = 0
+        while mask:
+            bit = mask & -mask
+            conflicts |= self._conflicts[bit.bit_length() - 1]
+            mask ^= bit
+        return conflicts
+
+    def is_compatible(self, mask: int) -> bool:
+        return self.conflicts(mask) & mask == 0
+
+    def compatible_with(self, mask: int, other: int) -> bool:
+        return self.conflicts(mask) & other == 0
+
+    def loads(self, mask: int) -> List[int]:
+        """
+        `mask` split into loads that may each travel on one vehicle. Categories
+        join the first load they are compatible with, in bit order, so a
+        compatible mask is a single load.
+        """
+        if self.is_compatible(mask):
+            return [mask]
+        loads = []
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            for i, load in enumerate(loads):
+                if self.compatible_with(bit, load):
+                    loads[i] |= bit
+                    break
+            else:
+                loads.append(bit)
+        return loads
+
+    def violations(self, mask: int) -> List[str]:
+        """Forbidden combinations present in `mask`, for reporting."""
+        return [reason for first, second, reason in self._rules if mask & first and mask & second]
+
+
+def load_of(mask: int, load_masks: List[int]) -> int:
+    """Load of a package with category `mask` among a location's `load_masks`, the first for unknown categories."""
+    for load, load_mask in enumerate(load_masks):
+        if load_mask & mask:
+            return load
+    return 0
+
+
+def load_regulatory_index(static_ref_path: Optional[Path] = None, regulatory_path: Optional[Path] = None) -> RegulatoryIndex:
+    """Index from the given files, or the ones shipped in the data package."""
+    return RegulatoryIndex.from_data(
+        load_reference(static_ref_path or "static_reference_data.json"),
+        load_reference(regulatory_path or "regulatory_constraints.json")
+    )
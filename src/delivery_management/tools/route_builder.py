@@ -0,0 +1,171 @@
+from crewai.tools import BaseTool
+from typing import List, Optional, Tuple
+from pydantic import Field
+
+from delivery_management.models.greedy_routes import GreedyRoutes, Location, Route
+from delivery_management.tools.cluster_index import LocationTotals, location_loads
+from delivery_management.tools.cluster_orders import H3ClusteredOrdersInput, LocationCluster
+from delivery_management.tools.regulatory import RegulatoryIndex, load_of, load_regulatory_index
+from delivery_management.tools.shared_data import get_shared
+from delivery_management.tools.instrumentation import instrumented
+
+MAX_DELIVERY_HOURS = 8.0
+_EPSILON = 1e-9
+
+
+class _FirstFitTree:
+    """Max segment tree over the residual hours of each bin, so first-fit is O(log n)."""
+
+    def __init__(self, size: int, capacity: float):
+        self._size = 1
+        while self._size < size:
+            self._size *= 2
+        self._tree = [capacity] * (2 * self._size)
+
+    def first_fit(self, demand: float) -> int:
+        tree = self._tree
+        if tree[1] + _EPSILON < demand:
+            return -1
+        node = 1
+        while node < self._size:
+            node = 2 * node if tree[2 * node] + _EPSILON >= demand else 2 * node + 1
+        return node - self._size
+
+    def residual(self, index: int) -> float:
+        return self._tree[index + self._size]
+
+    def update(self, index: int, residual: float):
+        tree = self._tree
+        node = index + self._size
+        tree[node] = residual
+        node //= 2
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            best = left if left >= right else right
+            if tree[node] == best:
+                break
+            tree[node] = best
+            node //= 2
+
+
+def pack_first_fit_decreasing(hours: List[float], max_hours: float = MAX_DELIVERY_HOURS) -> List[List[int]]:
+    """
+    Pack items into bins of `max_hours` using first-fit-decreasing.
+
+    Items larger than a bin are given a bin of their own. Bins are returned in the
+    order they were opened and each bin lists item indexes in their input order.
+    """
+    if not hours:
+        return []
+
+    order = sorted(range(len(hours)), key=lambda i: (-hours[i], i))
+    tree = _FirstFitTree(len(hours), max_hours)
+    bins: List[List[int]] = []
+
+    for i in order:
+        demand = hours[i]
+        slot = tree.first_fit(demand)
+        if slot < 0:
+            # Oversized location: it can only ever travel alone
+            slot = len(bins)
+        if slot == len(bins):
+            bins.append([])
+        bins[slot].append(i)
+        tree.update(slot, max(tree.residual(slot) - demand, 0.0) if demand <= max_hours else 0.0)
+
+    return [sorted(items) for items in bins]
+
+
+_Stop = Tuple[LocationCluster, int, LocationTotals]
+
+
+def _route_locations(stops: List[_Stop]) -> List[Location]:
+    locations = []
+    for location_cluster, load, _ in stops:
+        load_masks = location_cluster.load_masks
+        orders = location_cluster.orders if len(load_masks) <= 1 else [
+            order for order in location_cluster.orders if load_of(order.category_mask, load_masks) == load
+        ]
+        order_ids = dict.fromkeys(order.order_id for order in orders)
+        locations.extend(
+            Location(location_id=location_cluster.location_id, order_id=order_id, load=load)
+            for order_id in order_ids
+        )
+    return locations
+
+
+def _compatible_groups(stops: List[_Stop], regulatory: Optional[RegulatoryIndex]) -> List[List[int]]:
+    """
+    Stop indexes grouped so that no group carries a forbidden combination:
+    every stop joins the first compatible group. Without a regulatory index
+    only the loads of a split location are kept apart, by load number.
+    """
+    groups, masks = [], []
+    for i, (_, load, totals) in enumerate(stops):
+        if regulatory is None:
+            group = load
+        else:
+            group = next(
+                (g for g, mask in enumerate(masks) if regulatory.compatible_with(mask, totals.category_mask)),
+                len(groups)
+            )
+        while len(groups) <= group:
+            groups.append([])
+            masks.append(0)
+        groups[group].append(i)
+        masks[group] |= totals.category_mask
+    return [group for group in groups if group]
+
+
+def build_greedy_routes(
+    h3_clustered_orders: H3ClusteredOrdersInput,
+    max_delivery_hours: float = MAX_DELIVERY_HOURS,
+    regulatory: Optional[RegulatoryIndex] = None
+) -> GreedyRoutes:
+    """
+    Deterministic replacement for the greedy LLM stage.
+
+    Every load of a location is a stop, see LocationCluster.load_masks. The
+    stops of every H3 cluster are grouped by compatible package categories
+    and each group is split into routes whose total delivery hours stay
+    within `max_delivery_hours`. Stops are never mixed across H3 clusters and
+    never split across routes.
+
+    :param h3_clustered_orders: Output of ClusterOrdersByGeoTool.
+    :param max_delivery_hours: Delivery time budget of a single route.
+    :param regulatory: Forbidden package combinations no route may carry.
+    :return: GreedyRoutes in the same shape the greedy agent produces.
+    """
+    routes = []
+    for cluster in h3_clustered_orders.h3_clusters or []:
+        stops = [
+            (location, load, totals)
+            for location in cluster.locations
+            for load, totals in enumerate(location_loads(location))
+        ]
+        for group in _compatible_groups(stops, regulatory):
+            hours = [stops[i][2].est_delivery_time_hours for i in group]
+            for bin_items in pack_first_fit_decreasing(hours, max_delivery_hours):
+                routes.append(Route(
+                    h3_index=cluster.h3_index,
+                    locations=_route_locations([stops[group[i]] for i in bin_items])
+                ))
+
+    return GreedyRoutes(routes=routes)
+
+
+class RouteBuilderTool(BaseTool):
+    name: str = "Build Greedy Routes"
+    description: str = (
+        "Splits the locations of each H3 cluster into routes that stay within the 8-hour delivery time limit "
+        "using first-fit-decreasing on est_delivery_time_hours, without mixing packages that may not travel together. "
+        "Requires 'Cluster Orders by H3 Index' to have run first."
+    )
+    max_delivery_hours: float = Field(MAX_DELIVERY_HOURS, description="maximum delivery hours per route")
+
+    @instrumented
+    def _run(self) -> GreedyRoutes:
+        clustered_orders: H3ClusteredOrdersInput = get_shared("h3_clusters")
+        if clustered_orders is None:
+            raise ValueError("h3_clusters not found in shared state, run ClusterOrdersByGeoTool first")
+        return build_greedy_routes(clustered_orders, self.max_delivery_hours, load_regulatory_index())
@@ -0,0 +1,192 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from delivery_management.data.reference_data import load_reference
+from delivery_management.models.optimized_routes import Route
+from delivery_management.tools.cluster_index import get_cluster_index
+from delivery_management.tools.instrumentation import instrumented
+from delivery_management.tools.time_constraints import TimeConstraintsInput
+from delivery_management.tools.travel_matrix import WAREHOUSE_ID, TravelMatrix, load_travel_matrix, parse_clock
+
+MAX_DELIVERY_HOURS = 8.0
+
+
+def format_clock(minutes: float) -> str:
+    minutes = int(round(minutes))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class StopSchedule(BaseModel):
+    location_id: str = Field(..., description="Delivery location id")
+    arrival: str = Field(..., description="Arrival time in HH:MM")
+    departure: str = Field(..., description="Departure time in HH:MM after delivering")
+    break_before_minutes: float = Field(..., description="Mandatory rest taken before driving to this stop")
+
+class RouteSchedule(BaseModel):
+    h3_index: Optional[str] = Field(..., description="H3 index of the route")
+    fleet_id: str = Field(..., description="Fleet assigned to the route")
+    feasible: bool = Field(..., description="True when the route meets every time constraint")
+    violations: List[str] = Field(..., description="Time constraints the route breaks")
+    start: str = Field(..., description="Departure from the warehouse in HH:MM")
+    end: str = Field(..., description="Return to the warehouse in HH:MM")
+    driving_hours: float = Field(..., description="Total peak-adjusted driving time")
+    delivery_hours: float = Field(..., description="Total time spent delivering at stops")
+    breaks: int = Field(..., description="Number of mandatory rests inserted")
+    stops: List[StopSchedule] = Field(..., description="Schedule of every stop in visiting order")
+
+
+class ScheduleSimulator:
+    """
+    Simulates a route through the day: peak-adjusted driving between stops,
+    delivery time at every stop and a mandatory rest whenever the next leg would
+    push continuous driving past the limit. A single leg longer than the limit
+    cannot be split by a rest and makes the route infeasible. One pass per
+    route, no models are built by the batch API.
+    """
+
+    def __init__(self, matrix: TravelMatrix, time_constraints: TimeConstraintsInput, max_delivery_hours: float = MAX_DELIVERY_HOURS):
+        constraints = time_constraints.time_constraints
+        self.matrix = matrix
+        self.day_start = parse_clock(constraints.operational_hours.start)
+        self.day_end = parse_clock(constraints.operational_hours.end)
+        self.max_driving = constraints.max_continuous_driving_time.hours * 60.0
+        self.rest = float(constraints.max_continuous_driving_time.mandatory_rest.duration)
+        self.max_delivery = max_delivery_hours * 60.0
+        self.minutes_per_km = 60.0 / matrix.average_speed_kmh
+
+    def _simulate(self, legs_km, service_minutes, record: bool):
+        """Core loop; legs_km has one more entry than service_minutes (the way back)."""
+        clock = self.day_start
+        continuous = driving = longest = 0.0
+        breaks = 0
+        stops = []
+        factor = self.matrix.impact_factor
+        last = len(legs_km) - 1
+
+        for position, distance in enumerate(legs_km):
+            leg = distance * self.minutes_per_km * factor(clock)
+            rest = 0.0
+            if continuous > 0 and continuous + leg > self.max_driving:
+                rest = self.rest
+                clock += rest
+                continuous = 0.0
+                breaks += 1
+                leg = distance * self.minutes_per_km * factor(clock)
+            clock += leg
+            continuous += leg
+            driving += leg
+            longest = max(longest, leg)
+            if position < last:
+                arrival = clock
+                clock += service_minutes[position]
+                if record:
+                    stops.append((arrival, clock, rest))
+
+        return clock, driving, longest, breaks, stops
+
+    def _violations(self, end: float, longest: float, delivery: float) -> List[str]:
+        violations = []
+        if end > self.day_end:
+            violations.append(f"returns at {format_clock(end)}, after the end of operational hours {format_clock(self.day_end)}")
+        if longest > self.max_driving:
+            violations.append(f"a {longest / 60:.2f} hour leg exceeds the {self.max_driving / 60:g} hour continuous driving limit")
+        if delivery > self.max_delivery:
+            violations.append(f"{delivery / 60:.2f} delivery hours exceed the {self.max_delivery / 60:.0f} hour limit")
+        return violations
+
+    def simulate(self, route: Route, service_hours: Dict[str, float]) -> RouteSchedule:
+        """Full schedule of one route; `service_hours` maps location_id to delivery hours."""
+        location_ids = list(dict.fromkeys(location.location_id for location in route.locations))
+        service = [service_hours.get(location_id, 0.0) * 60 for location_id in location_ids]
+        legs = self.matrix.route_legs_km(location_ids).tolist()
+
+        end, driving, longest, breaks, stops = self._simulate(legs, service, record=True)
+        delivery = sum(service)
+        violations = self._violations(end, longest, delivery)
+
+        return RouteSchedule(
+            h3_index=route.h3_index,
+            fleet_id=route.fleet_id,
+            feasible=not violations,
+            violations=violations,
+            start=format_clock(self.day_start),
+            end=format_clock(end),
+            driving_hours=round(driving / 60, 2),
+            delivery_hours=round(delivery / 60, 2),
+            breaks=breaks,
+            stops=[
+                StopSchedule(location_id=location_id, arrival=format_clock(arrival), departure=format_clock(departure), break_before_minutes=rest)
+                for location_id, (arrival, departure, rest) in zip(location_ids, stops)
+            ]
+        )
+
+    def validate_batch(self, routes: List[List[str]], service_hours: Dict[str, float]) -> np.ndarray:
+        """
+        Feasibility of many candidate routes given as lists of location ids.
+
+        Leg distances of all routes are gathered from the matrix in one NumPy call,
+        then every route is simulated without building any model.
+        """
+        stops, bounds = [], [0]
+        for location_ids in routes:
+            stops.extend([WAREHOUSE_ID, *location_ids, WAREHOUSE_ID])
+            bounds.append(len(stops))
+        index = self.matrix.indexes(stops)
+        legs = self.matrix.distances_between(index[:-1], index[1:]).tolist()
+
+        feasible = np.zeros(len(routes), dtype=bool)
+        for i, location_ids in enumerate(routes):
+            service = [service_hours.get(location_id, 0.0) * 60 for location_id in location_ids]
+            # The legs between the end of one route and the start of the next are skipped
+            feasible[i] = self.is_feasible(legs[bounds[i]:bounds[i + 1] - 1], service)
+        return feasible
+
+    def is_feasible(self, legs_km: List[float], service_minutes: List[float]) -> bool:
+        """Feasibility from precomputed legs, warehouse to warehouse, and delivery minutes per stop."""
+        end, _, longest, _, _ = self._simulate(legs_km, service_minutes, record=False)
+        return end <= self.day_end and longest <= self.max_driving and sum(service_minutes) <= self.max_delivery
+
+
+def load_schedule_simulator(geolocations_path: Path, time_constraints_path: Path) -> ScheduleSimulator:
+    time_constraints = load_reference(time_constraints_path, TimeConstraintsInput)
+    return ScheduleSimulator(load_travel_matrix(geolocations_path, time_constraints_path), time_constraints)
+
+
+def cluster_service_hours() -> Dict[str, float]:
+    """est_delivery_time_hours of every clustered location in shared state."""
+    index = get_cluster_index()
+    if index is None:
+        return {}
+    return {location_id: location.est_delivery_time_hours for location_id, location in index.locations.items()}
+
+
+class ScheduleSimulatorInput(BaseModel):
+    route: Route = Field(..., description="Route with h3_index, fleet_id, fleet_type and locations in visiting order")
+
+
+class ScheduleSimulatorTool(BaseTool):
+    name: str = "Route Schedule Simulator"
+    description: str = (
+        "Simulates a route from the warehouse through the day and returns arrival times, mandatory rest "
+        "breaks, and whether the route meets operational hours, the 8 hour delivery limit and driving rules."
+    )
+    args_schema: Type[BaseModel] = ScheduleSimulatorInput
+    _geolocations_path: str = PrivateAttr(default=None)
+    _time_constraints_path: str = PrivateAttr(default=None)
+
+    def with_geolocations_file(self, path: Path):
+        self._geolocations_path = path
+        return self
+
+    def with_time_constraints_file(self, path: Path):
+        self._time_constraints_path = path
+        return self
+
+    @instrumented
+    def _run(self, route) -> RouteSchedule:
+        simulator = load_schedule_simulator(self._geolocations_path, self._time_constraints_path)
+        return simulator.simulate(Route.model_validate(route), cluster_service_hours())
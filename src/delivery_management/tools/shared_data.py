@@ -1,20 +1,118 @@
 # shared_data.py
+#
+# Shared state is scoped to a run so several planning jobs can live in one
+# process. Writes are serialized per run and publish a new immutable mapping
+# (copy-on-write), so reads never take a lock. Only the mapping is immutable:
+# stored values are shared, so publish a new value instead of mutating one.
 
-_shared_state = {}
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Optional
 
-def set_shared(key: str, value):
+DEFAULT_RUN_ID = "default"
+
+_current_run: ContextVar[str] = ContextVar("shared_state_run", default=DEFAULT_RUN_ID)
+
+
+class SharedStateStore:
+    """Versioned key/value state of a single run."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        self._state: Mapping[str, Any] = MappingProxyType({})
+        self._versions: Dict[str, int] = {}
+
+    def set(self, key: str, value) -> int:
+        """Store a value and return its new version."""
+        with self._lock:
+            state = dict(self._state)
+            state[key] = value
+            self._state = MappingProxyType(state)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            return self._versions[key]
+
+    def get(self, key: str, default=None):
+        return self._state.get(key, default)
+
+    def version(self, key: str) -> int:
+        """Number of times a key was written, 0 if never."""
+        return self._versions.get(key, 0)
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._state:
+                state = dict(self._state)
+                del state[key]
+                self._state = MappingProxyType(state)
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._state = MappingProxyType({})
+            self._versions.clear()
+
+    def snapshot(self) -> Mapping[str, Any]:
+        """Read-only view of the current keys, the values are not copied."""
+        return self._state
+
+
+_stores: Dict[str, SharedStateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(run_id: Optional[str] = None) -> SharedStateStore:
+    """Store of the given run, or of the run active in the current context."""
+    run_id = run_id or _current_run.get()
+    store = _stores.get(run_id)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(run_id, SharedStateStore(run_id))
+    return store
+
+
+@contextmanager
+def use_run(run_id: str) -> Iterator[SharedStateStore]:
+    """Route the module level helpers below to `run_id` within the block."""
+    token = _current_run.set(run_id)
+    try:
+        yield get_store(run_id)
+    finally:
+        _current_run.reset(token)
+
+
+def drop_run(run_id: str):
+    """Forget all state of a finished run."""
+    with _stores_lock:
+        _stores.pop(run_id, None)
+
+
+@contextmanager
+def scoped_run(run_id: Optional[str] = None) -> Iterator[SharedStateStore]:
+    """use_run() for a new (or the given) run id, with the run dropped when the block ends."""
+    run_id = run_id or uuid.uuid4().hex
+    try:
+        with use_run(run_id) as store:
+            yield store
+    finally:
+        drop_run(run_id)
+
+
+def set_shared(key: str, value, run_id: Optional[str] = None):
     """Store a value in shared state."""
-    _shared_state[key] = value
+    get_store(run_id).set(key, value)
 
-def get_shared(key: str):
+def get_shared(key: str, run_id: Optional[str] = None):
     """Retrieve a value from shared state. Returns None if not found."""
-    return _shared_state.get(key)
+    return get_store(run_id).get(key)
 
-def clear_shared(key: str):
+def clear_shared(key: str, run_id: Optional[str] = None):
     """Remove a specific key from shared state."""
-    if key in _shared_state:
-        del _shared_state[key]
+    get_store(run_id).delete(key)
 
-def clear_all_shared():
+def clear_all_shared(run_id: Optional[str] = None):
     """Clear the entire shared state."""
-    _shared_state.clear()
+    get_store(run_id).clear()
@@ -1,16 +1,15 @@
-import json
 from pathlib import Path
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field, PrivateAttr
-from typing import Any, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+from typing import Any, Optional, Tuple
 
-from pydantic import BaseModel, Field
-from typing import List
-
-from delivery_management.data.load_data import DataLoader
+from delivery_management.data.reference_data import load_reference
+from delivery_management.tools.instrumentation import instrumented
 
 
 class AverageDeliverTime(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     weight_not_exceeding: str = Field(
         ...,
         description="Maximum weight for which the delivery time estimate applies (e.g., '20kg')."
@@ -22,6 +21,8 @@ class AverageDeliverTime(BaseModel):
 
 
 class OperationalHours(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     start: str = Field(
         ...,
         description="Start of fleet operation time in HH:MM format (e.g., '09:00')."
@@ -33,6 +34,8 @@ class OperationalHours(BaseModel):
 
 
 class MandatoryRest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     duration: int = Field(
         ...,
         description="Duration of mandatory rest after max continuous driving time, in minutes."
@@ -44,6 +47,8 @@ class MandatoryRest(BaseModel):
 
 
 class MaxContinuousDrivingTime(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     hours: int = Field(
         ...,
         description="Maximum number of continuous driving hours before mandatory rest."
@@ -55,6 +60,8 @@ class MaxContinuousDrivingTime(BaseModel):
 
 
 class PeakTrafficPeriod(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     start: str = Field(
         ...,
         description="Start time of the peak traffic window (e.g., '07:30')."
@@ -70,6 +77,8 @@ class PeakTrafficPeriod(BaseModel):
 
 
 class TimeConstraints(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     average_deliver_time: AverageDeliverTime = Field(
         ...,
         description="Estimated delivery time based on weight thresholds."
@@ -90,13 +99,16 @@ class TimeConstraints(BaseModel):
         ...,
         description="Driver limitations on continuous driving and rest requirements."
     )
-    peak_traffic_hours: List[PeakTrafficPeriod] = Field(
+    peak_traffic_hours: Tuple[PeakTrafficPeriod, ...] = Field(
         ...,
         description="List of known peak traffic windows with time impact multipliers."
     )
 
 
 class TimeConstraintsInput(BaseModel):
+    """time_constraints.json, shared through the reference data registry, so this and all nested models are frozen."""
+    model_config = ConfigDict(frozen=True)
+
     time_constraints: TimeConstraints = Field(
         ...,
         description="Top-level input structure for delivery route time constraint settings."
@@ -105,22 +117,27 @@ class TimeConstraintsInput(BaseModel):
 class TimeConstraints(BaseTool):
     name: str = "Time constraints"
     description: str = "Returns various time constraints that affect the delivery schedule"
-    jsondata: Any = DataLoader.load_data("time_constraints.json")
     _data_file_path: str = PrivateAttr(default=None)
     _time_constraints: list = PrivateAttr(default_factory=dict)
 
     def __init__(self):
         super().__init__()
 
+    @property
+    def jsondata(self) -> Any:
+        # Parsed document shared through the reference data registry, read on first use
+        return load_reference("time_constraints.json")
+
     def with_data_file(self, path: Path):
         self._data_file_path = path
         return self
     
     def load_json_data(self):
-        with open(self._data_file_path, 'r') as f:
-            self._time_constraints = json.load(f)
+        self._time_constraints = load_reference(self._data_file_path, TimeConstraintsInput)
 
     
-    def _run(self) -> TimeConstraintsInput:
+    @instrumented
+    def _run(self) -> dict:
         self.load_json_data()
-        return self._time_constraints
\ No newline at end of file
+        # A copy, the shared reference data is never handed out
+        return self._time_constraints.model_dump()
\ No newline at end of file
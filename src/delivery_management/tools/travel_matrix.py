@@ -0,0 +1,214 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type, Union
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from delivery_management.data.reference_data import load_reference
+from delivery_management.tools.instrumentation import instrumented
+from delivery_management.tools.time_constraints import TimeConstraintsInput
+
+EARTH_RADIUS_KM = 6371.0088
+WAREHOUSE_ID = "WAREHOUSE"
+
+Departure = Union[str, float, None]
+
+
+def parse_clock(value: str) -> float:
+    """'07:30' -> minutes since midnight."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_quantity(value: str) -> float:
+    """Leading number of strings like '30 km/h' or '5 km'."""
+    match = re.match(r"\s*([0-9]*\.?[0-9]+)", value)
+    if not match:
+        raise ValueError(f"Cannot parse a quantity from '{value}'")
+    return float(match.group(1))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great circle distance, vectorized over NumPy arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class TravelMatrix:
+    """
+    Symmetric warehouse + delivery location distance matrix.
+
+    Distances are kept as a float32 condensed upper triangle (n * (n - 1) / 2
+    values). Index 0 is always the warehouse. Travel times use the average
+    speed from time_constraints.json and its peak traffic impact factors.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        average_speed_kmh: float,
+        peak_periods: List[Tuple[float, float, float]]
+    ):
+        self.ids = ids
+        self.index: Dict[str, int] = {location_id: i for i, location_id in enumerate(ids)}
+        self.average_speed_kmh = average_speed_kmh
+        self.peak_periods = peak_periods
+
+        n = len(ids)
+        self._n = n
+        self._condensed = np.empty(n * (n - 1) // 2, dtype=np.float32)
+        offset = 0
+        for i in range(n - 1):
+            row = haversine_km(latitude[i], longitude[i], latitude[i + 1:], longitude[i + 1:])
+            self._condensed[offset:offset + len(row)] = row
+            offset += len(row)
+
+    @classmethod
+    def from_data(cls, geolocations: dict, time_constraints: dict) -> "TravelMatrix":
+        warehouse = geolocations["warehouse_location"]["coordinates"]
+        deliveries = geolocations.get("delivery_locations", [])
+        constraints = TimeConstraintsInput.model_validate(time_constraints).time_constraints
+
+        return cls(
+            ids=[WAREHOUSE_ID] + [loc["id"] for loc in deliveries],
+            latitude=np.array([warehouse["latitude"]] + [loc["latitude"] for loc in deliveries]),
+            longitude=np.array([warehouse["longitude"]] + [loc["longitude"] for loc in deliveries]),
+            average_speed_kmh=parse_quantity(constraints.average_speed),
+            peak_periods=[
+                (parse_clock(period.start), parse_clock(period.end), period.impact_factor)
+                for period in constraints.peak_traffic_hours
+            ]
+        )
+
+    def __len__(self):
+        return self._n
+
+    def _condensed_index(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        low, high = np.minimum(i, j), np.maximum(i, j)
+        return self._n * low - low * (low + 1) // 2 + (high - low - 1)
+
+    def indexes(self, location_ids: List[str]) -> np.ndarray:
+        return np.fromiter((self.index[location_id] for location_id in location_ids), dtype=np.int64, count=len(location_ids))
+
+    def distances_between(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Distances in km for pairs of matrix indexes, 0 where i == j."""
+        i, j = np.broadcast_arrays(np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64))
+        distances = np.zeros(i.shape, dtype=np.float32)
+        off_diagonal = i != j
+        distances[off_diagonal] = self._condensed[self._condensed_index(i[off_diagonal], j[off_diagonal])]
+        return distances
+
+    def distance_km(self, origin: str, destination: str) -> float:
+        return float(self.distances_between(self.index[origin], self.index[destination]))
+
+    def square(self, location_ids: Optional[List[str]] = None) -> np.ndarray:
+        """Dense float32 matrix for a subset of locations (all when omitted)."""
+        idx = np.arange(self._n) if location_ids is None else self.indexes(location_ids)
+        return self.distances_between(idx[:, None], idx[None, :])
+
+    def impact_factor(self, departure: Departure) -> float:
+        """Peak traffic multiplier for a departure time ('HH:MM' or minutes since midnight)."""
+        if departure is None:
+            return 1.0
+        minutes = parse_clock(departure) if isinstance(departure, str) else float(departure)
+        for start, end, factor in self.peak_periods:
+            if start <= minutes < end:
+                return factor
+        return 1.0
+
+    def travel_time_hours(self, origin: str, destination: str, departure: Departure = None) -> float:
+        return self.distance_km(origin, destination) / self.average_speed_kmh * self.impact_factor(departure)
+
+    def route_legs_km(self, location_ids: List[str], from_warehouse: bool = True, return_to_warehouse: bool = True) -> np.ndarray:
+        """Distance of every leg of a route, optionally starting and ending at the warehouse."""
+        stops = list(location_ids)
+        if from_warehouse:
+            stops = [WAREHOUSE_ID] + stops
+        if return_to_warehouse:
+            stops = stops + [WAREHOUSE_ID]
+        idx = self.indexes(stops)
+        return self.distances_between(idx[:-1], idx[1:])
+
+    def route_distance_km(self, location_ids: List[str], from_warehouse: bool = True, return_to_warehouse: bool = True) -> float:
+        return float(self.route_legs_km(location_ids, from_warehouse, return_to_warehouse).sum(dtype=np.float64))
+
+
+_matrix_cache: Dict[Tuple, TravelMatrix] = {}
+
+
+def load_travel_matrix(geolocations_path: Path, time_constraints_path: Path) -> TravelMatrix:
+    """Build the matrix once per version (path, size, mtime) of the input files."""
+    key = tuple(
+        (str(Path(path).resolve()), Path(path).stat().st_size, Path(path).stat().st_mtime_ns)
+        for path in (geolocations_path, time_constraints_path)
+    )
+    matrix = _matrix_cache.get(key)
+    if matrix is None:
+        matrix = _matrix_cache[key] = TravelMatrix.from_data(
+            load_reference(geolocations_path),
+            load_reference(time_constraints_path, TimeConstraintsInput)
+        )
+    return matrix
+
+
+class TravelMatrixInput(BaseModel):
+    location_ids: List[str] = Field(..., description="Delivery location ids in visiting order")
+    departure_time: Optional[str] = Field("09:00", description="Departure time from the warehouse in HH:MM format")
+
+
+class RouteLeg(BaseModel):
+    origin: str = Field(..., description="Location id the leg starts at")
+    destination: str = Field(..., description="Location id the leg ends at")
+    distance_km: float = Field(..., description="Great circle distance of the leg in km")
+    travel_time_hours: float = Field(..., description="Travel time including the peak traffic impact factor")
+
+class RouteTravel(BaseModel):
+    total_distance_km: float = Field(..., description="Total distance from the warehouse and back in km")
+    total_travel_time_hours: float = Field(..., description="Total driving time in hours, excluding delivery time at stops")
+    legs: List[RouteLeg] = Field(..., description="Legs of the route in visiting order")
+
+
+class TravelMatrixTool(BaseTool):
+    name: str = "Travel Matrix"
+    description: str = (
+        "Returns real distances and peak-adjusted travel times for a route that starts and ends at the warehouse, "
+        "using the coordinates in geolocations.json. Pass the location ids in visiting order."
+    )
+    args_schema: Type[BaseModel] = TravelMatrixInput
+    _geolocations_path: str = PrivateAttr(default=None)
+    _time_constraints_path: str = PrivateAttr(default=None)
+
+    def with_geolocations_file(self, path: Path):
+        self._geolocations_path = path
+        return self
+
+    def with_time_constraints_file(self, path: Path):
+        self._time_constraints_path = path
+        return self
+
+    def matrix(self) -> TravelMatrix:
+        return load_travel_matrix(self._geolocations_path, self._time_constraints_path)
+
+    @instrumented
+    def _run(self, location_ids: List[str], departure_time: Optional[str] = "09:00") -> RouteTravel:
+        matrix = self.matrix()
+        stops = [WAREHOUSE_ID] + list(location_ids) + [WAREHOUSE_ID]
+        distances = matrix.route_legs_km(location_ids).tolist()
+
+        clock = parse_clock(departure_time or "09:00")
+        legs = []
+        for origin, destination, distance in zip(stops[:-1], stops[1:], distances):
+            hours = distance / matrix.average_speed_kmh * matrix.impact_factor(clock)
+            legs.append(RouteLeg(origin=origin, destination=destination, distance_km=distance, travel_time_hours=hours))
+            clock += hours * 60
+
+        return RouteTravel(
+            total_distance_km=sum(leg.distance_km for leg in legs),
+            total_travel_time_hours=sum(leg.travel_time_hours for leg in legs),
+            legs=legs
+        )
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.cluster_orders import ClusterOrdersByGeoTool
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+@pytest.fixture
+def cluster_tool():
+    """Builds a ClusterOrdersByGeoTool over the shipped data files, any of them can be replaced."""
+    def build(
+        orders_file=DATA_DIR / "orders.json",
+        geolocations_file=DATA_DIR / "geolocations.json",
+        static_ref_file=DATA_DIR / "static_reference_data.json",
+        inventory_file=DATA_DIR / "inventory.json"
+    ) -> ClusterOrdersByGeoTool:
+        return ClusterOrdersByGeoTool()\
+            .with_orders_file(Path(orders_file))\
+            .with_geolocations_file(Path(geolocations_file))\
+            .with_static_ref_file(Path(static_ref_file))\
+            .with_inventory_file(Path(inventory_file))
+    return build
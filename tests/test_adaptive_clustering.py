@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+import h3
+import numpy as np
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.adaptive_clustering import LoadBand, assign_adaptive_cells, rebalance_h3_clusters
+
+
+def cell_fills(h3_clustered_orders, band):
+    return {
+        cluster.h3_index: band.fill(np.array([
+            sum(location.total_weight for location in cluster.locations),
+            sum(location.total_volume for location in cluster.locations),
+            sum(location.est_delivery_time_hours for location in cluster.locations)
+        ]))
+        for cluster in h3_clustered_orders.h3_clusters
+    }
+
+
+def test_adaptive_cells_fit_the_fleet_band(cluster_tool):
+    band = LoadBand.from_fleets()
+    fixed = cluster_tool().run()
+    adaptive = cluster_tool().with_adaptive_resolution().run()
+
+    # The shipped data has cells over two large vehicles worth of volume and hours
+    assert max(cell_fills(fixed, band).values()) > 1
+    assert all(band.min_fill <= fill <= 1 for fill in cell_fills(adaptive, band).values())
+
+    location_ids = lambda result: sorted(location.location_id for cluster in result.h3_clusters for location in cluster.locations)
+    assert location_ids(adaptive) == location_ids(fixed)
+    for cluster in adaptive.h3_clusters:
+        assert all(order.h3_index == cluster.h3_index for location in cluster.locations for order in location.orders)
+
+    # Rebalancing works on copies, the fixed clustering keeps its cells
+    rebalance_h3_clusters(fixed, band)
+    for cluster in fixed.h3_clusters:
+        assert all(order.h3_index == cluster.h3_index for location in cluster.locations for order in location.orders)
+
+    # The streaming path groups the same locations
+    streamed = cluster_tool().with_streaming_ingestion().with_adaptive_resolution().run()
+    groups = lambda result: {frozenset(location.location_id for location in cluster.locations) for cluster in result.h3_clusters}
+    assert groups(streamed) == groups(adaptive)
+
+
+def test_sparse_neighbors_merge_until_the_band_is_reached():
+    band = LoadBand(max_weight=1000, max_volume=10, max_hours=8)
+    cell = h3.latlng_to_cell(-23.5505, -46.6333, 6)
+    neighbor = sorted(set(h3.grid_disk(cell, 1)) - {cell})[0]
+    far = h3.latlng_to_cell(-22.9, -43.2, 6)
+    coordinates = [h3.cell_to_latlng(c) for c in (cell, neighbor, far)]
+    latitude = np.array([lat for lat, _ in coordinates])
+    longitude = np.array([lng for _, lng in coordinates])
+
+    sparse = assign_adaptive_cells(latitude, longitude, np.array([100.0, 100.0, 100.0]), np.zeros(3), np.zeros(3), band)
+    assert sparse[0] == sparse[1] != sparse[2]
+
+    # Together the neighbors would exceed the band, so they stay apart
+    full = assign_adaptive_cells(latitude, longitude, np.array([200.0, 900.0, 100.0]), np.zeros(3), np.zeros(3), band)
+    assert len(set(full)) == 3
+
+
+def test_sparse_cells_merge_across_resolutions():
+    band = LoadBand(max_weight=1000, max_volume=10, max_hours=8)
+    cell = h3.latlng_to_cell(-23.5505, -46.6333, 6)
+    neighbor = sorted(set(h3.grid_disk(cell, 1)) - {cell})[0]
+    # Two children whose centers stay inside the parent, together over the band so the parent is split
+    children = [child for child in sorted(h3.cell_to_children(cell, 7)) if h3.latlng_to_cell(*h3.cell_to_latlng(child), 6) == cell][:2]
+    coordinates = [h3.cell_to_latlng(c) for c in (*children, neighbor)]
+    latitude = np.array([lat for lat, _ in coordinates])
+    longitude = np.array([lng for _, lng in coordinates])
+
+    cells = assign_adaptive_cells(latitude, longitude, np.array([900.0, 200.0, 50.0]), np.zeros(3), np.zeros(3), band)
+    # The sparse neighbor joins the lighter child one resolution finer
+    assert cells == [children[0], children[1], children[1]]
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.cluster_cache import cache_key
+
+
+def test_cached_clustering_is_memory_mapped(tmp_path, cluster_tool):
+    expected = cluster_tool().with_cache_dir(tmp_path).run()
+    assert len(list(tmp_path.iterdir())) == 1
+
+    tool = cluster_tool().with_cache_dir(tmp_path)
+    columnar = tool.cluster_columnar_cached(6)
+    assert isinstance(columnar.weight, np.memmap)
+    # The orders are not parsed on a cache hit
+    assert tool._orders == []
+    assert tool.to_h3_clustered_orders(columnar).model_dump() == expected.model_dump()
+
+
+def test_cache_key_depends_on_resolution_and_content(tmp_path):
+    orders = tmp_path / "orders.json"
+    orders.write_text('{"orders": []}')
+    key = cache_key([orders], 6)
+    assert key != cache_key([orders], 7)
+
+    orders.write_text('{"orders": [ ]}')
+    assert key != cache_key([orders], 6)
@@ -1,24 +1,101 @@
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src directory to Python path
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.append(str(BASE_DIR / "src"))
 
-from delivery_management.tools.cluster_orders import ClusterOrdersByGeoTool  # Replace with actual import
+from delivery_management.tools.cluster_index import get_cluster_index
+from delivery_management.tools.enrich_final_output import FinalOutputEnricher
+from delivery_management.tools.fleet_assignment import FleetAssigner
+from delivery_management.tools.route_builder import build_greedy_routes
+from delivery_management.tools.shared_data import scoped_run
 
 # Test cases for ClusterOrdersByGeoTool
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-def test_cluster_order():
-    clusterOrdersTool = ClusterOrdersByGeoTool()\
-            .with_orders_file(Path(BASE_DIR / "src/delivery_management/data/orders.json"))\
-            .with_geolocations_file(Path(BASE_DIR / "src/delivery_management/data/geolocations.json"))\
-            .with_static_ref_file(Path(BASE_DIR / "src/delivery_management/data/static_reference_data.json"))\
-            .with_inventory_file(Path(BASE_DIR / "src/delivery_management/data/inventory.json"))
+def test_cluster_order(cluster_tool):
+    clusterOrdersTool = cluster_tool()
     result = clusterOrdersTool.run()
     json = result.model_dump()
     print(json)
     
+
+
+def test_columnar_clustering_matches_model_path(cluster_tool):
+    clusterOrdersTool = cluster_tool()
+    clusterOrdersTool.load_json_data()
+    expected = clusterOrdersTool._apply_h3_geo_clustering(clusterOrdersTool.cluster(), 6)
+
+    columnar = clusterOrdersTool.cluster_columnar(6)
+    assert columnar.h3_indexes == [cluster.h3_index for cluster in expected.h3_clusters]
+    assert abs(columnar.cell_weight.sum() - columnar.weight.sum()) < 1e-6
+
+    result = clusterOrdersTool.to_h3_clustered_orders(columnar)
+    assert result.model_dump() == expected.model_dump()
+
+
+def test_streaming_clustering_matches_aggregates(cluster_tool):
+    clusterOrdersTool = cluster_tool()
+    expected = clusterOrdersTool.run()
+
+    streamed = clusterOrdersTool.with_streaming_ingestion().run()
+    assert [cluster.h3_index for cluster in streamed.h3_clusters] == [cluster.h3_index for cluster in expected.h3_clusters]
+    assert streamed.priority_orders == expected.priority_orders
+
+    for streamed_cluster, expected_cluster in zip(streamed.h3_clusters, expected.h3_clusters):
+        for streamed_location, expected_location in zip(streamed_cluster.locations, expected_cluster.locations):
+            assert streamed_location.location_id == expected_location.location_id
+            assert streamed_location.total_weight == expected_location.total_weight
+            assert streamed_location.total_volume == expected_location.total_volume
+            assert streamed_location.est_delivery_time_hours == expected_location.est_delivery_time_hours
+            assert {order.order_id for order in streamed_location.orders} == {order.order_id for order in expected_location.orders}
+
+
+def test_streamed_output_feeds_downstream_consumers(cluster_tool):
+    DATA_DIR = BASE_DIR / "src/delivery_management/data"
+    clusterOrdersTool = cluster_tool()
+    expected = clusterOrdersTool.run()
+    streamed = clusterOrdersTool.with_streaming_ingestion().run()
+    # One row per package with its metadata, like the columnar path
+    assert streamed.model_dump() == expected.model_dump()
+
+    assigner = FleetAssigner.from_data_files(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json")
+    assignment = assigner.assign(build_greedy_routes(streamed), get_cluster_index())
+    enriched = FinalOutputEnricher().run(routes=assignment.model_dump())
+    assert enriched["enriched_routes"]
+    assert all(order.product_name for route in enriched["enriched_routes"] for location in route.locations for order in location.orders)
+
+
+def test_streaming_keeps_repeated_skus_as_separate_rows(tmp_path, cluster_tool):
+    DATA_DIR = BASE_DIR / "src/delivery_management/data"
+    orders = json.loads((DATA_DIR / "orders.json").read_text())
+    order = next(order for order in orders["orders"] if order.get("packages"))
+    order["packages"].append(dict(order["packages"][0], quantity=1))
+    (tmp_path / "orders.json").write_text(json.dumps(orders))
+
+    clusterOrdersTool = cluster_tool(tmp_path / "orders.json")
+    columnar = clusterOrdersTool.run()
+    streamed = clusterOrdersTool.with_streaming_ingestion().run()
+    assert streamed.model_dump() == columnar.model_dump()
+
+    rows = [row for cluster in streamed.h3_clusters for location in cluster.locations for row in location.orders if row.order_id == order["order_id"]]
+    assert len(rows) == len(order["packages"])
+
+
+def test_concurrent_runs_keep_their_orders_off_the_shared_tool(cluster_tool):
+    clusterOrdersTool = cluster_tool()
+
+    def run(_):
+        with scoped_run():
+            return clusterOrdersTool.run().model_dump()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(run, range(4)))
+    assert all(result == results[0] for result in results)
+    # Only the reference data is loaded on the shared tool
+    assert clusterOrdersTool._orders == [] and clusterOrdersTool._reservations == {}
+    assert clusterOrdersTool.regulatory is not None
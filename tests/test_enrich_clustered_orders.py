@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.cluster_index import get_cluster_index
+from delivery_management.tools.enrich_clustered_orders import EnrichClusteredOrders
+from delivery_management.tools.instrumentation import metrics
+from delivery_management.tools.regulatory import load_of, load_regulatory_index
+from delivery_management.tools.route_builder import build_greedy_routes
+
+
+def test_enrich_routes_uses_precomputed_totals(cluster_tool):
+    clusterOrdersTool = cluster_tool()
+    clustered = clusterOrdersTool.run()
+    routes = build_greedy_routes(clustered, regulatory=load_regulatory_index()).model_dump()
+
+    metrics.reset()
+    enriched = EnrichClusteredOrders()._run(routes)
+    # The call latency is reported like every other tool's
+    assert metrics.to_dict()["tool"]["Enrich Orders"]["calls"] == 1
+    assert metrics.to_dict()["tool"]["Enrich Orders"]["seconds"] > 0
+
+    delivery_hours = {}
+    for route in enriched.routes:
+        for location in route.locations:
+            location_cluster = get_cluster_index().locations[location.location_id]
+            # A split location is delivered in one stop per load, each with its own packages
+            packages = [order for order in location_cluster.orders if load_of(order.category_mask, location_cluster.load_masks) == location.load]
+            assert location.total_weight_kg == sum(order.weight for order in packages)
+            delivery_hours[location.location_id] = delivery_hours.get(location.location_id, 0) + location.est_delivery_time_hours
+        assert route.total_delivery_time <= 8.0 or len(route.locations) == 1
+
+    for location_id, hours in delivery_hours.items():
+        assert abs(hours - get_cluster_index().locations[location_id].est_delivery_time_hours) < 1e-9
+
+    # A new clustering invalidates the memoized totals
+    index = get_cluster_index()
+    clusterOrdersTool.run()
+    assert get_cluster_index() is not index
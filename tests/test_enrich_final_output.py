@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.cluster_index import get_cluster_index
+from delivery_management.tools.enrich_final_output import FinalOutputEnricher
+from delivery_management.tools.route_builder import build_greedy_routes
+
+
+def test_final_output_enricher(cluster_tool):
+    clusterOrdersTool = cluster_tool()
+    clustered = clusterOrdersTool.run()
+    index = get_cluster_index()
+    assert index.source is clustered
+    assert get_cluster_index() is index
+
+    routes = build_greedy_routes(clustered).model_dump()
+    for route in routes["routes"]:
+        route.update(fleet_id="TN14H4509", fleet_type="Small")
+
+    enriched = FinalOutputEnricher()._run(routes)["enriched_routes"]
+    assert len(enriched) == len(routes["routes"])
+    for route, enriched_route in zip(routes["routes"], enriched):
+        stops = dict.fromkeys((location["location_id"], location["load"]) for location in route["locations"])
+        expected_weight = sum(index.load_totals(*stop).total_weight for stop in stops)
+        assert abs(enriched_route.total_weight - expected_weight) < 1e-6
+    for route in enriched:
+        assert all(location.orders for location in route.locations)
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools import fleet_assignment
+from delivery_management.tools.cluster_index import ClusterIndex
+from delivery_management.tools.fleet_assignment import FleetAssigner
+from delivery_management.tools.route_builder import build_greedy_routes
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+def _assigner():
+    return FleetAssigner.from_data_files(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json")
+
+
+def test_assign_fleets(cluster_tool):
+    clustered = cluster_tool().run()
+    routes = build_greedy_routes(clustered)
+    assignment = _assigner().assign(routes, ClusterIndex(clustered))
+
+    assert len(assignment.routes) + len(assignment.unassigned) == len(routes.routes)
+    fleet_ids = [route.fleet_id for route in assignment.routes]
+    assert len(set(fleet_ids)) == len(fleet_ids)
+    for route in assignment.routes:
+        assert route.weight_utilization <= 1 and route.volume_utilization <= 1
+    for route in assignment.unassigned:
+        assert route.reason.startswith("forbidden package combination") or route.total_volume_m3 > 50 or route.total_weight_kg > 10000
+
+
+def test_solver_respects_counts():
+    assigner = _assigner()
+    # More light routes than Small vehicles: the rest move up to Medium, then Large
+    count = sum(assigner.counts) + 2
+    scores = assigner.scores(np.full(count, 100.0), np.full(count, 1.0), np.full(count, 10.0))
+    choice = assigner._solve_greedy(scores)
+
+    assert np.bincount(choice[choice >= 0], minlength=3).tolist() == assigner.counts
+    assert (choice < 0).sum() == 2
+
+    # A route only a Large can carry gets one before light routes use them up
+    weight = np.array([100.0] * count + [9000.0])
+    scores = assigner.scores(weight, np.ones(count + 1), np.full(count + 1, 10.0))
+    assert assigner._solve_greedy(scores)[-1] == 2
+
+    if fleet_assignment.linear_sum_assignment is not None:
+        assert assigner._solve_exact(scores)[-1] == 2
@@ -0,0 +1,152 @@
+import json
+import sys
+from pathlib import Path
+
+import h3
+import pytest
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.cluster_index import ClusterIndex
+from delivery_management.tools.incremental_clustering import IncrementalClusterer, OrderChanges
+from delivery_management.tools.inventory import PARTIAL
+from delivery_management.tools.route_builder import build_greedy_routes
+from delivery_management.tools.shared_data import get_shared
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+def location_totals(h3_clustered_orders):
+    return {
+        location.location_id: (cluster.h3_index, round(location.total_weight, 6), round(location.total_volume, 6), location.est_delivery_time_hours)
+        for cluster in h3_clustered_orders.h3_clusters
+        for location in cluster.locations
+    }
+
+
+def test_incremental_updates_match_full_recompute(tmp_path, cluster_tool):
+    orders = json.loads((DATA_DIR / "orders.json").read_text())["orders"]
+    morning, later = orders[:40], orders[40:]
+    morning_file = tmp_path / "orders.json"
+    morning_file.write_text(json.dumps({"orders": morning}))
+
+    tool = cluster_tool(morning_file)
+    published = tool.run()
+    published_dump = published.model_dump()
+    clusterer = IncrementalClusterer.from_cluster_tool(tool, published)
+    previous_routes = build_greedy_routes(clusterer.h3_clustered_orders).model_dump()
+
+    modified = dict(orders[0], packages=orders[0]["packages"][:1])
+    dirty = clusterer.apply(OrderChanges(added=later, cancelled=[orders[1]["order_id"]], modified=[modified]))
+    assert get_shared("dirty_h3_cells") == sorted(dirty)
+
+    # A new version is published, the earlier one is left as it was
+    assert published.model_dump() == published_dump
+    assert get_shared("h3_clusters") is clusterer.h3_clustered_orders
+    index, rebuilt = get_shared("h3_cluster_index"), ClusterIndex(clusterer.h3_clustered_orders)
+    assert index.source is clusterer.h3_clustered_orders
+    assert index.clusters == rebuilt.clusters and index.location_h3 == rebuilt.location_h3
+    assert index.orders == rebuilt.orders
+
+    final_orders = [modified] + orders[2:]
+    final_file = tmp_path / "final_orders.json"
+    final_file.write_text(json.dumps({"orders": final_orders}))
+    expected = cluster_tool(final_file).run()
+    assert location_totals(clusterer.h3_clustered_orders) == location_totals(expected)
+    assert sorted(o.order_id for o in clusterer.h3_clustered_orders.priority_orders) == sorted(o.order_id for o in expected.priority_orders)
+
+    # Only the dirty cells are re-planned, the rest keep their routes
+    dirty_routes = build_greedy_routes(clusterer.dirty_subset()).model_dump()
+    replanned = clusterer.replan_routes(previous_routes, dirty_routes)
+    routed = sorted({location["location_id"] for route in replanned["routes"] for location in route["locations"]})
+    assert routed == sorted(location_totals(expected))
+
+
+def test_re_added_order_replaces_the_existing_one(cluster_tool):
+    tool = cluster_tool()
+    published = tool.run()
+    clusterer = IncrementalClusterer.from_cluster_tool(tool, published)
+    order = json.loads((DATA_DIR / "orders.json").read_text())["orders"][0]
+
+    clusterer.apply(OrderChanges(added=[order]))
+    assert location_totals(clusterer.h3_clustered_orders) == location_totals(published)
+
+    # The order was not duplicated, so one cancellation removes all of it
+    clusterer.apply(OrderChanges(cancelled=[order["order_id"]]))
+    assert all(
+        row.order_id != order["order_id"]
+        for cluster in clusterer.h3_clustered_orders.h3_clusters for location in cluster.locations for row in location.orders
+    )
+
+
+def test_added_orders_reserve_the_stock_left(tmp_path, cluster_tool):
+    orders = json.loads((DATA_DIR / "orders.json").read_text())["orders"]
+    ordered = [(order, package["sku"], package["quantity"]) for order in orders for package in order["packages"]]
+    late = next(order for order in reversed(orders) if sum(sku == order["packages"][0]["sku"] for _, sku, _ in ordered) > 1)
+    earlier = [order for order in orders if order is not late]
+    sku, requested = late["packages"][0]["sku"], late["packages"][0]["quantity"]
+    first_user, released = next((order, quantity) for order, other, quantity in ordered if other == sku and order is not late)
+
+    # Exactly enough of the late order's first SKU for the earlier orders
+    inventory = json.loads((DATA_DIR / "inventory.json").read_text())
+    for item in inventory["inventory"]:
+        if item["sku"] == sku:
+            item["available_quantity"] = 0
+    used = sum(quantity for order, other, quantity in ordered if other == sku and order is not late)
+    inventory["inventory"].append({"sku": sku, "available_quantity": used})
+    inventory_file = tmp_path / "inventory.json"
+    inventory_file.write_text(json.dumps(inventory))
+    orders_file = tmp_path / "orders.json"
+    orders_file.write_text(json.dumps({"orders": earlier}))
+
+    tool = cluster_tool(orders_file, inventory_file=inventory_file)
+    clusterer = IncrementalClusterer.from_cluster_tool(tool, tool.run())
+
+    def late_quantity():
+        return sum(
+            row.quantity
+            for cluster in clusterer.h3_clustered_orders.h3_clusters for location in cluster.locations for row in location.orders
+            if row.order_id == late["order_id"] and row.product == sku
+        )
+
+    clusterer.apply(OrderChanges(added=[late]))
+    issue = next(issue for issue in clusterer.h3_clustered_orders.inventory_issues if issue.order_id == late["order_id"])
+    assert issue.shortages[sku] == requested
+    assert late_quantity() == 0
+
+    # Cancelling an earlier order releases its stock for the modified late order
+    clusterer.apply(OrderChanges(cancelled=[first_user["order_id"]], modified=[late]))
+    issues = {issue.order_id: issue for issue in clusterer.h3_clustered_orders.inventory_issues}
+    assert late_quantity() == min(requested, released)
+    if requested > released:
+        assert issues[late["order_id"]].status == PARTIAL
+        assert issues[late["order_id"]].shortages[sku] == requested - released
+    else:
+        assert late["order_id"] not in issues
+    assert first_user["order_id"] not in issues
+
+
+def test_new_locations_join_the_adaptive_cell_covering_them(cluster_tool):
+    tool = cluster_tool().with_adaptive_resolution()
+    published = tool.run()
+    split = next(cluster for cluster in published.h3_clusters if h3.get_resolution(cluster.h3_index) > 6 and len(cluster.locations) > 1)
+    location = split.locations[0]
+    orders = {
+        order["order_id"]: order
+        for order in json.loads((DATA_DIR / "orders.json").read_text())["orders"]
+        if order["location_id"] == location.location_id
+    }
+
+    # Without its cells the clusterer would put new locations in overlapping resolution 6 cells
+    with pytest.raises(ValueError):
+        IncrementalClusterer(published, tool.build_location_map(tool._geolocations), {})
+
+    clusterer = IncrementalClusterer.from_cluster_tool(tool, published)
+    clusterer.apply(OrderChanges(cancelled=list(orders)))
+    assert location.location_id not in location_totals(clusterer.h3_clustered_orders)
+
+    clusterer.apply(OrderChanges(added=list(orders.values())))
+    assert location_totals(clusterer.h3_clustered_orders)[location.location_id][0] == split.h3_index
+    assert len(clusterer.h3_clustered_orders.h3_clusters) == len(published.h3_clusters)
@@ -0,0 +1,76 @@
+import json
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from crewai import Agent, Crew, Task
+from crewai.events import LLMCallCompletedEvent, LLMCallStartedEvent, crewai_event_bus
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM
+
+from delivery_management.tools.instrumentation import MetricsListener, RunMetrics, metrics, write_metrics
+from delivery_management.tools.route_builder import RouteBuilderTool
+
+
+class StubLLM(BaseLLM):
+    """Offline LLM that emits the call events crewai.LLM emits."""
+
+    def __init__(self):
+        super().__init__(model="stub/model")
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        crewai_event_bus.emit(self, LLMCallStartedEvent(messages=messages, from_task=from_task, from_agent=from_agent, model=self.model))
+        response = "Thought: I know the answer\nFinal Answer: 3 routes"
+        crewai_event_bus.emit(self, LLMCallCompletedEvent(
+            messages=messages, response=response, call_type=LLMCallType.LLM_CALL, from_task=from_task, from_agent=from_agent, model=self.model
+        ))
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+
+def test_tool_calls_are_timed_profiled_and_exported(tmp_path, cluster_tool):
+    metrics.reset()
+    metrics.profile_tools = metrics.measure_payloads = True
+    try:
+        cluster_tool().run()
+        RouteBuilderTool().run()
+    finally:
+        metrics.profile_tools = metrics.measure_payloads = False
+
+    tools = metrics.to_dict()["tool"]
+    assert tools["Cluster Orders by H3 Index"]["calls"] == 1
+    assert tools["Build Greedy Routes"]["payload_bytes"] > 0
+    assert "cumulative" in metrics.profile_report("Build Greedy Routes")
+
+    write_metrics(tmp_path / "metrics.json")
+    assert json.loads((tmp_path / "metrics.json").read_text())["tool"]["Build Greedy Routes"]["calls"] == 1
+    write_metrics(tmp_path / "metrics.prom")
+    assert 'delivery_management_calls_total{kind="tool",name="Build Greedy Routes"} 1' in (tmp_path / "metrics.prom").read_text()
+
+    # Results are not serialized for the metrics unless payloads are measured
+    payload_bytes = metrics.to_dict()["tool"]["Build Greedy Routes"]["payload_bytes"]
+    RouteBuilderTool().run()
+    assert metrics.to_dict()["tool"]["Build Greedy Routes"]["payload_bytes"] == payload_bytes
+
+
+def test_listener_records_llm_calls_per_task_and_agent(monkeypatch):
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    run_metrics = RunMetrics()
+    with crewai_event_bus.scoped_handlers():
+        MetricsListener(run_metrics)
+        agent = Agent(role="Planner", goal="Plan routes", backstory="Plans delivery routes", llm=StubLLM())
+        task = Task(name="PlanRoutes", description="Plan the routes for today", expected_output="route count", agent=agent)
+        Crew(agents=[agent], tasks=[task]).kickoff()
+
+    stats = run_metrics.to_dict()
+    assert stats["task"]["PlanRoutes"]["calls"] == 1
+    assert stats["task"]["PlanRoutes"]["seconds"] > 0
+    assert stats["agent"]["Planner"]["llm_calls"] >= 1
+    assert stats["agent"]["Planner"]["prompt_tokens"] > 0
+    assert stats["agent"]["Planner"]["completion_tokens"] > 0
@@ -0,0 +1,79 @@
+import json
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.inventory import BLOCKED, FULFILLABLE, PARTIAL, SKUStockIndex, reserve_inventory
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+def _order(order_id, priority, *packages):
+    return {
+        "order_id": order_id,
+        "location_id": "LOC201",
+        "priority": priority,
+        "packages": [{"sku": sku, "quantity": quantity} for sku, quantity in packages]
+    }
+
+
+def test_reserve_high_priority_first():
+    stock = SKUStockIndex.from_inventory({"inventory": [
+        {"sku": "A", "available_quantity": 3},
+        {"sku": "A", "available_quantity": 2},
+        {"sku": "B", "available_quantity": 1}
+    ]})
+    assert stock.available_quantity("A") == 5
+
+    orders = [
+        _order("ORD1", "normal", ("A", 4)),
+        _order("ORD2", "high", ("A", 3), ("B", 1)),
+        _order("ORD3", "normal", ("B", 1)),
+        _order("ORD4", "normal", ("C", 1)),
+    ]
+    reservations = reserve_inventory(lambda: orders, stock)
+
+    assert list(reservations) == ["ORD2", "ORD1", "ORD3", "ORD4"]
+    assert reservations["ORD2"].status == FULFILLABLE
+    assert reservations["ORD1"].status == PARTIAL
+    assert reservations["ORD1"].reserved == [2]
+    assert reservations["ORD1"].shortages == {"A": 2}
+    assert reservations["ORD3"].status == BLOCKED
+    assert reservations["ORD4"].status == BLOCKED
+    assert stock.available_quantity("A") == 0
+
+
+def test_clustering_skips_blocked_orders(tmp_path, cluster_tool):
+    orders = json.loads((DATA_DIR / "orders.json").read_text())["orders"]
+    blocked, partial = orders[0], orders[1]
+
+    # Remove all stock of the first order's SKUs and part of one SKU of the second
+    inventory = json.loads((DATA_DIR / "inventory.json").read_text())
+    blocked_skus = {package["sku"] for package in blocked["packages"]}
+    short_sku = next(package["sku"] for package in partial["packages"] if package["sku"] not in blocked_skus)
+    for item in inventory["inventory"]:
+        if item["sku"] in blocked_skus:
+            item["available_quantity"] = 0
+        elif item["sku"] == short_sku:
+            item["available_quantity"] = 0
+    inventory["inventory"].append({"sku": short_sku, "available_quantity": 1})
+    inventory_path = tmp_path / "inventory.json"
+    inventory_path.write_text(json.dumps(inventory))
+
+    tool = cluster_tool(inventory_file=inventory_path)
+
+    for clustered in (tool.run(), tool.with_streaming_ingestion().run()):
+        issues = {issue.order_id: issue for issue in clustered.inventory_issues}
+        assert issues[blocked["order_id"]].status == BLOCKED
+        assert issues[partial["order_id"]].status == PARTIAL
+        assert issues[partial["order_id"]].shortages[short_sku] > 0
+
+        orders_by_id = {
+            order.order_id: order
+            for cluster in clustered.h3_clusters for location in cluster.locations for order in location.orders
+        }
+        assert blocked["order_id"] not in orders_by_id
+        assert partial["order_id"] in orders_by_id
@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from crewai import Agent, Crew, Task
+from crewai.llms.base_llm import BaseLLM
+
+from delivery_management.llm_cache import CachedLLM, ResponseCache
+
+
+class StubLLM(BaseLLM):
+    """Offline LLM that answers every prompt immediately and counts the calls."""
+
+    def __init__(self):
+        super().__init__(model="stub/model", temperature=0.2)
+        self.calls = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        self.calls += 1
+        return "Thought: I know the answer\nFinal Answer: 3 routes"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+
+def test_response_cache_lru_and_ttl(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    # b was the least recently used entry
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c"), len(cache)) == ("1", "3", 2)
+
+    expired = ResponseCache(tmp_path / "responses.sqlite", ttl_seconds=-1)
+    assert expired.get("a") is None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_crew_replay_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    stub = StubLLM()
+    llm = CachedLLM(stub, ResponseCache(tmp_path / "responses.sqlite"))
+
+    def kickoff(description):
+        agent = Agent(role="Planner", goal="Plan routes", backstory="Plans delivery routes", llm=llm)
+        task = Task(name="PlanRoutes", description=description, expected_output="route count", agent=agent)
+        return Crew(agents=[agent], tasks=[task]).kickoff().raw
+
+    assert kickoff("Plan the routes for today") == "3 routes"
+    assert stub.calls == 1
+    assert kickoff("Plan the routes for today") == "3 routes"
+    assert stub.calls == 1
+    kickoff("Plan the routes for tomorrow")
+    assert stub.calls == 2
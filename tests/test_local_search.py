@@ -0,0 +1,69 @@
+import random
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.cluster_index import ClusterIndex
+from delivery_management.tools.local_search import RouteImprover
+from delivery_management.tools.route_builder import build_greedy_routes
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+def test_improve_greedy_routes(cluster_tool):
+    clustered = cluster_tool().run()
+    index = ClusterIndex(clustered)
+    greedy = build_greedy_routes(clustered).model_dump()
+    for route in greedy["routes"]:
+        random.Random(7).shuffle(route["locations"])
+
+    improver = RouteImprover.from_data_files(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json")
+    improved = improver.improve(greedy, index)
+    stats = improver.last_stats
+
+    assert stats.distance_after_km < stats.distance_before_km
+    assert not stats.timed_out
+
+    def placements(routes):
+        return sorted((route["h3_index"], location["location_id"], location["order_id"]) for route in routes["routes"] for location in route["locations"])
+
+    # Nothing is dropped and nothing leaves its H3 cell
+    assert placements(improved) == placements(greedy)
+
+    simulator = improver.simulator
+    service_hours = {location_id: location.est_delivery_time_hours for location_id, location in index.locations.items()}
+
+    def on_time(routes):
+        location_ids = [[location["location_id"] for location in route["locations"]] for route in routes["routes"]]
+        return simulator.validate_batch(location_ids, service_hours)
+
+    # Greedy routes packed to 8 delivery hours can run past 18:00; moves never make that worse
+    assert (~on_time(improved)).sum() <= (~on_time(greedy)).sum()
+
+    max_weight, max_volume = improver.capacity(None)
+
+    def over_capacity(routes):
+        loads = [
+            [index.locations[location_id] for location_id in {location["location_id"] for location in route["locations"]}]
+            for route in routes["routes"]
+        ]
+        return sum(
+            sum(l.total_weight for l in load) > max_weight or sum(l.total_volume for l in load) > max_volume
+            for load in loads
+        )
+
+    assert over_capacity(improved) <= over_capacity(greedy)
+
+
+def test_time_budget(cluster_tool):
+    clustered = cluster_tool().run()
+    improver = RouteImprover.from_data_files(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json", time_budget_seconds=0)
+    greedy = build_greedy_routes(clustered)
+    improved = improver.improve(greedy, ClusterIndex(clustered))
+
+    assert improver.last_stats.timed_out
+    assert improver.last_stats.moves == 0
+    assert improved == greedy
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.models.optimized_routes import OptimizedRoutes
+from delivery_management.optimizer import MultiObjectiveOptimizer
+from delivery_management.tools.fleet_assignment import FleetAssigner
+from delivery_management.tools.local_search import RouteImprover
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+def test_single_pass_optimizer(cluster_tool):
+    clustered = cluster_tool().run()
+    paths = (DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json")
+    stages = MultiObjectiveOptimizer(RouteImprover.from_data_files(*paths), FleetAssigner.from_data_files(*paths)).optimize(clustered)
+
+    assert set(stages) == {"h3_clustered_orders", "time_optimized_routes", "weight_optimized_routes", "volume_optimized_routes"}
+
+    routes = OptimizedRoutes.model_validate(stages["volume_optimized_routes"])
+    routed = {
+        (location.location_id, location.load) for route in routes.routes for location in route.locations
+    } | {
+        (location["location_id"], location["load"]) for route in stages["volume_optimized_routes"]["unassigned_routes"] for location in route["locations"]
+    }
+    # Locations whose packages may not travel together are delivered as several loads
+    stops = {
+        (location.location_id, load)
+        for cluster in clustered.h3_clusters for location in cluster.locations for load in range(len(location.load_masks))
+    }
+    assert routed == stops
+    assert len(stops) > sum(len(cluster.locations) for cluster in clustered.h3_clusters)
+
+    # Splitting to capacity means only loads too big for any fleet stay unassigned
+    for route in stages["volume_optimized_routes"]["unassigned_routes"]:
+        assert len({location["location_id"] for location in route["locations"]}) == 1
+        assert not route["reason"].startswith("forbidden package combination")
+    for route in stages["volume_optimized_routes"]["routes"]:
+        assert route["volume_utilization"] <= 1
+    for route in stages["weight_optimized_routes"]["routes"]:
+        assert route["weight_utilization"] <= 1
+    assert [route["fleet_id"] for route in stages["time_optimized_routes"]["routes"]] == [route.fleet_id for route in routes.routes]
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.prompt_payload import (
+    ClusterDetailTool,
+    ClusterSummarizer,
+    ClusterSummaryPage,
+    ClusterSummaryPageTool,
+    estimate_tokens
+)
+
+
+def test_summary_pages_fit_budget_and_cover_all_locations(cluster_tool):
+    clustered = cluster_tool().run()
+    full_tokens = estimate_tokens(clustered.model_dump_json())
+
+    summarizer = ClusterSummarizer(clustered, token_budget=600, encode_ids=True)
+    assert summarizer.page_count > 1
+
+    location_ids = []
+    total_tokens = 0
+    for number in range(summarizer.page_count):
+        page = summarizer.page(number)
+        tokens = estimate_tokens(page.model_dump_json())
+        total_tokens += tokens
+        if len(page.cells) > 1:
+            assert tokens <= 600
+        location_ids.extend(page.ids[location.id] for cell in page.cells for location in cell.locs)
+
+    expected = [location.location_id for cluster in clustered.h3_clusters for location in cluster.locations]
+    assert location_ids == expected
+    assert total_tokens < full_tokens / 4
+
+
+def test_summary_output_and_detail_tools(cluster_tool):
+    page = cluster_tool().with_summary_output(token_budget=100000).run()
+    assert isinstance(page, ClusterSummaryPage)
+    assert page.pages == 1 and page.ids is None
+    assert ClusterSummaryPageTool(token_budget=100000).run(page=0) == page
+
+    h3_index = page.cells[0].h3
+    detail = ClusterDetailTool().run(h3_index=h3_index)
+    assert detail["h3_index"] == h3_index
+    assert "metadata" not in detail["locations"][0]["orders"][0]
+    assert ClusterDetailTool().run(h3_index=h3_index, include_metadata=True)["locations"][0]["orders"][0]["metadata"]
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.data.load_data import DataLoader
+from delivery_management.data.reference_data import ReferenceDataRegistry, freeze
+from delivery_management.tools.fleet import FleetData
+
+
+def write_fleets(path: Path, small_count: int):
+    fleets = DataLoader.load_data("fleets.json")
+    fleets["available_fleets"][0]["count"] = small_count
+    path.write_text(json.dumps(fleets))
+
+
+def test_files_are_parsed_once_per_version(tmp_path):
+    path = tmp_path / "fleets.json"
+    write_fleets(path, 3)
+    registry = ReferenceDataRegistry()
+
+    fleet_data = registry.get(path, FleetData)
+    assert registry.get(path, FleetData) is fleet_data
+    with pytest.raises(ValidationError):
+        fleet_data.total_fleet_count = 0
+
+    # A new mtime with the same content keeps the loaded version
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert registry.get(path, FleetData) is fleet_data
+    assert registry.loads == 1
+
+    write_fleets(path, 4)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert registry.get(path, FleetData).available_fleets[0].count == 4
+    assert registry.loads == 2
+
+
+def test_binary_cache_is_shared_between_registries(tmp_path):
+    path = tmp_path / "fleets.json"
+    write_fleets(path, 3)
+    ReferenceDataRegistry(tmp_path / "cache").get(path, FleetData)
+
+    # Stands in for a pool worker, it unpickles instead of parsing and validating
+    worker = ReferenceDataRegistry(tmp_path / "cache")
+    fleet_data = worker.get(path, FleetData)
+    assert worker.loads == 0
+    assert fleet_data == FleetData.model_validate(json.loads(path.read_text()))
+    assert worker.get("fleets.json") == freeze(DataLoader.load_data("fleets.json"))
+
+
+def test_documents_are_read_only(tmp_path):
+    path = tmp_path / "fleets.json"
+    write_fleets(path, 3)
+    fleets = ReferenceDataRegistry().get(path)
+
+    with pytest.raises(TypeError):
+        fleets["total_fleet_count"] = 0
+    with pytest.raises(TypeError):
+        fleets["available_fleets"][0]["fleets"][0] = "MH00X0000"
@@ -0,0 +1,71 @@
+import json
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+import pytest
+
+from delivery_management.tools.regulatory import RegulatoryIndex, load_regulatory_index, resolve_package_groups
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+def test_conflict_table():
+    index = load_regulatory_index()
+    food, agro, elec, clean, tool = (index.bits[c] for c in ["FOOD", "AGRO", "ELEC", "CLEAN", "TOOL"])
+
+    assert index.is_compatible(food | elec | tool)
+    assert not index.is_compatible(food | agro | tool)
+    assert not index.is_compatible(elec | clean)
+    assert index.compatible_with(food | tool, elec)
+    assert not index.compatible_with(food | tool, agro | tool)
+    assert index.violations(food | agro | elec | clean) == [
+        "Food Supplies with Pesticides: Health and Safety Regulation",
+        "Electronics with Hazardous Chemicals: Risk of Contamination"
+    ]
+
+    with pytest.raises(ValueError):
+        RegulatoryIndex(["FOOD"], [{"packages": ["Food Supplies", "Explosives"]}])
+
+
+def test_package_groups_resolve_from_reference_data():
+    static_ref = json.loads((DATA_DIR / "static_reference_data.json").read_text())
+    package_groups = json.loads((DATA_DIR / "regulatory_constraints.json").read_text())["regulatory_constraints"]["package_groups"]
+    groups = resolve_package_groups(static_ref, package_groups)
+
+    skus = [data for category_map in static_ref["sku_map"].values() for data in category_map.values()]
+    assert groups["Food Supplies"] == ["FOOD"]
+    assert groups["Hazardous Chemicals"] == sorted({data["category"] for data in skus if data["is_hazardous"]})
+
+    # A hazardous electronics SKU cannot be told apart from the rest of ELEC by its category bit
+    next(iter(static_ref["sku_map"]["ELEC"].values()))["is_hazardous"] = True
+    with pytest.raises(ValueError):
+        resolve_package_groups(static_ref, package_groups)
+
+
+def test_conflicting_categories_split_into_loads():
+    index = load_regulatory_index()
+    food, agro, elec, clean, tool = (index.bits[c] for c in ["FOOD", "AGRO", "ELEC", "CLEAN", "TOOL"])
+
+    assert index.loads(food | elec | tool) == [food | elec | tool]
+    assert index.loads(food | agro | elec | clean | tool) == [food | elec | tool, agro | clean]
+    assert index.loads(0) == [0]
+
+
+def test_cluster_output_masks(cluster_tool):
+    tool = cluster_tool()
+    columnar = tool.run()
+    streamed = tool.with_streaming_ingestion().run()
+    index = load_regulatory_index()
+
+    for h3_clustered in (columnar, streamed):
+        for cluster in h3_clustered.h3_clusters:
+            for location in cluster.locations:
+                for order in location.orders:
+                    assert order.category_mask == index.mask([order.product.split("-")[0]])
+                # Every load is compatible and together they hold all the location's packages
+                assert all(index.is_compatible(mask) for mask in location.load_masks)
+                assert sum(location.load_masks) == index.mask({order.product.split("-")[0] for order in location.orders})
@@ -0,0 +1,41 @@
+import operator
+import sys
+from functools import reduce
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.cluster_index import location_loads
+from delivery_management.tools.regulatory import load_regulatory_index
+from delivery_management.tools.route_builder import build_greedy_routes, pack_first_fit_decreasing
+
+
+def test_pack_first_fit_decreasing():
+    bins = pack_first_fit_decreasing([5.0, 4.0, 3.0, 3.0, 1.0, 9.5], 8.0)
+    # The oversized item travels alone, everything else is packed largest first
+    assert bins == [[5], [0, 2], [1, 3, 4]]
+
+
+def test_build_greedy_routes(cluster_tool):
+    clusterOrdersTool = cluster_tool()
+    clustered = clusterOrdersTool.run()
+    regulatory = load_regulatory_index()
+    routes = build_greedy_routes(clustered, regulatory=regulatory)
+
+    loads = {
+        (location.location_id, load): (cluster.h3_index, totals)
+        for cluster in clustered.h3_clusters
+        for location in cluster.locations
+        for load, totals in enumerate(location_loads(location))
+    }
+    routed = [(location.location_id, location.load) for route in routes.routes for location in route.locations]
+    assert sorted(routed) == sorted(loads)
+
+    for route in routes.routes:
+        stops = [loads[(location.location_id, location.load)] for location in route.locations]
+        assert all(h3_index == route.h3_index for h3_index, _ in stops)
+        assert regulatory.is_compatible(reduce(operator.or_, (totals.category_mask for _, totals in stops)))
+        if len(route.locations) > 1:
+            assert sum(totals.est_delivery_time_hours for _, totals in stops) <= 8.0
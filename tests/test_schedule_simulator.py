@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.models.optimized_routes import Route
+from delivery_management.tools.schedule_simulator import load_schedule_simulator
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+def _simulator():
+    return load_schedule_simulator(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json")
+
+
+def _route(location_ids):
+    return Route(
+        h3_index=None,
+        fleet_id="MH12AB1234",
+        fleet_type="Small",
+        locations=[{"location_id": location_id, "order_id": f"ORD{i}"} for i, location_id in enumerate(location_ids)]
+    )
+
+
+def test_simulate_route():
+    simulator = _simulator()
+    location_ids = ["LOC201", "LOC202", "LOC203"]
+    service_hours = {location_id: 1.0 for location_id in location_ids}
+    schedule = simulator.simulate(_route(location_ids), service_hours)
+
+    assert schedule.feasible and schedule.violations == []
+    assert schedule.start == "09:00"
+    assert [stop.location_id for stop in schedule.stops] == location_ids
+    assert all(a.departure <= b.arrival for a, b in zip(schedule.stops, schedule.stops[1:]))
+    assert schedule.delivery_hours == 3.0
+    expected_driving = simulator.matrix.route_distance_km(location_ids) / simulator.matrix.average_speed_kmh
+    assert abs(schedule.driving_hours - expected_driving) < 0.01
+
+
+def test_breaks_and_violations():
+    simulator = _simulator()
+    # Far away legs force a rest once continuous driving would exceed 4 hours
+    simulator.minutes_per_km *= 20
+    schedule = simulator.simulate(_route(["LOC201", "LOC230", "LOC250"]), {})
+    assert schedule.breaks >= 1
+    assert schedule.driving_hours > 4
+
+    schedule = _simulator().simulate(_route(["LOC201"]), {"LOC201": 9.0})
+    assert not schedule.feasible
+    assert len(schedule.violations) == 2
+
+
+def test_leg_over_the_driving_limit_is_a_violation():
+    simulator = _simulator()
+    distance = simulator.matrix.route_legs_km(["LOC201"]).tolist()[0]
+    # The first leg alone takes longer than the continuous driving limit
+    simulator.minutes_per_km = 1.5 * simulator.max_driving / distance
+    simulator.day_end = float("inf")
+
+    schedule = simulator.simulate(_route(["LOC201"]), {})
+    assert not schedule.feasible
+    assert len(schedule.violations) == 1 and "continuous driving" in schedule.violations[0]
+    assert not simulator.validate_batch([["LOC201"]], {})[0]
+
+
+def test_validate_batch():
+    simulator = _simulator()
+    routes = [["LOC201", "LOC202"], ["LOC203"], ["LOC204", "LOC205", "LOC206"]] * 100
+    service_hours = {"LOC203": 9.0}
+    feasible = simulator.validate_batch(routes, service_hours)
+
+    assert feasible.tolist() == [True, False, True] * 100
+    for location_ids, ok in zip(routes[:3], feasible[:3]):
+        assert simulator.simulate(_route(location_ids), service_hours).feasible == ok
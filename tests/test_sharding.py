@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.sharding import merge_routes, run_sharded, shard_h3_clusters
+from delivery_management.tools.route_builder import build_greedy_routes
+
+
+def greedy_routes_stage(shard):
+    return build_greedy_routes(shard).model_dump()
+
+
+def test_sharded_stage_matches_sequential_run(cluster_tool):
+    clusterOrdersTool = cluster_tool()
+    clustered = clusterOrdersTool.run()
+    cluster_order = [cluster.h3_index for cluster in clustered.h3_clusters]
+
+    shards = shard_h3_clusters(clustered, 3)
+    assert len(shards) == 3
+    assert sorted(c.h3_index for shard in shards for c in shard.h3_clusters) == sorted(cluster_order)
+
+    merged = merge_routes(run_sharded(greedy_routes_stage, clustered, max_workers=3), cluster_order)
+    assert merged == greedy_routes_stage(clustered)
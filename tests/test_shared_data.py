@@ -0,0 +1,66 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.shared_data import (
+    drop_run,
+    get_shared,
+    get_store,
+    scoped_run,
+    set_shared,
+    use_run
+)
+
+
+def test_runs_are_isolated():
+    with use_run("run-a"):
+        set_shared("h3_clusters", "a")
+    with use_run("run-b"):
+        set_shared("h3_clusters", "b")
+        assert get_shared("h3_clusters") == "b"
+
+    assert get_shared("h3_clusters", run_id="run-a") == "a"
+    drop_run("run-a")
+    drop_run("run-b")
+    assert get_shared("h3_clusters", run_id="run-a") is None
+
+
+def test_versions_and_scoped_runs():
+    with scoped_run() as store:
+        set_shared("time_optimized_routes", {"routes": []})
+        snapshot = store.snapshot()
+        set_shared("time_optimized_routes", {"routes": [1]})
+
+        assert store.version("time_optimized_routes") == 2
+        assert snapshot["time_optimized_routes"] == {"routes": []}
+        with pytest.raises(TypeError):
+            snapshot["time_optimized_routes"] = None
+        run_id = store.run_id
+
+    # The run is dropped and the default run never saw its state
+    assert not get_store(run_id).snapshot()
+    drop_run(run_id)
+    assert get_shared("time_optimized_routes") is None
+
+
+def test_concurrent_writers():
+    store = get_store("run-threads")
+
+    def writer(n):
+        for i in range(200):
+            store.set(f"key-{n}-{i}", i)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.snapshot()) == 8 * 200
+    drop_run("run-threads")
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.data.synthetic import WorkloadSpec, generate_workload, write_workload
+
+
+def test_workload_is_seeded_and_scales():
+    spec = WorkloadSpec(locations=20, orders=30, packages_per_order=(2, 3), seed=3)
+    assert generate_workload(spec) == generate_workload(spec)
+    assert generate_workload(spec) != generate_workload(WorkloadSpec(locations=20, orders=30, seed=4))
+
+    workload = generate_workload(WorkloadSpec.scaled(4))
+    assert len(workload["geolocations.json"]["delivery_locations"]) == 200
+    assert len(workload["orders.json"]["orders"]) == 200
+    fleets = workload["fleets.json"]["available_fleets"]
+    assert all(len(fleet["fleets"]) == fleet["count"] for fleet in fleets)
+    assert workload["fleets.json"]["total_fleet_count"] == 4 * 30
+
+
+def test_workload_clusters_every_order(tmp_path, cluster_tool):
+    paths = write_workload(WorkloadSpec(locations=40, orders=60, spread_km=10), tmp_path)
+    clustered = cluster_tool(paths.orders, geolocations_file=paths.geolocations, static_ref_file=paths.static_ref, inventory_file=paths.inventory).run()
+
+    order_ids = {order.order_id for cluster in clustered.h3_clusters for location in cluster.locations for order in location.orders}
+    assert len(order_ids) == 60
+    assert not clustered.inventory_issues
+    assert all(order.metadata is not None for cluster in clustered.h3_clusters for location in cluster.locations for order in location.orders)
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tasks import summarize_optimizations, time_optimize_routes, weight_optimize_routes
+from delivery_management.tools import factories
+
+
+def test_task_factories_share_one_tool_per_process():
+    time_task = time_optimize_routes.time_optimize_routes_task(None)
+    weight_task = weight_optimize_routes.fine_tune_routes_task(None)
+    summary_task = summarize_optimizations.create_summary_task(None)
+
+    fleet_tools = {id(tool) for task in (time_task, weight_task, summary_task) for tool in task.tools if tool.name == "Returns Fleet Data"}
+    assert fleet_tools == {id(factories.fleet_tool())}
+    assert factories.cluster_orders_tool() is not factories.cluster_orders_tool(summary_output=True)
+    assert factories.fleet_tool().get_fleet_by_type("Small")
+
+
+def test_importing_the_crew_builds_nothing():
+    # Without credentials the default LLM cannot be built, so the import must not try
+    script = (
+        "from delivery_management import crew\n"
+        "from delivery_management.data.reference_data import registry\n"
+        "from delivery_management.tools import factories\n"
+        "crew.DeliveryManagement()\n"
+        "built = [f.__name__ for f in vars(factories).values() if hasattr(f, 'cache_info') and f.cache_info().currsize]\n"
+        "built += [f.__name__ for f in (crew.shared_llm, crew.metrics_listener, crew.load_agents_config) if f.cache_info().currsize]\n"
+        "built += ['reference data'] if registry.loads else []\n"
+        "print(built)\n"
+    )
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(BASE_DIR / "src"),
+        DELIVERY_MANAGEMENT_LLM="gemini",
+        DELIVERY_MANAGEMENT_VERTEX_CREDENTIALS=str(BASE_DIR / "missing_credentials.json"),
+        CREWAI_DISABLE_TELEMETRY="true",
+        OTEL_SDK_DISABLED="true"
+    )
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,49 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from delivery_management.tools.travel_matrix import (
+    WAREHOUSE_ID,
+    TravelMatrixTool,
+    haversine_km,
+    load_travel_matrix
+)
+
+DATA_DIR = BASE_DIR / "src/delivery_management/data"
+
+
+def test_travel_matrix():
+    matrix = load_travel_matrix(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json")
+    assert load_travel_matrix(DATA_DIR / "geolocations.json", DATA_DIR / "time_constraints.json") is matrix
+
+    geolocations = json.loads((DATA_DIR / "geolocations.json").read_text())
+    first, second = geolocations["delivery_locations"][:2]
+    expected = haversine_km(first["latitude"], first["longitude"], second["latitude"], second["longitude"])
+    assert abs(matrix.distance_km(first["id"], second["id"]) - expected) < 1e-3
+    assert matrix.distance_km(second["id"], first["id"]) == matrix.distance_km(first["id"], second["id"])
+
+    square = matrix.square()
+    assert square.dtype == np.float32
+    assert np.array_equal(square, square.T)
+    assert np.all(np.diag(square) == 0)
+
+    assert matrix.impact_factor("08:00") == 1.5
+    assert matrix.impact_factor("12:00") == 1.0
+    assert matrix.impact_factor("17:00") == 1.7
+
+
+def test_travel_matrix_tool():
+    tool = TravelMatrixTool()\
+        .with_geolocations_file(DATA_DIR / "geolocations.json")\
+        .with_time_constraints_file(DATA_DIR / "time_constraints.json")
+    travel = tool._run(["LOC201", "LOC202"], departure_time="10:00")
+
+    assert [leg.origin for leg in travel.legs] == [WAREHOUSE_ID, "LOC201", "LOC202"]
+    assert abs(travel.total_distance_km - tool.matrix().route_distance_km(["LOC201", "LOC202"])) < 1e-3
+    assert abs(travel.total_travel_time_hours - travel.total_distance_km / 30) < 1e-6